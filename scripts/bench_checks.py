@@ -0,0 +1,198 @@
+"""
+Benchmark des checks déterministes (RGDU, bases, fiscal, CSG, allocations familiales).
+
+Construit un corpus de fiches à partir des PDF fournis (chaque fiche est
+déclinée avec plusieurs bruts et horaires), mesure le débit des checks
+fiche par fiche et du moteur en lot, vérifie que le moteur en lot donne
+exactement les résultats des checks fiche par fiche (valeurs, validité,
+numéros de ligne), et peut comparer les résultats à une
+référence enregistrée avec `--dump` (avant une modification des checks) :
+valeurs et validité doivent être identiques, les messages sont comparés au
+format des nombres près (0 / 0.00, 390.0 / 390.00).
+
+Usage:
+    PYTHONPATH=. uv run python scripts/bench_checks.py fiche.pdf [...] [--fiches 2000] [--dump ref.json]
+    PYTHONPATH=. uv run python scripts/bench_checks.py fiche.pdf [...] --reference ref.json
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+
+from src.checking import BatchChecks, run_batch_checks
+from src.checks import (
+    build_libelle_index,
+    check_allocations_familiales,
+    check_bases,
+    check_csg,
+    check_fiscal,
+    check_rgdu,
+)
+from src.checks.money import from_scaled
+from src.ingestion import extract_payslip_pages
+from src.models.check import CheckResult
+from src.models.payslip import FichePayeExtracted
+
+SMIC = 1823.03
+PLAFOND_SS = 4005.0
+
+# Déclinaisons de chaque fiche : facteur sur le brut et horaire mensuel
+FACTEURS_BRUT = ["0.55", "0.8", "1", "1.27", "1.9", "2.4", "3.1", "4.6", "7.3", "9.2"]
+HEURES = [None, "151.67", "120.00", "75.83", "169.00"]
+
+NOMBRE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _corpus(pdfs: list[Path], taille: int) -> list[FichePayeExtracted]:
+    modeles = [fiche for pdf in pdfs for fiche in extract_payslip_pages(pdf.read_bytes(), pdf.name)]
+    modeles = [fiche for fiche in modeles if fiche.totaux.salaire_brut is not None]
+    if not modeles:
+        sys.exit("Aucune fiche avec un salaire brut dans les PDF fournis")
+
+    fiches: list[FichePayeExtracted] = []
+    for position in range(taille):
+        fiche = modeles[position % len(modeles)].model_copy(deep=True)
+        facteur = Decimal(FACTEURS_BRUT[position // len(modeles) % len(FACTEURS_BRUT)])
+        heures = HEURES[position // (len(modeles) * len(FACTEURS_BRUT)) % len(HEURES)]
+        fiche.totaux.salaire_brut = (fiche.totaux.salaire_brut * facteur).quantize(Decimal("0.01"))
+        if heures is not None:
+            fiche.totaux.cumul_heures = Decimal(heures)
+        fiches.append(fiche)
+    return fiches
+
+
+def _checks(fiche: FichePayeExtracted) -> list[CheckResult]:
+    return [check_rgdu(fiche, SMIC, True), *_checks_lot(fiche)]
+
+
+def _checks_lot(fiche: FichePayeExtracted) -> list[CheckResult]:
+    """Checks repris par le moteur en lot (sans RGDU)."""
+    index = build_libelle_index(fiche)
+    return [
+        *check_bases(fiche, PLAFOND_SS, index),
+        check_fiscal(fiche, index),
+        check_csg(fiche, index),
+        check_allocations_familiales(fiche, SMIC, index),
+    ]
+
+
+def _decimal(value: object, scale: int) -> Decimal | None:
+    """Valeur entière de la table des résultats en lot (NA si absente) → Decimal."""
+    return None if pd.isna(value) else from_scaled(value, scale)
+
+
+def _ecarts_lot(batch: BatchChecks, resultats: list[list[CheckResult]]) -> int:
+    """Compare le moteur en lot aux checks fiche par fiche ; retourne le nombre d'écarts."""
+    ecarts = 0
+    lignes = batch.results.groupby("fiche")
+    for position, attendus in enumerate(resultats):
+        obtenus = lignes.get_group(position) if position in lignes.groups else batch.results.iloc[:0]
+        if len(attendus) != len(obtenus):
+            ecarts += 1
+            print(f"✗ fiche {position}: {len(attendus)} résultats attendus, {len(obtenus)} en lot")
+            continue
+        for attendu, obtenu in zip(attendus, obtenus.itertuples()):
+            echelle = int(obtenu.scale)
+            valeurs = {
+                "test_name": obtenu.test_name,
+                "valid": bool(obtenu.valid),
+                "is_line_error": bool(obtenu.is_line_error),
+                "line_number": None if pd.isna(obtenu.line_number) else obtenu.line_number,
+                "obtained_value": _decimal(obtenu.obtained, echelle),
+                "expected_value": _decimal(obtenu.expected, echelle),
+                "difference": _decimal(obtenu.difference, echelle),
+            }
+            for cle, valeur in valeurs.items():
+                if getattr(attendu, cle) != valeur:
+                    ecarts += 1
+                    print(f"✗ fiche {position} {attendu.test_name} {cle}: {getattr(attendu, cle)} != {valeur} (en lot)")
+                    break
+    return ecarts
+
+
+def _normaliser(message: str) -> str:
+    return NOMBRE.sub(lambda match: format(Decimal(match.group()).normalize(), "f"), message)
+
+
+def _comparer(reference: list[list[dict]], resultats: list[list[dict]]) -> tuple[int, int]:
+    """Retourne (écarts de valeurs, écarts de messages)."""
+    ecarts_valeurs = ecarts_messages = 0
+    for position, (attendus, obtenus) in enumerate(zip(reference, resultats)):
+        if len(attendus) != len(obtenus):
+            ecarts_valeurs += 1
+            print(f"✗ fiche {position}: {len(attendus)} résultats attendus, {len(obtenus)} obtenus")
+            continue
+        for attendu, obtenu in zip(attendus, obtenus):
+            for cle in ("test_name", "valid", "is_line_error", "line_number", "obtained_value", "expected_value", "difference"):
+                gauche, droite = attendu[cle], obtenu[cle]
+                if cle.endswith("value") or cle == "difference":
+                    gauche = None if gauche is None else Decimal(gauche)
+                    droite = None if droite is None else Decimal(droite)
+                if gauche != droite:
+                    ecarts_valeurs += 1
+                    print(f"✗ fiche {position} {attendu['test_name']} {cle}: {gauche} != {droite}")
+                    break
+            if _normaliser(attendu["message"]) != _normaliser(obtenu["message"]):
+                ecarts_messages += 1
+                if ecarts_messages <= 5:
+                    print(f"✗ fiche {position} {attendu['test_name']} message:\n    {attendu['message']}\n    {obtenu['message']}")
+    return ecarts_valeurs, ecarts_messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="+", type=Path, help="Fichiers PDF servant de modèles")
+    parser.add_argument("--fiches", type=int, default=2000, help="Taille du corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de passes")
+    parser.add_argument("--dump", type=Path, help="Enregistre les résultats (référence)")
+    parser.add_argument("--reference", type=Path, help="Compare les résultats à une référence")
+    args = parser.parse_args()
+
+    fiches = _corpus(args.pdfs, args.fiches)
+    nombre_lignes = sum(len(fiche.lignes) for fiche in fiches)
+    print(f"Corpus : {len(fiches)} fiches, {nombre_lignes} lignes")
+
+    durees = {"fiche par fiche": [], "fiche par fiche, sans RGDU": [], "en lot, sans RGDU": []}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        resultats = [_checks(fiche) for fiche in fiches]
+        durees["fiche par fiche"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        resultats_lot = [_checks_lot(fiche) for fiche in fiches]
+        durees["fiche par fiche, sans RGDU"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch = run_batch_checks(fiches, SMIC, PLAFOND_SS)
+        durees["en lot, sans RGDU"].append(time.perf_counter() - start)
+
+    print(f"\n{'Mode':<28} {'fiches / s':>12} {'µs / fiche':>12}")
+    medianes = {mode: statistics.median(valeurs) for mode, valeurs in durees.items()}
+    for mode, duree in medianes.items():
+        print(f"{mode:<28} {len(fiches) / duree:>12.0f} {duree / len(fiches) * 1e6:>12.1f}")
+    print(f"Gain du lot : x{medianes['fiche par fiche, sans RGDU'] / medianes['en lot, sans RGDU']:.2f}")
+
+    ecarts_lot = _ecarts_lot(batch, resultats_lot)
+    print(f"\nEn lot : {ecarts_lot} écart(s) avec les checks fiche par fiche")
+    if ecarts_lot:
+        sys.exit(1)
+
+    dumps = [[result.model_dump(mode="json") for result in results] for results in resultats]
+    if args.dump:
+        args.dump.write_text(json.dumps(dumps, ensure_ascii=False))
+        print(f"\nRéférence enregistrée : {args.dump}")
+    if args.reference:
+        ecarts_valeurs, ecarts_messages = _comparer(json.loads(args.reference.read_text()), dumps)
+        print(f"\n{ecarts_valeurs} écart(s) de valeurs, {ecarts_messages} écart(s) de messages")
+        sys.exit(1 if ecarts_valeurs or ecarts_messages else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark des profils d'extraction (full / totals / header).
+
+Mesure le temps moyen d'extraction par document pour chaque profil et
+vérifie que les champs utiles à /licenciementpdf sont identiques au profil full.
+Le profil full est aussi mesuré sans passe rapide (détection de tables
+directe), avec le nombre de documents résolus par chaque niveau.
+
+Usage:
+    PYTHONPATH=. uv run python scripts/bench_extraction.py fiche.pdf [autre.pdf ...] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from src.ingestion import ExtractionProfile, ExtractionTier, extract_payslip
+
+
+def _champs_licenciement(fiche) -> tuple:
+    return (
+        fiche.employe.date_entree,
+        fiche.employeur.convention_collective,
+        fiche.periode.mois,
+        fiche.periode.annee,
+        fiche.totaux.salaire_brut,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="+", type=Path, help="Fichiers PDF à extraire")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de passes par profil")
+    args = parser.parse_args()
+
+    contents = [pdf.read_bytes() for pdf in args.pdfs]
+    timings: dict[str, float] = {}
+    reference = [extract_payslip(content, tiered=False) for content in contents]
+
+    variants = [("full (tables)", ExtractionProfile.FULL, False)] + [
+        (profile.value, profile, True) for profile in ExtractionProfile
+    ]
+    for label, profile, tiered in variants:
+        durations = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fiches = [extract_payslip(content, profile=profile, tiered=tiered) for content in contents]
+            durations.append((time.perf_counter() - start) / len(contents))
+        timings[label] = statistics.median(durations)
+
+        if profile == ExtractionProfile.FULL and tiered:
+            for tier in ExtractionTier:
+                count = sum(fiche.extraction_tier == tier.value for fiche in fiches)
+                print(f"Profil full : {count} document(s) résolu(s) par le niveau {tier.value}")
+            ecarts = sum(
+                full.model_dump(exclude={"extraction_tier"}) != fiche.model_dump(exclude={"extraction_tier"})
+                for full, fiche in zip(reference, fiches)
+            )
+            print(f"Profil full : {ecarts} document(s) différents de la détection de tables directe")
+
+        if profile == ExtractionProfile.TOTALS:
+            ecarts = sum(
+                _champs_licenciement(full) != _champs_licenciement(fiche)
+                for full, fiche in zip(reference, fiches)
+            )
+            print(f"Profil totals : {ecarts} document(s) avec des champs licenciement différents du profil full")
+
+    print(f"\n{'Profil':<14} {'ms / document':>14} {'accélération':>13}")
+    full = timings["full (tables)"]
+    for label, duration in timings.items():
+        print(f"{label:<14} {duration * 1000:>14.1f} {full / duration:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
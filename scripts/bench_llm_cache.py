@@ -0,0 +1,152 @@
+"""
+Mesure du cache de contexte LLM sur le check de convention collective.
+
+Exécute `check_convention` sur les fiches des PDF fournis, avec le préfixe
+(instructions + convention) en cache chez le fournisseur puis en ligne, et
+compare les tokens d'entrée facturés au tarif plein et la latence jusqu'à
+la réponse. Par défaut, le fournisseur est simulé localement (tokens ≈
+caractères / 4, latence proportionnelle aux tokens à lire) : le script
+vérifie aussi la recréation à l'expiration, le repli en ligne quand la
+création du contexte échoue et la propagation des autres erreurs (quota). `--gemini` utilise l'API réelle (clé requise).
+
+Usage:
+    PYTHONPATH=. uv run python scripts/bench_llm_cache.py fiche.pdf [...]
+    PYTHONPATH=. uv run python scripts/bench_llm_cache.py fiche.pdf [...] --gemini
+"""
+
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.checks.convention import check_convention
+from src.checks.llm import CachedContextMissing, CachedPrefixLLM, GeminiBackend
+from src.ingestion import extract_payslip_pages
+from src.models.convention_check import ConventionCheckOutput
+
+# Simulation : latence de base et coût de lecture par token (plein / en cache)
+LATENCE_BASE = 0.02
+SECONDES_PAR_TOKEN = 2e-6
+SECONDES_PAR_TOKEN_CACHE = 2e-7
+TOKENS_MINIMUM_CACHE = 1024
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4
+
+
+@dataclass
+class _Usage:
+    prompt_token_count: int
+    cached_content_token_count: int | None
+
+
+@dataclass
+class _Response:
+    parsed: ConventionCheckOutput
+    usage_metadata: _Usage
+
+
+class FakeBackend:
+    """Fournisseur simulé : contextes en cache avec expiration, tokens et latence."""
+
+    def __init__(self, fail_create: bool = False, fail_generate: bool = False):
+        self.fail_create = fail_create
+        self.fail_generate = fail_generate
+        self.caches: dict[str, tuple[str, datetime]] = {}
+
+    async def create_cache(self, model: str, prefix: str, ttl_seconds: int) -> tuple[str, datetime]:
+        if self.fail_create or _tokens(prefix) < TOKENS_MINIMUM_CACHE:
+            raise RuntimeError("Création du contexte refusée")
+        name = f"cachedContents/{len(self.caches)}"
+        expire_time = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        self.caches[name] = (prefix, expire_time)
+        return name, expire_time
+
+    async def generate(self, model: str, contents: str, config: dict, cached_content: str | None = None):
+        if self.fail_generate:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        cached_tokens = 0
+        if cached_content is not None:
+            prefix, expire_time = self.caches.get(cached_content, ("", datetime.min.replace(tzinfo=timezone.utc)))
+            if datetime.now(timezone.utc) >= expire_time:
+                raise CachedContextMissing(cached_content)
+            cached_tokens = _tokens(prefix)
+        tokens = _tokens(contents)
+        await asyncio.sleep(LATENCE_BASE + tokens * SECONDES_PAR_TOKEN + cached_tokens * SECONDES_PAR_TOKEN_CACHE)
+        return _Response(
+            parsed=ConventionCheckOutput(warnings=[], resume="Simulation."),
+            usage_metadata=_Usage(tokens + cached_tokens, cached_tokens or None),
+        )
+
+
+async def _run(llm: CachedPrefixLLM, fiches: list) -> dict:
+    for fiche in fiches:
+        results = await check_convention(fiche, llm)
+        if any(result.message.startswith("Erreur") for result in results):
+            sys.exit(f"Échec du check : {results[0].message}")
+    return llm.stats()
+
+
+def _print(mode: str, stats: dict) -> None:
+    calls = stats["calls"] or 1
+    plein = (stats["prompt_tokens"] - stats["cached_tokens"]) / calls
+    print(
+        f"{mode:<22} {plein:>12.0f} {stats['cached_tokens'] / calls:>12.0f} "
+        f"{stats['mean_latency_seconds'] * 1000:>10.0f} {stats['cached_calls']:>6}/{stats['calls']}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="+", type=Path, help="Fichiers PDF de fiches de paie")
+    parser.add_argument("--gemini", action="store_true", help="Utilise l'API Gemini au lieu du fournisseur simulé")
+    args = parser.parse_args()
+
+    fiches = [fiche for pdf in args.pdfs for fiche in extract_payslip_pages(pdf.read_bytes(), pdf.name)]
+    print(f"{len(fiches)} fiche(s)\n")
+    print(f"{'Mode':<22} {'tokens plein':>12} {'tokens cache':>12} {'latence ms':>10} {'cache':>8}")
+
+    if args.gemini:
+        from src.config import gemini_settings
+
+        def backend():
+            return GeminiBackend(gemini_settings.CLIENT)
+        model = gemini_settings.GEMINI_MODEL_2_5_FLASH
+    else:
+        backend = FakeBackend
+        model = "simulation"
+
+    _print("préfixe en ligne", await _run(CachedPrefixLLM(backend(), model, enabled=False), fiches))
+    _print("contexte en cache", await _run(CachedPrefixLLM(backend(), model), fiches))
+
+    if not args.gemini:
+        # Création refusée : repli en ligne, sans nouvel essai avant le TTL
+        stats = await _run(CachedPrefixLLM(FakeBackend(fail_create=True), model), fiches)
+        _print("création en échec", stats)
+        assert stats["cache_failures"] == 1 and stats["inline_calls"] == stats["calls"]
+
+        # Contexte expiré côté fournisseur : repli en ligne, puis recréation
+        fake = FakeBackend()
+        llm = CachedPrefixLLM(fake, model)
+        await _run(llm, fiches[:1])
+        fake.caches = {name: (prefix, datetime.now(timezone.utc)) for name, (prefix, _) in fake.caches.items()}
+        stats = await _run(llm, fiches[:2] if len(fiches) > 1 else fiches * 2)
+        _print("expiration", stats)
+        assert stats["cache_creations"] == 2 and stats["inline_calls"] == 1
+
+        # Autre erreur (quota) sur l'appel avec contexte : propagée, sans second appel en ligne
+        fake = FakeBackend()
+        llm = CachedPrefixLLM(fake, model)
+        await _run(llm, fiches[:1])
+        fake.fail_generate = True
+        results = await check_convention(fiches[0], llm)
+        stats = llm.stats()
+        print(f"{'erreur propagée':<22} {results[0].message}")
+        assert results[0].is_transient and stats["inline_calls"] == 0 and stats["contexts"] == 1
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Mesure de la sérialisation compacte des fiches pour les prompts LLM.
+
+Compare, pour chaque fiche des PDF fournis, la taille de `compact_fiche`
+à celle de `model_dump_json(indent=2)`, en octets et en tokens (estimation
+mots + ponctuation). Le script échoue si la réduction totale passe sous
+`REDUCTION_MINIMALE`.
+
+Usage:
+    PYTHONPATH=. uv run python scripts/bench_prompt.py fiche.pdf [...]
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from src.checks.prompt import compact_fiche
+from src.ingestion import extract_payslip_pages
+
+# Estimation des tokens : mots et signes de ponctuation
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Réduction minimale attendue par rapport à model_dump_json(indent=2), en octets et en tokens
+REDUCTION_MINIMALE = 0.5
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="+", type=Path, help="Fichiers PDF à mesurer")
+    args = parser.parse_args()
+
+    totaux = {"json": [0, 0], "compact": [0, 0]}
+    print(f"{'Fiche':<28} {'octets json':>12} {'compact':>8} {'tokens json':>12} {'compact':>8}")
+    for pdf in args.pdfs:
+        for position, fiche in enumerate(extract_payslip_pages(pdf.read_bytes(), pdf.name), 1):
+            mesures = {
+                "json": fiche.model_dump_json(indent=2),
+                "compact": compact_fiche(fiche),
+            }
+            octets = {mode: len(texte.encode()) for mode, texte in mesures.items()}
+            tokens = {mode: len(TOKEN.findall(texte)) for mode, texte in mesures.items()}
+            for mode in totaux:
+                totaux[mode][0] += octets[mode]
+                totaux[mode][1] += tokens[mode]
+            print(
+                f"{f'{pdf.name} p{position}':<28} {octets['json']:>12} {octets['compact']:>8} "
+                f"{tokens['json']:>12} {tokens['compact']:>8}"
+            )
+
+    (octets_json, tokens_json), (octets_compact, tokens_compact) = totaux["json"], totaux["compact"]
+    if not octets_json:
+        sys.exit("Aucune fiche extraite des PDF fournis")
+    reduction_octets = 1 - octets_compact / octets_json
+    reduction_tokens = 1 - tokens_compact / tokens_json
+    print(
+        f"\nRéduction : {reduction_octets:.0%} des octets, "
+        f"{reduction_tokens:.0%} des tokens (estimation mots + ponctuation)"
+    )
+    if min(reduction_octets, reduction_tokens) < REDUCTION_MINIMALE:
+        sys.exit(f"✗ Réduction inférieure à {REDUCTION_MINIMALE:.0%}")
+    print(f"✓ Réduction d'au moins {REDUCTION_MINIMALE:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Parité des backends d'extraction (pdfplumber / PyMuPDF).
+
+Extrait chaque PDF du corpus avec les deux backends, compare les
+`FichePayeExtracted` produites champ par champ et affiche les écarts ainsi
+que le temps moyen par document. Le code de sortie est non nul si au moins
+un document diffère, pour pouvoir servir de garde-fou avant de changer
+`EXTRACTION_BACKEND` sur un déploiement.
+
+Usage:
+    PYTHONPATH=. uv run python scripts/parity_backends.py fiche.pdf dossier/ [...] [--pages]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from src.ingestion import BACKENDS, extract_payslip, extract_payslip_pages
+
+
+def _corpus(paths: list[Path]) -> list[Path]:
+    pdfs: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            pdfs.extend(sorted(path.rglob("*.pdf")))
+        else:
+            pdfs.append(path)
+    return pdfs
+
+
+def _diff(reference: Any, other: Any, path: str = "") -> list[str]:
+    """Liste les chemins des champs qui diffèrent entre deux dumps JSON."""
+    if isinstance(reference, dict) and isinstance(other, dict):
+        ecarts = []
+        for key in reference.keys() | other.keys():
+            ecarts.extend(_diff(reference.get(key), other.get(key), f"{path}.{key}" if path else key))
+        return ecarts
+    if isinstance(reference, list) and isinstance(other, list) and len(reference) == len(other):
+        ecarts = []
+        for index, (left, right) in enumerate(zip(reference, other)):
+            ecarts.extend(_diff(left, right, f"{path}[{index}]"))
+        return ecarts
+    if reference != other:
+        return [f"{path}: {reference!r} != {other!r}"]
+    return []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path, help="Fichiers PDF ou dossiers à comparer")
+    parser.add_argument("--pages", action="store_true", help="Un bulletin par page (comme /licenciementpdf)")
+    parser.add_argument("--reference", default="pdfplumber", choices=sorted(BACKENDS), help="Backend de référence")
+    args = parser.parse_args()
+
+    pdfs = _corpus(args.paths)
+    if not pdfs:
+        sys.exit("Aucun PDF trouvé")
+
+    timings = {name: 0.0 for name in BACKENDS}
+    documents_en_ecart = 0
+
+    for pdf in pdfs:
+        content = pdf.read_bytes()
+        dumps: dict[str, Any] = {}
+        for name in BACKENDS:
+            start = time.perf_counter()
+            if args.pages:
+                result = [fiche.model_dump(mode="json") for fiche in extract_payslip_pages(content, pdf.name, backend=name)]
+            else:
+                result = extract_payslip(content, pdf.name, backend=name).model_dump(mode="json")
+            timings[name] += time.perf_counter() - start
+            dumps[name] = result
+
+        reference = dumps[args.reference]
+        for name, dump in dumps.items():
+            if name == args.reference:
+                continue
+            ecarts = _diff(reference, dump)
+            if ecarts:
+                documents_en_ecart += 1
+                print(f"✗ {pdf} ({args.reference} ≠ {name}) : {len(ecarts)} écart(s)")
+                for ecart in ecarts[:20]:
+                    print(f"    {ecart}")
+            else:
+                print(f"✓ {pdf}")
+
+    print(f"\n{'Backend':<12} {'ms / document':>14}")
+    for name, total in timings.items():
+        print(f"{name:<12} {total / len(pdfs) * 1000:>14.1f}")
+    print(f"\n{len(pdfs) - documents_en_ecart}/{len(pdfs)} document(s) identiques")
+
+    sys.exit(1 if documents_en_ecart else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 """Application FastAPI principale."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.app.api import router
+from src.app.service.pool import extraction_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arrête le pool d'extraction à l'arrêt du worker."""
+    yield
+    extraction_pool.shutdown()
+
 
 app = FastAPI(
     title="Extracteur de Fiches de Paie",
     description="API pour extraire les données des bulletins de salaire PDF",
     version="0.1.0",
+    lifespan=lifespan,
 )
 app.add_middleware(
       CORSMiddleware,
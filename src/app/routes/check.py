@@ -3,31 +3,50 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
 from src.models.check import CheckReport
+from src.app.service.check import check_cache
+from src.checks.frappe import frappe_memo
+from src.checks.llm import default_llm
 from src.app.service.scan import scan_payslip
+from src.app.service.pool import PoolSaturatedError
 from src.checking import run_checks
 
 router = APIRouter()
 
 
+def _parse_names(value: str | None) -> list[str] | None:
+    """Découpe une liste de noms de checks séparés par des virgules."""
+    if value is None or not value.strip():
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
 @router.post("/check", response_model=CheckReport)
 async def check(
     file: UploadFile = File(...),
-    smic_mensuel: float = Form(...),
+    smic_mensuel: float | None = Form(default=None),
     effectif_50_et_plus: bool = Form(...),
-    plafond_ss: float = Form(...),
+    plafond_ss: float | None = Form(default=None),
     include_frappe_check: bool = Form(default=False),
     include_analyse_llm: bool = Form(default=False),
+    include: str | None = Form(default=None),
+    exclude: str | None = Form(default=None),
+    verbosity: str = Form(default="full"),
 ) -> CheckReport:
     """
     Vérifie une fiche de paie PDF et retourne un rapport de contrôle.
 
     Args:
         file: Fichier PDF à analyser.
-        smic_mensuel: SMIC mensuel brut en vigueur (ex: 1823.03).
+        smic_mensuel: SMIC mensuel brut (ex: 1823.03). Par défaut, celui du mois du bulletin.
         effectif_50_et_plus: True si l'entreprise a 50 salariés ou plus.
-        plafond_ss: Plafond de la Sécurité Sociale en vigueur (4005).
+        plafond_ss: Plafond de la Sécurité Sociale (ex: 4005). Par défaut, celui du mois du bulletin.
         include_frappe_check: Si True, inclut le check des fautes de frappe via LLM.
         include_analyse_llm: Si True, inclut l'analyse de cohérence avec la convention collective via LLM.
+        include: Checks à exécuter, séparés par des virgules (ex: "rgdu,bases").
+            Par défaut, tous les checks déterministes plus les checks LLM activés.
+        exclude: Checks à ne pas exécuter, séparés par des virgules.
+        verbosity: Détail du rapport : "full" (tous les checks), "failures"
+            (checks en échec) ou "summary" (checks en échec, sans message).
 
     Returns:
         CheckReport: Rapport avec les résultats de tous les tests de vérification.
@@ -44,11 +63,30 @@ async def check(
             plafond_ss,
             include_frappe_check,
             include_analyse_llm,
+            include=_parse_names(include),
+            exclude=_parse_names(exclude),
+            verbosity=verbosity,
+            cache=check_cache,
         )
 
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la vérification: {e}")
+
+
+@router.get("/check/cache")
+async def check_cache_status() -> dict:
+    """
+    Retourne les compteurs du cache des résultats de checks de ce worker.
+
+    Returns:
+        dict: Compteurs des résultats déterministes et LLM (entrées, hits, miss,
+            durée de vie), du mémo des verdicts de fautes de frappe et du cache
+            de contexte Gemini (appels, tokens, latence).
+    """
+    return {**check_cache.stats(), "frappe": frappe_memo.stats(), "llm_context": default_llm().stats()}
@@ -3,7 +3,8 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 
 from src.models.payslip import FichePayeExtracted
-from src.app.service.scan import scan_payslip
+from src.app.service.scan import extraction_cache, scan_payslip
+from src.app.service.pool import PoolSaturatedError, extraction_pool
 
 router = APIRouter()
 
@@ -21,9 +22,33 @@ async def extract(file: UploadFile = File(...)) -> FichePayeExtracted:
     """
     try:
         return await scan_payslip(file)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors du traitement: {e}")
+
+
+@router.get("/extraction/pool")
+async def extraction_pool_status() -> dict:
+    """
+    Retourne l'état du pool d'extraction de ce worker.
+
+    Returns:
+        dict: Processus, extractions en cours, saturation et compteurs.
+    """
+    return extraction_pool.stats()
+
+
+@router.get("/extraction/cache")
+async def extraction_cache_status() -> dict:
+    """
+    Retourne les compteurs du cache d'extraction de ce worker.
+
+    Returns:
+        dict: Entrées en mémoire, hits mémoire/disque, miss et taux de hit.
+    """
+    return extraction_cache.stats()
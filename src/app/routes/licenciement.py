@@ -1,9 +1,6 @@
 """Route de calcul d'indemnité de licenciement et rupture conventionnelle."""
 
-from io import BytesIO
-
 from fastapi import APIRouter, HTTPException, UploadFile, File
-import fitz  # PyMuPDF
 
 from src.models.licenciement import (
     LicenciementInput,
@@ -14,7 +11,9 @@ from src.models.licenciement import (
     ConventionCollective,
 )
 from src.services.licenciement import calculer_indemnite_licenciement
-from src.app.service.scan import scan_payslip
+from src.app.service.scan import scan_payslip_pages
+from src.ingestion import ExtractionProfile
+from src.app.service.pool import PoolSaturatedError
 
 router = APIRouter()
 
@@ -142,54 +141,32 @@ async def extraire_donnees_licenciement(
     convention_collective = ConventionCollective.AUCUNE
 
     try:
-        # Lire le PDF
-        pdf_content = await file.read()
-        pdf_document = fitz.open(stream=pdf_content, filetype="pdf")
-
-        # Extraire chaque page comme une fiche potentielle
+        # Lire le PDF et extraire chaque page comme une fiche potentielle
         # Note: On suppose une fiche par page, mais on pourrait améliorer la détection
-        for page_num in range(len(pdf_document)):
-            try:
-                # Créer un PDF d'une seule page
-                single_page_pdf = fitz.open()
-                single_page_pdf.insert_pdf(pdf_document, from_page=page_num, to_page=page_num)
-
-                # Convertir en bytes
-                pdf_bytes = single_page_pdf.tobytes()
-                single_page_pdf.close()
-
-                # Créer un UploadFile fictif pour scan_payslip
-                from starlette.datastructures import UploadFile as StarletteUploadFile
-
-                fake_file = StarletteUploadFile(
-                    file=BytesIO(pdf_bytes),
-                    filename=f"page_{page_num + 1}.pdf",
-                )
-
-                # Extraire la fiche
-                fiche = await scan_payslip(fake_file)  # type: ignore
-
-                # Récupérer la date d'entrée (on prend la première trouvée)
-                if date_entree is None and fiche.employe.date_entree:
-                    date_entree = fiche.employe.date_entree
+        # Seuls l'en-tête et le brut sont utiles ici : pas de détection de tables
+        pdf_content = await file.read()
+        fiches = await scan_payslip_pages(pdf_content, file.filename, profile=ExtractionProfile.TOTALS)
 
-                # Récupérer la convention collective (on prend la première trouvée)
-                if convention_brute is None and fiche.employeur.convention_collective:
-                    convention_brute = fiche.employeur.convention_collective
-                    convention_collective = _detect_convention_collective(convention_brute)
+        for page_num, fiche in enumerate(fiches):
+            if not fiche.extraction_success:
+                errors.extend(f"Erreur page {page_num + 1}: {e}" for e in fiche.extraction_errors)
 
-                # Récupérer le salaire brut si disponible
-                if fiche.totaux.salaire_brut and fiche.periode.mois and fiche.periode.annee:
-                    salaires_extraits.append(SalaireMensuel(
-                        mois=fiche.periode.mois,
-                        annee=fiche.periode.annee,
-                        salaire_brut=fiche.totaux.salaire_brut,
-                    ))
+            # Récupérer la date d'entrée (on prend la première trouvée)
+            if date_entree is None and fiche.employe.date_entree:
+                date_entree = fiche.employe.date_entree
 
-            except Exception as e:
-                errors.append(f"Erreur page {page_num + 1}: {str(e)}")
+            # Récupérer la convention collective (on prend la première trouvée)
+            if convention_brute is None and fiche.employeur.convention_collective:
+                convention_brute = fiche.employeur.convention_collective
+                convention_collective = _detect_convention_collective(convention_brute)
 
-        pdf_document.close()
+            # Récupérer le salaire brut si disponible
+            if fiche.totaux.salaire_brut and fiche.periode.mois and fiche.periode.annee:
+                salaires_extraits.append(SalaireMensuel(
+                    mois=fiche.periode.mois,
+                    annee=fiche.periode.annee,
+                    salaire_brut=fiche.totaux.salaire_brut,
+                ))
 
         # Trier les salaires par date (du plus récent au plus ancien)
         salaires_extraits.sort(key=lambda s: (s.annee, s.mois), reverse=True)
@@ -211,6 +188,8 @@ async def extraire_donnees_licenciement(
             nombre_fiches_extraites=len(salaires_extraits),
         )
 
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         return LicenciementPdfExtraction(
             extraction_success=False,
@@ -0,0 +1,13 @@
+"""Service de vérification des fiches de paie."""
+
+from pathlib import Path
+
+from src.config import app_settings
+from src.checking import CheckCache
+
+check_cache = CheckCache(
+    max_entries=app_settings.CHECK_CACHE_SIZE,
+    db_path=Path(app_settings.CACHE_DIR) / "cache.sqlite3" if app_settings.CACHE_DIR else None,
+    ttl=app_settings.CHECK_CACHE_TTL or None,
+    llm_ttl=app_settings.CHECK_LLM_CACHE_TTL or None,
+)
@@ -0,0 +1,156 @@
+"""Pool de processus pour l'extraction des fiches de paie."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from src.config import app_settings
+
+T = TypeVar("T")
+
+
+class PoolSaturatedError(RuntimeError):
+    """Levée quand la file d'attente du pool d'extraction est pleine."""
+
+
+class PoolBrokenError(PoolSaturatedError):
+    """Levée quand le pool reste inutilisable après sa recréation (traitée comme une saturation : 503)."""
+
+
+class ExtractionPool:
+    """
+    Pool de processus borné pour les extractions PDF.
+
+    L'extraction (pdfplumber) est synchrone et gourmande en CPU : exécutée
+    directement dans une route async, elle bloque toute la boucle d'événements
+    du worker uvicorn. Ce pool l'exécute dans des processus dédiés et limite
+    le nombre de tâches en cours ou en attente : au-delà, les nouvelles
+    demandes sont refusées plutôt que mises en file indéfiniment.
+
+    Si un processus meurt (segfault MuPDF, OOM kill), l'executor est cassé :
+    il est arrêté puis recréé au prochain usage, et le travail est relancé
+    une fois.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        if max_workers < 1:
+            raise ValueError("Le pool d'extraction doit avoir au moins un processus")
+        if max_pending < max_workers:
+            raise ValueError("La file d'attente doit pouvoir contenir au moins un travail par processus")
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._restarts = 0
+
+    @property
+    def pending(self) -> int:
+        """Nombre d'extractions en cours ou en attente."""
+        return self._pending
+
+    @property
+    def available(self) -> int:
+        """Nombre de places libres dans la file d'attente."""
+        return max(0, self.max_pending - self._pending)
+
+    @property
+    def saturated(self) -> bool:
+        """True si la file d'attente est pleine."""
+        return self._pending >= self.max_pending
+
+    def stats(self) -> dict[str, Any]:
+        """Retourne l'état courant du pool."""
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "saturated": self.saturated,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "restarts": self._restarts,
+        }
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Exécute `func(*args)` dans un processus du pool et attend le résultat.
+
+        `func` et ses arguments doivent être picklables (fonction de module).
+
+        Raises:
+            PoolSaturatedError: Si la file d'attente est pleine.
+            PoolBrokenError: Si le pool est encore cassé après sa recréation.
+        """
+        if self.saturated:
+            self._rejected += 1
+            raise PoolSaturatedError(
+                f"Pool d'extraction saturé ({self._pending}/{self.max_pending} extractions en cours)"
+            )
+
+        try:
+            return await self._submit(func, *args)
+        except BrokenProcessPool:
+            # Un processus est mort : le pool vient d'être écarté, le travail est relancé une fois
+            try:
+                return await self._submit(func, *args)
+            except BrokenProcessPool as err:
+                raise PoolBrokenError("Pool d'extraction indisponible (processus arrêtés)") from err
+
+    async def _submit(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+        self._pending += 1
+
+        # La place n'est libérée qu'à la fin réelle du travail, même si la
+        # requête qui l'a soumis a été annulée entre-temps.
+        def _release(_: Future) -> None:
+            loop.call_soon_threadsafe(self._release)
+
+        future.add_done_callback(_release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def shutdown(self) -> None:
+        """Arrête les processus du pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # Arrête un executor cassé; _get_executor en recréera un (une seule fois par panne)
+        if self._executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._restarts += 1
+
+    def _release(self) -> None:
+        self._pending -= 1
+        self._completed += 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Création paresseuse : chaque worker uvicorn démarre son propre pool
+        # au premier usage. "spawn" évite de dupliquer la boucle asyncio du parent.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+
+extraction_pool = ExtractionPool(
+    max_workers=app_settings.EXTRACTION_WORKERS,
+    max_pending=app_settings.EXTRACTION_MAX_PENDING,
+)
@@ -1,39 +1,148 @@
 """Service de scan des fiches de paie."""
 
-import tempfile
+import asyncio
 from pathlib import Path
+
 from fastapi import UploadFile
+from src.config import app_settings
 from src.models.payslip import FichePayeExtracted
-from src.ingestion import extract_payslip
+from src.ingestion import (
+    ExtractionCache,
+    ExtractionProfile,
+    count_pdf_pages,
+    extract_payslip,
+    extract_payslip_pages,
+    split_pages,
+)
+from src.app.service.pool import PoolSaturatedError, extraction_pool
+
+extraction_cache = ExtractionCache(
+    max_entries=app_settings.EXTRACTION_CACHE_SIZE,
+    db_path=Path(app_settings.CACHE_DIR) / "cache.sqlite3" if app_settings.CACHE_DIR else None,
+)
 
 
-async def scan_payslip(file: UploadFile) -> FichePayeExtracted:
+async def scan_payslip(
+    file: UploadFile,
+    profile: ExtractionProfile = ExtractionProfile.FULL,
+) -> FichePayeExtracted:
     """
     Scanne une fiche de paie PDF uploadée et extrait les données.
 
     Args:
         file: Fichier PDF uploadé via FastAPI.
+        profile: Profil d'extraction (défaut: full).
 
     Returns:
         FichePayeExtracted: Les données structurées extraites du bulletin.
 
     Raises:
         ValueError: Si le fichier n'est pas un PDF.
+        PoolSaturatedError: Si le pool d'extraction est saturé.
     """
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise ValueError("Le fichier doit être un PDF")
 
-    # Sauvegarder temporairement le fichier pour pdfplumber
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
-
-    try:
-        result = extract_payslip(tmp_path)
-        # Remplacer le chemin temporaire par le nom original
-        result.source_file = file.filename
-        return result
-    finally:
-        # Nettoyer le fichier temporaire
-        tmp_path.unlink(missing_ok=True)
+    content = await file.read()
+
+    # Un même bulletin est souvent envoyé successivement à plusieurs routes
+    backend = app_settings.EXTRACTION_BACKEND
+    cache_key = extraction_cache.key(content, profile, backend)
+    cached = await asyncio.to_thread(extraction_cache.get, cache_key, file.filename)
+    if cached is not None:
+        return cached
+
+    # L'extraction est exécutée hors de la boucle d'événements, directement
+    # depuis le contenu en mémoire (pas de fichier temporaire)
+    result = await extraction_pool.run(extract_payslip, content, file.filename, profile, backend)
+    await asyncio.to_thread(extraction_cache.put, cache_key, result)
+    return result
+
+
+async def scan_payslip_pages(
+    content: bytes,
+    filename: str | None = None,
+    parallel: bool = app_settings.EXTRACTION_PARALLEL_PAGES,
+    profile: ExtractionProfile = ExtractionProfile.FULL,
+) -> list[FichePayeExtracted]:
+    """
+    Scanne un PDF contenant un bulletin par page.
+
+    En mode séquentiel, le PDF est ouvert une seule fois et chaque page est
+    parsée en place. En mode parallèle, les pages sont réparties en groupes
+    contigus sur les processus libres du pool, puis les fiches sont remises
+    dans l'ordre des pages.
+
+    Args:
+        content: Contenu du PDF.
+        filename: Nom du fichier d'origine, reporté dans `source_file`.
+        parallel: Si True, répartit les pages sur plusieurs processus.
+        profile: Profil d'extraction appliqué à chaque page (défaut: full).
+
+    Returns:
+        Liste des fiches extraites, dans l'ordre des pages.
+
+    Raises:
+        ValueError: Si le contenu n'est pas un PDF.
+        PoolSaturatedError: Si le pool d'extraction est saturé.
+    """
+    backend = app_settings.EXTRACTION_BACKEND
+    cache_key = extraction_cache.key(content, profile, backend)
+    cached = await asyncio.to_thread(extraction_cache.get_pages, cache_key, filename)
+    if cached is not None:
+        return cached
+
+    failed = False
+    if parallel:
+        fiches, failed = await _extract_pages_parallel(content, filename, profile, backend)
+    else:
+        fiches = await extraction_pool.run(extract_payslip_pages, content, filename, None, profile, backend)
+
+    # Un groupe de pages en échec (processus tué, erreur transitoire) ne doit pas rester en cache
+    if not failed:
+        await asyncio.to_thread(extraction_cache.put_pages, cache_key, fiches)
+    return fiches
+
+
+async def _extract_pages_parallel(
+    content: bytes,
+    filename: str | None,
+    profile: ExtractionProfile,
+    backend: str,
+) -> tuple[list[FichePayeExtracted], bool]:
+    """
+    Répartit l'extraction des pages sur le pool et fusionne les résultats.
+
+    Returns:
+        (fiches dans l'ordre des pages, True si au moins un groupe a levé une exception).
+    """
+    page_count = await asyncio.to_thread(count_pdf_pages, content, backend)
+    if page_count == 0:
+        return [], False
+
+    # Pas plus de groupes que de processus ni de places libres dans la file
+    groups = split_pages(page_count, min(extraction_pool.max_workers, extraction_pool.available))
+    results = await asyncio.gather(
+        *(extraction_pool.run(extract_payslip_pages, content, filename, pages, profile, backend) for pages in groups),
+        return_exceptions=True,
+    )
+
+    fiches: list[FichePayeExtracted] = []
+    failed = False
+    for pages, result in zip(groups, results):
+        if isinstance(result, PoolSaturatedError):
+            raise result
+        if isinstance(result, BaseException):
+            failed = True
+            # Un groupe en échec n'invalide pas les autres : erreur reportée page par page
+            fiches.extend(
+                FichePayeExtracted(
+                    source_file=filename,
+                    extraction_success=False,
+                    extraction_errors=[f"Erreur extraction page {index + 1}: {result}"],
+                )
+                for index in pages
+            )
+        else:
+            fiches.extend(result)
+    return fiches, failed
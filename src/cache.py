@@ -0,0 +1,216 @@
+"""
+Cache à deux niveaux pour les résultats coûteux.
+
+- Niveau mémoire : LRU borné, propre à chaque processus.
+- Niveau disque : base SQLite locale (mode WAL), partagée par tous les
+  workers uvicorn d'une même machine.
+
+Les valeurs sont des chaînes (JSON sérialisé par l'appelant). Les lignes
+SQLite sont indexées par version : pendant un déploiement progressif, les
+workers de l'ancienne et de la nouvelle version ne se marchent pas dessus.
+Les lignes d'une autre version ne sont purgées qu'une fois inactives depuis
+`version_grace` secondes.
+
+Une durée de vie (ttl) optionnelle fait expirer les entrées dans les deux
+niveaux. La base est bornée : les lignes plus anciennes que `max_age` et,
+au-delà de `max_rows` lignes par espace de noms, les plus anciennes sont
+supprimées (à l'ouverture puis toutes les `EVICTION_INTERVAL` écritures).
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+# Nombre d'écritures entre deux passes d'éviction sur disque
+EVICTION_INTERVAL = 256
+
+
+class TieredCache:
+    """
+    Cache clé/valeur avec LRU en mémoire et persistance SQLite.
+
+    Args:
+        namespace: Espace de noms des entrées dans la base (ex: "extraction").
+        version: Version courante des valeurs; change quand le code qui les produit change.
+        max_entries: Taille maximale du LRU en mémoire (0 pour le désactiver).
+        db_path: Chemin de la base SQLite, ou None pour un cache uniquement en mémoire.
+        ttl: Durée de vie des entrées en secondes, ou None pour ne jamais les expirer.
+        max_rows: Nombre maximal de lignes sur disque pour cet espace de noms (None : sans limite).
+        max_age: Âge maximal des lignes sur disque, en secondes (None : sans limite).
+        version_grace: Délai avant la purge des lignes d'une autre version, en secondes.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        version: str,
+        max_entries: int = 256,
+        db_path: str | Path | None = None,
+        ttl: float | None = None,
+        max_rows: int | None = 100_000,
+        max_age: float | None = 30 * 86400,
+        version_grace: float = 3600,
+    ):
+        self.namespace = namespace
+        self.version = version
+        self.max_entries = max_entries
+        self.db_path = Path(db_path) if db_path else None
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.version_grace = version_grace
+        self._writes = 0
+
+        # Valeur et date de création de chaque entrée
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> str | None:
+        """Retourne la valeur associée à la clé, ou None si absente."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._fresh(entry[1]):
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+
+            row = self._disk_get(key)
+            if row is not None:
+                self._memory_put(key, *row)
+                self.disk_hits += 1
+                return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        """Enregistre une valeur dans les deux niveaux."""
+        with self._lock:
+            created_at = time.time()
+            self._memory_put(key, value, created_at)
+            self._disk_put(key, value, created_at)
+
+    def clear(self) -> None:
+        """Vide les deux niveaux pour cet espace de noms."""
+        with self._lock:
+            self._memory.clear()
+            db = self._connect()
+            if db is not None:
+                with db:
+                    db.execute(
+                        "DELETE FROM entries WHERE namespace = ? AND version = ?",
+                        (self.namespace, self.version),
+                    )
+
+    def stats(self) -> dict[str, Any]:
+        """Retourne les compteurs de hits/miss du cache."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "version": self.version,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "persistent": self.db_path is not None,
+            "max_rows": self.max_rows,
+            "ttl": self.ttl,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+        }
+
+    def _fresh(self, created_at: float) -> bool:
+        return self.ttl is None or time.time() - created_at < self.ttl
+
+    def _memory_put(self, key: str, value: str, created_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> tuple[str, float] | None:
+        db = self._connect()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT value, created_at FROM entries WHERE namespace = ? AND version = ? AND key = ?",
+            (self.namespace, self.version, key),
+        ).fetchone()
+        if row is None or not self._fresh(row[1]):
+            return None
+        return row[0], row[1]
+
+    def _disk_put(self, key: str, value: str, created_at: float) -> None:
+        db = self._connect()
+        if db is None:
+            return
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries (namespace, version, key, value, created_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, self.version, key, value, created_at),
+            )
+        self._writes += 1
+        if self._writes % EVICTION_INTERVAL == 0:
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Supprime les lignes expirées, celles des versions inactives et l'excédent au-delà de max_rows."""
+        now = time.time()
+        with db:
+            # Autres versions : purgées quand plus aucun worker ne les écrit depuis version_grace
+            db.execute(
+                "DELETE FROM entries WHERE namespace = ? AND version IN ("
+                " SELECT version FROM entries WHERE namespace = ? AND version != ?"
+                " GROUP BY version HAVING MAX(created_at) < ?)",
+                (self.namespace, self.namespace, self.version, now - self.version_grace),
+            )
+            # Lignes trop anciennes (ou expirées selon le ttl, devenues illisibles)
+            ages = [age for age in (self.max_age, self.ttl) if age is not None]
+            if ages:
+                db.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND created_at < ?",
+                    (self.namespace, now - min(ages)),
+                )
+            if self.max_rows is not None:
+                db.execute(
+                    "DELETE FROM entries WHERE rowid IN ("
+                    " SELECT rowid FROM entries WHERE namespace = ?"
+                    " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.max_rows),
+                )
+
+    def _connect(self) -> sqlite3.Connection | None:
+        # Connexion ouverte paresseusement, dans le processus qui l'utilise
+        if self.db_path is None:
+            return None
+        if self._db is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            with db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    " namespace TEXT NOT NULL,"
+                    " version TEXT NOT NULL,"
+                    " key TEXT NOT NULL,"
+                    " value TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " PRIMARY KEY (namespace, version, key))"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS entries_age ON entries (namespace, created_at)")
+            self._evict(db)
+            self._db = db
+        return self._db
@@ -1,5 +1,7 @@
 """Package de vérification des fiches de paie."""
 
+from .cache import CheckCache
 from .checker import run_checks
+from .batch import BatchChecks, run_batch_checks
 
-__all__ = ["run_checks"]
+__all__ = ["CheckCache", "run_checks", "BatchChecks", "run_batch_checks"]
@@ -0,0 +1,165 @@
+"""
+Cache des résultats de checks, check par check.
+
+La clé d'un résultat combine l'empreinte de la fiche extraite (SHA-256 de
+son JSON, hors `source_file`), le nom du check et, pour les checks qui les
+lisent, les paramètres de l'appel (SMIC, effectif, plafond SS). La version
+du cache est calculée à partir du code des checks (`src/checks`), des
+modèles et de `convention.md` (et, pour les résultats LLM, du modèle
+Gemini) : toute modification invalide les entrées.
+
+Les messages différés (`CheckResult.lazy`) sont stockés sous forme de
+gabarit et de paramètres, et formatés à la lecture seulement si le message
+est renvoyé : la mise en cache ne formate aucun message.
+
+Les résultats déterministes et les résultats LLM sont dans deux espaces de
+noms, avec chacun sa durée de vie : une réponse LLM peut être rafraîchie
+sans recalculer le reste. Les résultats provisoires (échec d'appel LLM) ne
+sont jamais mis en cache.
+"""
+
+import hashlib
+import json
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from src.cache import TieredCache
+from src.checks.convention import CONVENTION_FILE
+from src.config import gemini_settings
+from src.checks.registry import CheckContext, CheckSpec
+from src.models.check import CheckResult
+from src.models.payslip import FichePayeExtracted
+
+
+def _checks_version() -> str:
+    """Empreinte du code des checks, des modèles et de la convention collective."""
+    src_dir = Path(__file__).parent.parent
+    sources = sorted((src_dir / "checks").glob("*.py")) + [
+        src_dir / "models" / "check.py",
+        src_dir / "models" / "payslip.py",
+        CONVENTION_FILE,
+    ]
+
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+CHECKS_VERSION = _checks_version()
+
+# Résultats LLM : invalidés aussi par un changement de modèle
+CHECKS_LLM_VERSION = hashlib.sha256(f"{CHECKS_VERSION}|{gemini_settings.GEMINI_MODEL_2_5_FLASH}".encode()).hexdigest()[:16]
+
+# Les paramètres des messages différés gardent leurs Decimal (formats "{:.2%}", "{:.2f}")
+_DECIMAL = "__decimal__"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {_DECIMAL: str(value)}
+    raise TypeError(f"Valeur non sérialisable : {type(value).__name__}")
+
+
+def _json_object(value: dict[str, Any]) -> Any:
+    return Decimal(value[_DECIMAL]) if value.keys() == {_DECIMAL} else value
+
+
+def _dump_results(results: list[CheckResult]) -> str:
+    """Sérialise des résultats sans formater les messages différés."""
+    entries = []
+    for result in results:
+        deferred = result.deferred_message
+        if deferred is None:
+            entries.append({"result": result.model_dump(mode="json")})
+        else:
+            template, params = deferred
+            entries.append({
+                "result": result.model_dump(mode="json", exclude={"message"}),
+                "template": template,
+                "params": params,
+            })
+    return json.dumps(entries, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+
+def _load_results(payload: str) -> list[CheckResult]:
+    """Résultats d'une entrée du cache (messages différés reconstruits, formatés à la lecture)."""
+    results = []
+    for entry in json.loads(payload, object_hook=_json_object):
+        if "template" in entry:
+            fields = CheckResult.model_validate(entry["result"]).model_dump()
+            results.append(CheckResult.lazy(entry["template"], entry["params"], **fields))
+        else:
+            results.append(CheckResult.model_validate(entry["result"]))
+    return results
+
+
+class CheckCache:
+    """
+    Cache des `CheckResult` par fiche, check et paramètres.
+
+    Args:
+        max_entries: Taille maximale de chaque LRU en mémoire.
+        db_path: Chemin de la base SQLite partagée, ou None (mémoire uniquement).
+        ttl: Durée de vie des résultats déterministes, en secondes (None : sans expiration).
+        llm_ttl: Durée de vie des résultats LLM, en secondes (None : sans expiration).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        db_path: str | Path | None = None,
+        ttl: float | None = None,
+        llm_ttl: float | None = 86400,
+    ):
+        self._deterministic = TieredCache("checks", CHECKS_VERSION, max_entries, db_path, ttl)
+        self._llm = TieredCache("checks_llm", CHECKS_LLM_VERSION, max_entries, db_path, llm_ttl)
+
+    @staticmethod
+    def fingerprint(fiche: FichePayeExtracted) -> str:
+        """Empreinte du contenu de la fiche (le nom du fichier n'en fait pas partie)."""
+        return hashlib.sha256(fiche.model_dump_json(exclude={"source_file"}).encode()).hexdigest()
+
+    @staticmethod
+    def key(fingerprint: str, spec: CheckSpec, ctx: CheckContext) -> str:
+        """Clé d'un check : les paramètres n'en font partie que si le check les lit."""
+        if "parametres" in spec.inputs:
+            return f"{fingerprint}:{spec.name}:{ctx.smic_mensuel}:{ctx.effectif_50_et_plus}:{ctx.plafond_ss}"
+        return f"{fingerprint}:{spec.name}"
+
+    def _tier(self, spec: CheckSpec) -> TieredCache:
+        return self._llm if spec.is_llm else self._deterministic
+
+    def get_many(self, fingerprint: str, specs: list[CheckSpec], ctx: CheckContext) -> dict[str, list[CheckResult]]:
+        """Résultats en cache des checks demandés, par nom de check."""
+        found: dict[str, list[CheckResult]] = {}
+        for spec in specs:
+            payload = self._tier(spec).get(self.key(fingerprint, spec, ctx))
+            if payload is not None:
+                found[spec.name] = _load_results(payload)
+        return found
+
+    def put_many(
+        self,
+        fingerprint: str,
+        specs: list[CheckSpec],
+        ctx: CheckContext,
+        results: dict[str, list[CheckResult]],
+    ) -> None:
+        """Met en cache les résultats des checks (sauf résultats provisoires)."""
+        for spec in specs:
+            spec_results = results[spec.name]
+            if any(result.is_transient for result in spec_results):
+                continue
+            self._tier(spec).put(self.key(fingerprint, spec, ctx), _dump_results(spec_results))
+
+    def clear(self) -> None:
+        """Vide le cache."""
+        self._deterministic.clear()
+        self._llm.clear()
+
+    def stats(self) -> dict:
+        """Retourne les compteurs des deux niveaux (déterministe et LLM)."""
+        return {"deterministic": self._deterministic.stats(), "llm": self._llm.stats()}
@@ -1,77 +1,115 @@
 """Service de vérification des fiches de paie."""
 
+import asyncio
+
 from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckReport, CheckResult
-from src.checks import (
-    check_rgdu,
-    check_bases,
-    check_fiscal,
-    check_csg,
-    check_allocations_familiales,
-    check_frappe,
-    check_convention,
-)
+from src.checks.registry import CheckContext, CheckSpec, resolve_checks
+
+from .cache import CheckCache
+
+
+# Niveaux de détail du rapport :
+# - full : tous les checks, avec leur message
+# - failures : checks en échec uniquement, avec leur message
+# - summary : checks en échec uniquement, sans message (compteurs et valeurs)
+VERBOSITIES = ("full", "failures", "summary")
+
+
+def _run_deterministic_checks(specs: list[CheckSpec], ctx: CheckContext) -> list[list[CheckResult]]:
+    """Exécute les étapes déterministes dans l'ordre du registre (dépendances d'abord)."""
+    return [spec.runner(ctx) for spec in specs]
 
 
 async def run_checks(
     fiche: FichePayeExtracted,
-    smic_mensuel: float,
+    smic_mensuel: float | None,
     effectif_50_et_plus: bool,
-    plafond_ss: float,
+    plafond_ss: float | None,
     include_frappe_check: bool = False,
     include_analyse_llm: bool = False,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    verbosity: str = "full",
+    cache: CheckCache | None = None,
 ) -> CheckReport:
     """
     Exécute tous les tests de vérification sur une fiche de paie.
 
     Args:
         fiche: Fiche de paie extraite.
-        smic_mensuel: SMIC mensuel en vigueur.
+        smic_mensuel: SMIC mensuel. Si None, celui de la période du bulletin
+            (voir `src.checks.parametres`).
         effectif_50_et_plus: True si entreprise >= 50 salariés.
-        plafond_ss: Plafond de la Sécurité Sociale en vigueur.
+        plafond_ss: Plafond de la Sécurité Sociale. Si None, celui de la période du bulletin.
         include_frappe_check: Si True, inclut le check des fautes de frappe via LLM.
         include_analyse_llm: Si True, inclut l'analyse de cohérence convention collective via LLM.
+        include: Checks à exécuter (noms du registre). Si None, tous les checks
+            déterministes plus les checks LLM activés ci-dessus.
+        exclude: Checks à ne pas exécuter.
+        verbosity: Détail du rapport (voir VERBOSITIES). Les compteurs portent
+            toujours sur tous les checks exécutés ; les messages ne sont
+            formatés que pour les checks renvoyés.
+        cache: Cache des résultats. Les checks déjà en cache pour cette fiche
+            et ces paramètres ne sont pas relancés.
 
     Returns:
         CheckReport avec les résultats de tous les tests.
-    """
-    results: list[CheckResult] = []
-
-    # Test RGDU
-    results.append(check_rgdu(fiche, smic_mensuel, effectif_50_et_plus))
 
-    # Test des bases de cotisations (T1/T2/TA/TB/APEC)
-    results.extend(check_bases(fiche, plafond_ss))
+    Raises:
+        ValueError: Si un nom de check ou le niveau de détail est inconnu, ou si
+            la période du bulletin précède la table des paramètres sans que
+            le SMIC ou le plafond nécessaire soit fourni.
+    """
+    if verbosity not in VERBOSITIES:
+        raise ValueError(f"Verbosité inconnue : {verbosity} (disponibles : {', '.join(VERBOSITIES)})")
 
-    # Test fiscal (reconstruction du net imposable)
-    results.append(check_fiscal(fiche))
+    llm = [name for name, enabled in (("frappe", include_frappe_check), ("convention", include_analyse_llm)) if enabled]
+    specs = resolve_checks(include, exclude, include_llm=llm)
+    ctx = CheckContext(fiche, smic_mensuel, effectif_50_et_plus, plafond_ss)
+    reported = [spec for spec in specs if spec.reported]
 
-    # Test CSG (reconstruction de la base CSG)
-    results.append(check_csg(fiche))
+    # Résultats en cache : seuls les checks manquants (et leurs dépendances) sont exécutés
+    by_name: dict[str, list[CheckResult]] = {}
+    if cache is not None:
+        fingerprint = cache.fingerprint(fiche)
+        by_name = await asyncio.to_thread(cache.get_many, fingerprint, reported, ctx)
+        specs = resolve_checks([spec.name for spec in reported if spec.name not in by_name])
 
-    # Test allocations familiales (taux plein vs réduit)
-    results.append(check_allocations_familiales(fiche, smic_mensuel))
+    # Les étapes déterministes (CPU, sans I/O) tournent dans un thread pendant
+    # que les checks LLM, indépendants entre eux, sont lancés en parallèle
+    deterministic = [spec for spec in specs if not spec.is_llm]
+    llm_specs = [spec for spec in specs if spec.is_llm]
+    outputs = await asyncio.gather(
+        asyncio.to_thread(_run_deterministic_checks, deterministic, ctx),
+        *(spec.runner(ctx) for spec in llm_specs),
+    )
+    computed = dict(zip((spec.name for spec in deterministic), outputs[0]))
+    computed.update(zip((spec.name for spec in llm_specs), outputs[1:]))
+    by_name.update(computed)
 
-    # Test fautes de frappe via LLM (optionnel)
-    if include_frappe_check:
-        frappe_results = await check_frappe(fiche)
-        results.extend(frappe_results)
+    if cache is not None:
+        await asyncio.to_thread(cache.put_many, fingerprint, [spec for spec in specs if spec.reported], ctx, computed)
 
-    # Analyse cohérence convention collective via LLM (optionnel)
-    if include_analyse_llm:
-        convention_results = await check_convention(fiche)
-        results.extend(convention_results)
+    # Résultats dans l'ordre du registre : déterministes, frappe, convention
+    results: list[CheckResult] = [result for spec in reported for result in by_name[spec.name]]
 
     # Compiler les stats
     passed = sum(1 for r in results if r.valid)
     failed = len(results) - passed
+    total = len(results)
+
+    if verbosity != "full":
+        results = [r for r in results if not r.valid]
+    if verbosity == "summary":
+        results = [r.without_message() for r in results]
 
     return CheckReport(
         source_file=fiche.source_file,
         extraction_success=fiche.extraction_success,
         checks=results,
         all_valid=failed == 0,
-        total_checks=len(results),
+        total_checks=total,
         passed_checks=passed,
         failed_checks=failed,
     )
@@ -1,13 +1,21 @@
-from .rgdu import calculer_rgdu, check_rgdu
+from .rgdu import calculer_reduction_fillon, calculer_rgdu, calculer_rgdu_batch, check_rgdu
 from .bases import check_bases
 from .fiscal import check_fiscal
 from .csg import check_csg
 from .allocations_familiales import check_allocations_familiales
 from .frappe import check_frappe
 from .convention import check_convention
+from .convention_index import ConventionIndex
+from .prompt import compact_fiche
+from .typo import TypoDetector, detect_typos
+from .classification import LibelleIndex, build_libelle_index, classify_libelle
+from .parametres import PARAMETRES, ParametresPeriode, parametres_mois, parametres_periode
+from .registry import CHECKS, CheckContext, CheckSpec, register, resolve_checks
 
 __all__ = [
+    "calculer_reduction_fillon",
     "calculer_rgdu",
+    "calculer_rgdu_batch",
     "check_rgdu",
     "check_bases",
     "check_fiscal",
@@ -15,4 +23,20 @@ __all__ = [
     "check_allocations_familiales",
     "check_frappe",
     "check_convention",
+    "ConventionIndex",
+    "compact_fiche",
+    "TypoDetector",
+    "detect_typos",
+    "LibelleIndex",
+    "build_libelle_index",
+    "classify_libelle",
+    "PARAMETRES",
+    "ParametresPeriode",
+    "parametres_mois",
+    "parametres_periode",
+    "CHECKS",
+    "CheckContext",
+    "CheckSpec",
+    "register",
+    "resolve_checks",
 ]
\ No newline at end of file
@@ -16,71 +16,61 @@ from decimal import Decimal
 
 from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckResult
+from src.checks.classification import LibelleIndex, build_libelle_index
+from src.checks.money import ceil_cents, from_rate, to_cents, to_rate, within
+from src.checks.parametres import parametres_periode
 
 
 # Numéros de lignes standards
 LIGNE_ALLOC_FAM = "20400"
 LIGNE_ALLOC_FAM_SUP = "20700"
 
-# Lignes d'allègement RGDU (Réduction Générale)
-LIGNES_ALLEGEMENT_RGDU = [
-    "73576",  # Allègement RGDU
-    "73500",  # Réduction générale
-    "73570",  # RGDU
-    "73575",  # Allègement général
-]
-
-# Patterns pour détecter l'allègement RGDU par libellé
-PATTERNS_ALLEGEMENT_RGDU = [
-    "allègement rgdu",
-    "allegement rgdu",
-    "réduction générale",
-    "reduction generale",
-    "rgdu",
-    "allègement cotisations",
-    "allegement cotisations",
-]
-
 # Taux
 TAUX_REDUIT = Decimal("3.45")
 TAUX_SUPPLEMENT = Decimal("1.80")
 TAUX_PLEIN = TAUX_REDUIT + TAUX_SUPPLEMENT  # 5.25%
 
-# Seuil
-SEUIL_SMIC_MULTIPLE = Decimal("3.5")
-
-TOLERANCE = Decimal("0.01")  # Tolérance sur les taux
-
-
-def _has_allegement_rgdu(fiche: FichePayeExtracted) -> bool:
+TOLERANCE = 100  # Tolérance sur les taux, en dix-millièmes de point (0.01%)
+
+# Messages (formatés à la demande)
+PLEIN = "Brut ({brut}€) >= {multiple} SMIC ({seuil}€): "
+REDUIT = "Brut ({brut}€) < {multiple} SMIC ({seuil}€): "
+MESSAGE_SUPPLEMENT_MANQUANT = (
+    PLEIN + "le supplément allocations familiales ({supplement}%) devrait être appliqué. Ligne {ligne} non trouvée."
+)
+MESSAGE_SUPPLEMENT_TAUX = PLEIN + "taux supplément attendu {supplement}%, obtenu {taux_sup}%."
+MESSAGE_TAUX_PLEIN = PLEIN + "taux plein correctement appliqué (base {taux_base}% + supplément {taux_sup}%)."
+MESSAGE_SUPPLEMENT_COMPENSE = (
+    REDUIT + "supplément {taux_sup}% affiché sur ligne {ligne}, mais compensé par l'allègement RGDU. Présentation valide."
+)
+MESSAGE_SUPPLEMENT_INDU = (
+    REDUIT + "le supplément allocations familiales ne devrait PAS être appliqué. "
+    "Surtaxe employeur de {taux_sup}% détectée sur ligne {ligne} et aucun allègement RGDU pour compenser."
+)
+MESSAGE_TAUX_REDUIT = REDUIT + "taux réduit correctement appliqué ({taux_base}%), pas de supplément."
+
+
+def _has_allegement_rgdu(fiche: FichePayeExtracted, index: LibelleIndex) -> bool:
     """
     Vérifie si la fiche contient une ligne d'allègement RGDU.
 
     L'allègement RGDU est un "fourre-tout" négatif qui récupère les surtaxes
     (allocations familiales 1.80%, maladie 6%, etc.) pour les salaires < 3.5 SMIC.
     """
-    for numero, ligne in fiche.lignes.items():
-        # Vérifier par numéro de ligne connu
-        if numero in LIGNES_ALLEGEMENT_RGDU:
-            # L'allègement doit avoir un montant patronal négatif
-            if ligne.montant_patronal and ligne.montant_patronal < 0:
-                return True
-
-        # Vérifier par pattern dans le libellé
-        libelle_lower = ligne.libelle.lower()
-        for pattern in PATTERNS_ALLEGEMENT_RGDU:
-            if pattern in libelle_lower:
-                # L'allègement doit avoir un montant patronal négatif
-                if ligne.montant_patronal and ligne.montant_patronal < 0:
-                    return True
-                break
+    # Lignes reconnues par numéro ou par libellé (voir `classification`)
+    for numero in index.lines("allegement"):
+        ligne = fiche.lignes[numero]
+        # L'allègement doit avoir un montant patronal négatif
+        if ligne.montant_patronal and ligne.montant_patronal < 0:
+            return True
 
     return False
 
 
 def check_allocations_familiales(
     fiche: FichePayeExtracted,
-    smic_mensuel: float,
+    smic_mensuel: float | None,
+    index: LibelleIndex | None = None,
 ) -> CheckResult:
     """
     Vérifie la cohérence des taux d'allocations familiales.
@@ -93,7 +83,8 @@ def check_allocations_familiales(
 
     Args:
         fiche: Fiche de paie extraite.
-        smic_mensuel: SMIC mensuel en vigueur.
+        smic_mensuel: SMIC mensuel. Si None, celui de la période du bulletin.
+        index: Classification des libellés de la fiche (calculée si absente).
 
     Returns:
         CheckResult avec le résultat de la vérification.
@@ -112,10 +103,11 @@ def check_allocations_familiales(
             message="Impossible de vérifier les allocations familiales: salaire brut non trouvé.",
         )
 
-    # Calculer le seuil 3.5 SMIC
-    smic = Decimal(str(smic_mensuel))
-    seuil = smic * SEUIL_SMIC_MULTIPLE
-    depasse_seuil = brut >= seuil
+    # Calculer le seuil (3.5 SMIC), avec les paramètres de la période du bulletin
+    parametres = parametres_periode(fiche.periode)
+    smic = Decimal(str(parametres.smic(smic_mensuel)))
+    seuil = smic * parametres.seuil_alloc_fam_smic
+    depasse_seuil = to_cents(brut) >= ceil_cents(seuil)
 
     # Récupérer la ligne allocations familiales de base
     ligne_base = fiche.lignes.get(LIGNE_ALLOC_FAM)
@@ -131,13 +123,25 @@ def check_allocations_familiales(
         taux_sup_obtenu = ligne_sup.taux_patronal
 
     # Vérifier si un allègement RGDU existe
-    has_rgdu = _has_allegement_rgdu(fiche)
+    has_rgdu = _has_allegement_rgdu(fiche, index or build_libelle_index(fiche))
+
+    params = {
+        "brut": brut,
+        "seuil": seuil,
+        "multiple": parametres.seuil_alloc_fam_smic,
+        "supplement": TAUX_SUPPLEMENT,
+        "ligne": LIGNE_ALLOC_FAM_SUP,
+        "taux_base": taux_base_obtenu,
+        "taux_sup": taux_sup_obtenu,
+    }
 
     # Vérification
     if depasse_seuil:
         # Doit avoir le supplément
         if not has_supplement:
-            return CheckResult(
+            return CheckResult.lazy(
+                MESSAGE_SUPPLEMENT_MANQUANT,
+                params,
                 test_name="allocations_familiales",
                 valid=False,
                 is_line_error=True,
@@ -145,31 +149,27 @@ def check_allocations_familiales(
                 obtained_value=None,
                 expected_value=TAUX_SUPPLEMENT,
                 difference=None,
-                message=(
-                    f"Brut ({brut}€) >= 3.5 SMIC ({seuil}€): "
-                    f"le supplément allocations familiales ({TAUX_SUPPLEMENT}%) devrait être appliqué. "
-                    f"Ligne {LIGNE_ALLOC_FAM_SUP} non trouvée."
-                ),
             )
 
         # Vérifier le taux du supplément
-        if taux_sup_obtenu is not None and abs(taux_sup_obtenu - TAUX_SUPPLEMENT) > TOLERANCE:
-            return CheckResult(
+        ecart_sup = None if taux_sup_obtenu is None else to_rate(taux_sup_obtenu) - to_rate(TAUX_SUPPLEMENT)
+        if ecart_sup is not None and not within(ecart_sup, TOLERANCE):
+            return CheckResult.lazy(
+                MESSAGE_SUPPLEMENT_TAUX,
+                params,
                 test_name="allocations_familiales",
                 valid=False,
                 is_line_error=True,
                 line_number=LIGNE_ALLOC_FAM_SUP,
                 obtained_value=taux_sup_obtenu,
                 expected_value=TAUX_SUPPLEMENT,
-                difference=taux_sup_obtenu - TAUX_SUPPLEMENT,
-                message=(
-                    f"Brut ({brut}€) >= 3.5 SMIC ({seuil}€): "
-                    f"taux supplément attendu {TAUX_SUPPLEMENT}%, obtenu {taux_sup_obtenu}%."
-                ),
+                difference=from_rate(ecart_sup),
             )
 
         # Tout est OK avec taux plein
-        return CheckResult(
+        return CheckResult.lazy(
+            MESSAGE_TAUX_PLEIN,
+            params,
             test_name="allocations_familiales",
             valid=True,
             is_line_error=False,
@@ -177,10 +177,6 @@ def check_allocations_familiales(
             obtained_value=taux_sup_obtenu,
             expected_value=TAUX_SUPPLEMENT,
             difference=Decimal("0") if taux_sup_obtenu else None,
-            message=(
-                f"Brut ({brut}€) >= 3.5 SMIC ({seuil}€): "
-                f"taux plein correctement appliqué (base {taux_base_obtenu}% + supplément {taux_sup_obtenu}%)."
-            ),
         )
 
     else:
@@ -189,7 +185,9 @@ def check_allocations_familiales(
         if has_supplement and taux_sup_obtenu and taux_sup_obtenu > 0:
             if has_rgdu:
                 # La surtaxe est présente mais sera compensée par l'allègement RGDU
-                return CheckResult(
+                return CheckResult.lazy(
+                    MESSAGE_SUPPLEMENT_COMPENSE,
+                    params,
                     test_name="allocations_familiales",
                     valid=True,
                     is_line_error=False,
@@ -197,15 +195,12 @@ def check_allocations_familiales(
                     obtained_value=taux_sup_obtenu,
                     expected_value=TAUX_REDUIT,
                     difference=None,
-                    message=(
-                        f"Brut ({brut}€) < 3.5 SMIC ({seuil}€): "
-                        f"supplément {taux_sup_obtenu}% affiché sur ligne {LIGNE_ALLOC_FAM_SUP}, "
-                        f"mais compensé par l'allègement RGDU. Présentation valide."
-                    ),
                 )
             else:
                 # Pas d'allègement RGDU → la surtaxe est une vraie erreur
-                return CheckResult(
+                return CheckResult.lazy(
+                    MESSAGE_SUPPLEMENT_INDU,
+                    params,
                     test_name="allocations_familiales",
                     valid=False,
                     is_line_error=True,
@@ -213,16 +208,12 @@ def check_allocations_familiales(
                     obtained_value=taux_sup_obtenu,
                     expected_value=Decimal("0"),
                     difference=taux_sup_obtenu,
-                    message=(
-                        f"Brut ({brut}€) < 3.5 SMIC ({seuil}€): "
-                        f"le supplément allocations familiales ne devrait PAS être appliqué. "
-                        f"Surtaxe employeur de {taux_sup_obtenu}% détectée sur ligne {LIGNE_ALLOC_FAM_SUP} "
-                        f"et aucun allègement RGDU pour compenser."
-                    ),
                 )
 
         # Tout est OK avec taux réduit
-        return CheckResult(
+        return CheckResult.lazy(
+            MESSAGE_TAUX_REDUIT,
+            params,
             test_name="allocations_familiales",
             valid=True,
             is_line_error=False,
@@ -230,8 +221,4 @@ def check_allocations_familiales(
             obtained_value=taux_base_obtenu,
             expected_value=TAUX_REDUIT,
             difference=Decimal("0") if taux_base_obtenu else None,
-            message=(
-                f"Brut ({brut}€) < 3.5 SMIC ({seuil}€): "
-                f"taux réduit correctement appliqué ({taux_base_obtenu}%), pas de supplément."
-            ),
         )
@@ -13,97 +13,120 @@ IMPORTANT: La détection T1/T2 est PRIORITAIRE sur APEC.
 Si une ligne contient "APEC T1", c'est la règle T1 qui s'applique, pas la règle APEC globale.
 """
 
-import re
 from decimal import Decimal
 
 from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckResult
+from src.checks.classification import LibelleIndex, build_libelle_index
+from src.checks.money import from_cents, prorate, to_cents, within
+from src.checks.parametres import parametres_periode
 
 
-# Patterns pour identifier les tranches
-# Note: On utilise (?:\b|_|\s) après T1/T2 pour gérer les variantes T1_1, T2 1, etc.
-PATTERNS_T1 = [
-    r"\bT1(?:\b|_|\s)",  # T1, T1_1, T1 1, etc.
-    r"\bTA\b",
-    r"\btranche\s*1\b",
-    r"\btranche\s*A\b",
-    r"\bsur\s+T1(?:\b|_|\s)",
-    r"\bsur\s+TA\b",
-]
-
-PATTERNS_T2 = [
-    r"\bT2(?:\b|_|\s)",  # T2, T2_1, T2 1, etc.
-    r"\bTB\b",
-    r"\btranche\s*2\b",
-    r"\btranche\s*B\b",
-    r"\bsur\s+T2(?:\b|_|\s)",
-    r"\bsur\s+TB\b",
-]
-
-PATTERNS_APEC = [
-    r"\bAPEC\b",
-]
-
-PATTERNS_PREVOYANCE = [
-    r"\bprév",
-    r"\bmut",
-    r"\bsanté",
-]
-
 HEURES_TEMPS_PLEIN = Decimal("151.67")
-TOLERANCE = Decimal("0.50")  # Tolérance de 50 centimes pour les arrondis
-
-
-def _match_pattern(libelle: str, patterns: list[str]) -> bool:
-    """Vérifie si le libellé correspond à un des patterns."""
-    for pattern in patterns:
-        if re.search(pattern, libelle, re.IGNORECASE):
-            return True
-    return False
-
-
-def _get_tranche_type(libelle: str) -> str | None:
-    """
-    Détermine le type de tranche à partir du libellé.
-
-    IMPORTANT: La détection T1/T2 est PRIORITAIRE.
-    - "APEC T1 Cadre" → t1 (pas apec_global)
-    - "APEC T2 Cadre" → apec_t2 (règle spéciale APEC jusqu'à 4 plafonds)
-    - "APEC Cadre" (sans T1/T2) → apec_global
+TOLERANCE = 50  # Tolérance de 50 centimes pour les arrondis
+
+# Taille maximale des tableaux de bits de la somme de sous-ensemble (lignes × centimes,
+# 1 Mo) ; au-delà, seules les combinaisons d'une ou deux lignes sont cherchées
+SOUS_ENSEMBLE_MAX_BITS = 8_000_000
+
+# Formules par type de tranche, pour le message (formaté à la demande)
+FORMULES = {
+    "t1": "MIN(plafond_proratisé={plafond}€, brut={brut}€)",
+    "t2_retraite": "MAX(0, MIN(brut={brut}€, 8×plafond={plafond_8x}€) - plafond={plafond}€)",
+    "t2_prevoyance": "MAX(0, MIN(brut={brut}€, 4×plafond={plafond_4x}€) - plafond={plafond}€)",
+    "apec_t2": "APEC T2: MAX(0, MIN(brut={brut}€, 4×plafond={plafond_4x}€) - plafond={plafond}€)",
+    "apec_global": "APEC Global: MIN(brut={brut}€, 4×plafond={plafond_4x}€)",
+}
+FORMULE_FRACTIONNEE = "Base fractionnée validée : {base}€ + {detail} = {attendue}€"
+
+
+def _message(formule: str) -> str:
+    return (
+        "Ligne {numero} ({libelle}): "
+        "type={tranche_type}, heures={heures}h, plafond_proratisé={plafond}€. "
+        "Formule: " + formule + " = {attendue}€. "
+        "Valeur sur fiche: {base}€. "
+        "Écart: {difference}€."
+    )
+
+
+MESSAGES = {tranche_type: _message(formule) for tranche_type, formule in FORMULES.items()}
+MESSAGE_FRACTIONNEE = _message(FORMULE_FRACTIONNEE)
+MESSAGE_INCONNUE = _message("formule inconnue")
+
+
+def find_split_complement(
+    manquant: int,
+    candidats: list[tuple[str, int]],
+) -> tuple[str, ...] | None:
     """
-    is_apec = _match_pattern(libelle, PATTERNS_APEC)
-    is_t1 = _match_pattern(libelle, PATTERNS_T1)
-    is_t2 = _match_pattern(libelle, PATTERNS_T2)
-    is_prevoyance = _match_pattern(libelle, PATTERNS_PREVOYANCE)
-
-    # Cas APEC avec split T1/T2
-    if is_apec:
-        if is_t1:
-            return "t1"  # APEC T1 → règle T1 classique
-        if is_t2:
-            return "apec_t2"  # APEC T2 → règle spéciale (4 plafonds max)
-        # APEC sans T1/T2 → règle globale
-        return "apec_global"
+    Cherche les lignes dont la somme des bases couvre le montant manquant.
+
+    Une ligne unique est cherchée d'abord (cas le plus courant, deux lignes
+    fractionnées). Sinon, somme de sous-ensemble en centimes, à TOLERANCE
+    près : les sommes atteignables sont tenues dans un entier utilisé comme
+    tableau de bits (bit k = somme de k centimes atteignable), borné au
+    manquant + tolérance, avec une copie par ligne pour retrouver la
+    combinaison. Temps et mémoire sont proportionnels à lignes × manquant
+    en centimes (environ 250 Ko par ligne pour 20 000 €) : au-delà de
+    SOUS_ENSEMBLE_MAX_BITS, seules les paires de lignes sont cherchées
+    (temps quadratique en nombre de lignes, sans dépendre du montant).
 
-    # T1/TA classique (prioritaire)
-    if is_t1:
-        return "t1"
-
-    # T2 avec distinction prévoyance vs retraite
-    if is_t2:
-        if is_prevoyance:
-            return "t2_prevoyance"  # TB → 4 plafonds max
-        return "t2_retraite"  # T2 retraite → 8 plafonds max
+    Args:
+        manquant: Base attendue moins la base de la ligne vérifiée, en centimes.
+        candidats: (numéro, base en centimes) des autres lignes du même type, dans l'ordre de la fiche.
 
-    return None
+    Returns:
+        Numéros des lignes complémentaires, ou None.
+    """
+    tolerance = TOLERANCE
+    cible = manquant
+    plafond = cible + tolerance
+    candidats = [(numero, base) for numero, base in candidats if 0 < base <= plafond]
+
+    # Une seule ligne complémentaire
+    for numero, base in candidats:
+        if abs(base - cible) <= tolerance:
+            return (numero,)
+
+    if len(candidats) * (plafond + 1) > SOUS_ENSEMBLE_MAX_BITS:
+        # Deux lignes complémentaires
+        for premier, (numero, base) in enumerate(candidats):
+            for autre, autre_base in candidats[premier + 1:]:
+                if abs(base + autre_base - cible) <= tolerance:
+                    return numero, autre
+        return None
+
+    # Sommes atteignables après chaque ligne, pour retrouver la combinaison
+    masque = (1 << (plafond + 1)) - 1
+    atteignables = [1]
+    for _, base in candidats:
+        precedentes = atteignables[-1]
+        atteignables.append((precedentes | (precedentes << base)) & masque)
+
+    somme = next(
+        (s for s in range(max(0, cible - tolerance), plafond + 1) if atteignables[-1] >> s & 1),
+        None,
+    )
+    if somme is None:
+        return None
+
+    # Remontée : une ligne n'est retenue que si la somme n'est pas atteignable sans elle
+    complements: list[str] = []
+    for position in range(len(candidats), 0, -1):
+        if not atteignables[position - 1] >> somme & 1:
+            numero, base = candidats[position - 1]
+            complements.append(numero)
+            somme -= base
+    return tuple(reversed(complements))
 
 
 def _calculer_base_attendue(
     tranche_type: str,
-    brut: Decimal,
-    plafond_proratise: Decimal,
-) -> Decimal:
-    """Calcule la base attendue selon le type de tranche."""
+    brut: int,
+    plafond_proratise: int,
+) -> int:
+    """Calcule la base attendue (en centimes) selon le type de tranche."""
     if tranche_type == "t1":
         # T1/TA (et APEC T1): MIN(plafond_proratisé, brut)
         return min(plafond_proratise, brut)
@@ -111,42 +134,47 @@ def _calculer_base_attendue(
     elif tranche_type == "t2_retraite":
         # T2 Retraite: MAX(0, MIN(brut, 8×plafond) - plafond)
         plafond_8x = plafond_proratise * 8
-        return max(Decimal("0"), min(brut, plafond_8x) - plafond_proratise)
+        return max(0, min(brut, plafond_8x) - plafond_proratise)
 
     elif tranche_type == "t2_prevoyance":
         # TB/T2 Prévoyance: MAX(0, MIN(brut, 4×plafond) - plafond)
         plafond_4x = plafond_proratise * 4
-        return max(Decimal("0"), min(brut, plafond_4x) - plafond_proratise)
+        return max(0, min(brut, plafond_4x) - plafond_proratise)
 
     elif tranche_type == "apec_t2":
         # APEC T2: MAX(0, MIN(brut, 4×plafond) - plafond)
         # Même règle que t2_prevoyance (4 plafonds max pour APEC)
         plafond_4x = plafond_proratise * 4
-        return max(Decimal("0"), min(brut, plafond_4x) - plafond_proratise)
+        return max(0, min(brut, plafond_4x) - plafond_proratise)
 
     elif tranche_type == "apec_global":
         # APEC Global (sans split T1/T2): MIN(brut, 4×plafond)
         plafond_4x = plafond_proratise * 4
         return min(brut, plafond_4x)
 
-    return Decimal("0")
+    return 0
 
 
 def check_bases(
     fiche: FichePayeExtracted,
-    plafond_ss: float,
+    plafond_ss: float | None,
+    index: LibelleIndex | None = None,
 ) -> list[CheckResult]:
     """
     Vérifie les bases de cotisations d'une fiche de paie.
 
     Args:
         fiche: Fiche de paie extraite.
-        plafond_ss: Plafond de la Sécurité Sociale mensuel (ex: 4005).
+        plafond_ss: Plafond de la Sécurité Sociale mensuel (ex: 4005). Si None, celui
+            de la période du bulletin.
+        index: Classification des libellés de la fiche (calculée si absente).
 
     Returns:
         Liste de CheckResult pour chaque ligne vérifiée.
     """
     results: list[CheckResult] = []
+    if index is None:
+        index = build_libelle_index(fiche)
 
     # Récupérer le brut
     brut = fiche.totaux.salaire_brut
@@ -168,14 +196,26 @@ def check_bases(
     if heures is None or heures == 0:
         heures = HEURES_TEMPS_PLEIN
 
-    # Proratiser le plafond
-    plafond_decimal = Decimal(str(plafond_ss))
-    ratio_heures = heures / HEURES_TEMPS_PLEIN
-    plafond_proratise = (plafond_decimal * ratio_heures).quantize(Decimal("0.01"))
+    # Proratiser le plafond (calcul en centimes)
+    if plafond_ss is None:
+        plafond_ss = parametres_periode(fiche.periode).plafond()
+    brut_cents = to_cents(brut)
+    plafond_cents = prorate(to_cents(plafond_ss), heures, HEURES_TEMPS_PLEIN)
+    plafond_proratise = from_cents(plafond_cents)
+    parametres = {
+        "brut": brut,
+        "heures": heures,
+        "plafond": plafond_proratise,
+        "plafond_4x": from_cents(plafond_cents * 4),
+        "plafond_8x": from_cents(plafond_cents * 8),
+    }
+
+    # Bases en centimes des lignes de chaque type de tranche (pour les bases fractionnées)
+    bases_par_tranche: dict[str, list[tuple[str, int]]] = {}
 
     # Parcourir toutes les lignes
     for numero, ligne in fiche.lignes.items():
-        tranche_type = _get_tranche_type(ligne.libelle)
+        tranche_type = index.tranche_type(numero)
 
         if tranche_type is None:
             # Pas une ligne de tranche, on skip
@@ -196,64 +236,52 @@ def check_bases(
             continue
 
         # Calculer la base attendue
-        base_attendue = _calculer_base_attendue(tranche_type, brut, plafond_proratise)
-        difference = ligne.base - base_attendue
-        valid = abs(difference) <= TOLERANCE
-
-        # Variables pour la gestion des bases fractionnées (cas Apprenti)
-        is_split = False
-        complement_line = ""
-        complement_base = Decimal("0")
+        base_cents = to_cents(ligne.base)
+        attendue_cents = _calculer_base_attendue(tranche_type, brut_cents, plafond_cents)
+        difference_cents = base_cents - attendue_cents
+        valid = within(difference_cents, TOLERANCE)
 
         # Gestion des bases fractionnées (cas de l'Apprenti)
-        # Si la base est inférieure à l'attendu, chercher une ligne complémentaire du même type
-        if not valid and ligne.base < base_attendue:
-            for other_num, other_line in fiche.lignes.items():
-                if other_num == numero:
-                    continue
-                # Vérifier si c'est le même type de tranche
-                if _get_tranche_type(other_line.libelle) != tranche_type:
-                    continue
-                if other_line.base is None:
-                    continue
-                # Vérifier si la somme des deux bases correspond à l'attendu
-                somme_bases = ligne.base + other_line.base
-                if abs(somme_bases - base_attendue) <= TOLERANCE:
-                    valid = True
-                    is_split = True
-                    difference = Decimal("0")
-                    complement_line = other_num
-                    complement_base = other_line.base
-                    break
-
-        # Construire le message explicatif
-        if is_split:
-            formule = (
-                f"Base fractionnée validée : {ligne.base}€ + {complement_base}€ "
-                f"(ligne {complement_line}) = {base_attendue}€"
+        # Si la base est inférieure à l'attendu, chercher des lignes complémentaires
+        # du même type dont la somme des bases comble l'écart (2, 3 lignes ou plus)
+        complements: tuple[str, ...] | None = None
+        if not valid and base_cents < attendue_cents:
+            if tranche_type not in bases_par_tranche:
+                bases_par_tranche[tranche_type] = [
+                    (other_num, to_cents(fiche.lignes[other_num].base))
+                    for other_num in index.lines(tranche_type)
+                    if fiche.lignes[other_num].base is not None
+                ]
+            candidats = [(n, base) for n, base in bases_par_tranche[tranche_type] if n != numero]
+            complements = find_split_complement(attendue_cents - base_cents, candidats)
+            if complements:
+                valid = True
+                difference_cents = 0
+
+        base_attendue = from_cents(attendue_cents)
+        difference = from_cents(difference_cents)
+
+        # Message explicatif, formaté seulement s'il est renvoyé
+        params = {
+            **parametres,
+            "numero": numero,
+            "libelle": ligne.libelle,
+            "tranche_type": tranche_type,
+            "attendue": base_attendue,
+            "base": ligne.base,
+            "difference": difference,
+        }
+        if complements:
+            params["detail"] = " + ".join(
+                f"{fiche.lignes[other_num].base}€ (ligne {other_num})" for other_num in complements
             )
-        elif tranche_type == "t1":
-            formule = f"MIN(plafond_proratisé={plafond_proratise}€, brut={brut}€)"
-        elif tranche_type == "t2_retraite":
-            formule = f"MAX(0, MIN(brut={brut}€, 8×plafond={plafond_proratise*8}€) - plafond={plafond_proratise}€)"
-        elif tranche_type == "t2_prevoyance":
-            formule = f"MAX(0, MIN(brut={brut}€, 4×plafond={plafond_proratise*4}€) - plafond={plafond_proratise}€)"
-        elif tranche_type == "apec_t2":
-            formule = f"APEC T2: MAX(0, MIN(brut={brut}€, 4×plafond={plafond_proratise*4}€) - plafond={plafond_proratise}€)"
-        elif tranche_type == "apec_global":
-            formule = f"APEC Global: MIN(brut={brut}€, 4×plafond={plafond_proratise*4}€)"
+            template = MESSAGE_FRACTIONNEE
         else:
-            formule = "formule inconnue"
-
-        message = (
-            f"Ligne {numero} ({ligne.libelle}): "
-            f"type={tranche_type}, heures={heures}h, plafond_proratisé={plafond_proratise}€. "
-            f"Formule: {formule} = {base_attendue}€. "
-            f"Valeur sur fiche: {ligne.base}€. "
-            f"Écart: {difference}€."
-        )
+            template = MESSAGES.get(tranche_type, MESSAGE_INCONNUE)
 
-        results.append(CheckResult(
+        results.append(CheckResult.lazy(
+            template,
+            params,
             test_name="bases",
             valid=valid,
             is_line_error=True,
@@ -261,7 +289,6 @@ def check_bases(
             obtained_value=ligne.base,
             expected_value=base_attendue,
             difference=difference,
-            message=message,
         ))
 
     # Si aucune ligne de tranche trouvée, le signaler
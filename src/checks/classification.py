@@ -0,0 +1,247 @@
+"""
+Classification des libellés de lignes de cotisations.
+
+Chaque check avait ses propres listes de motifs, appliquées une à une sur
+tous les libellés de la fiche. Les motifs sont ici regroupés par catégorie
+et compilés une fois en une seule expression par catégorie; la fiche est
+classée en une passe et l'index obtenu est partagé par tous les checks.
+
+Catégories:
+- t1, t2, apec, prevoyance_tranche: motifs de tranche (bases.py)
+- t2_retraite, t2_prevoyance, apec_t2, apec_global: types de tranche déduits (bases.py)
+- prevoyance: lignes de prévoyance réintégrées dans la base CSG (csg.py)
+- apprenti, non_resident: exonérations de CSG/CRDS (csg.py)
+- allegement: allègement RGDU (allocations_familiales.py)
+- frais_non_imposables: frais à déduire du net imposable (fiscal.py)
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from src.models.payslip import FichePayeExtracted
+
+
+# Patterns pour identifier les tranches
+# Note: On utilise (?:\b|_|\s) après T1/T2 pour gérer les variantes T1_1, T2 1, etc.
+PATTERNS_T1 = [
+    r"\bT1(?:\b|_|\s)",  # T1, T1_1, T1 1, etc.
+    r"\bTA\b",
+    r"\btranche\s*1\b",
+    r"\btranche\s*A\b",
+    r"\bsur\s+T1(?:\b|_|\s)",
+    r"\bsur\s+TA\b",
+]
+
+PATTERNS_T2 = [
+    r"\bT2(?:\b|_|\s)",  # T2, T2_1, T2 1, etc.
+    r"\bTB\b",
+    r"\btranche\s*2\b",
+    r"\btranche\s*B\b",
+    r"\bsur\s+T2(?:\b|_|\s)",
+    r"\bsur\s+TB\b",
+]
+
+PATTERNS_APEC = [
+    r"\bAPEC\b",
+]
+
+# Prévoyance au sens des tranches (TB prévoyance/mutuelle plafonnée à 4 plafonds)
+PATTERNS_PREVOYANCE = [
+    r"\bprév",
+    r"\bmut",
+    r"\bsanté",
+]
+
+# Prévoyance au sens de la base CSG (part patronale réintégrée)
+PATTERNS_PREVOYANCE_CSG = [
+    r"\bprévo",
+    r"\bprevo",
+    r"\bprevoyance",
+    r"\bdécès",
+    r"\binvalidité",
+    r"\bincapacité",
+]
+
+# Patterns pour détecter les non-résidents fiscaux
+PATTERNS_NON_RESIDENT = [
+    "non résident",
+    "non resident",
+    "non-résident",
+    "non-resident",
+]
+
+# Patterns pour détecter les apprentis (exonérés de CSG/CRDS)
+PATTERNS_APPRENTI = [
+    "apprenti",
+    "app exo",
+    "appr non exo",
+    "base apprenti",
+]
+
+# Patterns pour détecter l'allègement RGDU par libellé
+PATTERNS_ALLEGEMENT_RGDU = [
+    "allègement rgdu",
+    "allegement rgdu",
+    "réduction générale",
+    "reduction generale",
+    "rgdu",
+    "allègement cotisations",
+    "allegement cotisations",
+]
+
+# Patterns pour détecter les frais non imposables par libellé
+PATTERNS_FRAIS_NON_IMPOSABLES = [
+    "remboursement transport",
+    "rembours. transport",
+    "indemnité transport",
+    "indem. transport",
+    "frais transport",
+    "navigo",
+    "indemnité kilom",
+    "indem. kilom",
+    "panier",
+    "titre restaurant",
+    "ticket restaurant",
+]
+
+# Lignes reconnues par leur numéro, quel que soit le libellé
+LIGNE_MALADIE_NON_RESIDENT = "20065"
+
+LIGNES_ALLEGEMENT_RGDU = [
+    "73576",  # Allègement RGDU
+    "73500",  # Réduction générale
+    "73570",  # RGDU
+    "73575",  # Allègement général
+]
+
+LIGNES_FRAIS_NON_IMPOSABLES = [
+    "81000",  # Remboursement transport
+    "81001",  # Indemnité kilométrique
+    "81002",  # Panier repas
+    "81010",  # Remboursement frais
+    "81100",  # Indemnité transport
+    "81200",  # Prime transport
+]
+
+
+def _compile(patterns: list[str], literal: bool = False) -> re.Pattern:
+    """Compile une liste de motifs en une seule expression (alternative)."""
+    return re.compile(
+        "|".join(re.escape(pattern) if literal else f"(?:{pattern})" for pattern in patterns),
+        re.IGNORECASE,
+    )
+
+
+# Une expression compilée par catégorie de libellé
+CATEGORY_PATTERNS: dict[str, re.Pattern] = {
+    "t1": _compile(PATTERNS_T1),
+    "t2": _compile(PATTERNS_T2),
+    "apec": _compile(PATTERNS_APEC),
+    "prevoyance_tranche": _compile(PATTERNS_PREVOYANCE),
+    "prevoyance": _compile(PATTERNS_PREVOYANCE_CSG),
+    "non_resident": _compile(PATTERNS_NON_RESIDENT, literal=True),
+    "apprenti": _compile(PATTERNS_APPRENTI, literal=True),
+    "allegement": _compile(PATTERNS_ALLEGEMENT_RGDU, literal=True),
+    "frais_non_imposables": _compile(PATTERNS_FRAIS_NON_IMPOSABLES, literal=True),
+}
+
+# Catégories ajoutées d'après le numéro de ligne
+CATEGORY_LINE_NUMBERS: dict[str, set[str]] = {
+    "non_resident": {LIGNE_MALADIE_NON_RESIDENT},
+    "allegement": set(LIGNES_ALLEGEMENT_RGDU),
+    "frais_non_imposables": set(LIGNES_FRAIS_NON_IMPOSABLES),
+}
+
+
+@lru_cache(maxsize=4096)
+def classify_libelle(libelle: str) -> frozenset[str]:
+    """
+    Retourne les catégories d'un libellé (motifs de libellé uniquement).
+
+    Mis en cache : les mêmes libellés reviennent d'une fiche à l'autre.
+    """
+    categories = {name for name, pattern in CATEGORY_PATTERNS.items() if pattern.search(libelle)}
+    tranche = tranche_type(categories)
+    if tranche is not None:
+        categories.add(tranche)
+    return frozenset(categories)
+
+
+def tranche_type(categories: set[str] | frozenset[str]) -> str | None:
+    """
+    Détermine le type de tranche à partir des catégories d'un libellé.
+
+    IMPORTANT: La détection T1/T2 est PRIORITAIRE.
+    - "APEC T1 Cadre" → t1 (pas apec_global)
+    - "APEC T2 Cadre" → apec_t2 (règle spéciale APEC jusqu'à 4 plafonds)
+    - "APEC Cadre" (sans T1/T2) → apec_global
+    """
+    # Cas APEC avec split T1/T2
+    if "apec" in categories:
+        if "t1" in categories:
+            return "t1"  # APEC T1 → règle T1 classique
+        if "t2" in categories:
+            return "apec_t2"  # APEC T2 → règle spéciale (4 plafonds max)
+        # APEC sans T1/T2 → règle globale
+        return "apec_global"
+
+    # T1/TA classique (prioritaire)
+    if "t1" in categories:
+        return "t1"
+
+    # T2 avec distinction prévoyance vs retraite
+    if "t2" in categories:
+        if "prevoyance_tranche" in categories:
+            return "t2_prevoyance"  # TB → 4 plafonds max
+        return "t2_retraite"  # T2 retraite → 8 plafonds max
+
+    return None
+
+
+TRANCHE_TYPES = ("t1", "t2_retraite", "t2_prevoyance", "apec_t2", "apec_global")
+
+
+@dataclass
+class LibelleIndex:
+    """
+    Index des lignes d'une fiche par catégorie de libellé.
+
+    Attributes:
+        categories: Catégorie → numéros des lignes, dans l'ordre de la fiche.
+        by_line: Numéro de ligne → catégories de la ligne.
+    """
+
+    categories: dict[str, list[str]] = field(default_factory=dict)
+    by_line: dict[str, frozenset[str]] = field(default_factory=dict)
+
+    def lines(self, category: str) -> list[str]:
+        """Numéros des lignes de la catégorie."""
+        return self.categories.get(category, [])
+
+    def has(self, category: str) -> bool:
+        """True si au moins une ligne est dans la catégorie."""
+        return bool(self.categories.get(category))
+
+    def in_category(self, numero: str, category: str) -> bool:
+        """True si la ligne est dans la catégorie."""
+        return category in self.by_line.get(numero, ())
+
+    def tranche_type(self, numero: str) -> str | None:
+        """Type de tranche de la ligne, ou None."""
+        categories = self.by_line.get(numero, frozenset())
+        return next((tranche for tranche in TRANCHE_TYPES if tranche in categories), None)
+
+
+def build_libelle_index(fiche: FichePayeExtracted) -> LibelleIndex:
+    """Classe toutes les lignes de la fiche en une passe."""
+    index = LibelleIndex()
+    for numero, ligne in fiche.lignes.items():
+        categories = classify_libelle(ligne.libelle)
+        extra = {name for name, numeros in CATEGORY_LINE_NUMBERS.items() if numero in numeros}
+        if extra:
+            categories = categories | extra
+        index.by_line[numero] = categories
+        for category in categories:
+            index.categories.setdefault(category, []).append(numero)
+    return index
@@ -1,5 +1,17 @@
 """
 Check LLM pour détecter les incohérences avec la convention collective.
+
+Seuls les articles de la convention pertinents pour la fiche (libellés,
+qualification, ancienneté) sont envoyés au LLM, sélectionnés par l'index
+BM25 de `convention_index.py` ; les articles consultés sont indiqués dans
+les résultats.
+
+Quand le cache de contexte du fournisseur est disponible (`llm.py`), le
+préfixe statique (instructions et convention complète) est enregistré une
+fois chez Gemini et seuls la fiche et la liste des articles sélectionnés
+sont envoyés à chaque appel. Sinon, le prompt contient les instructions et
+le texte des seuls articles sélectionnés. Dans les deux cas, le modèle ne
+doit fonder ses avertissements que sur ces articles.
 """
 
 from pathlib import Path
@@ -8,10 +20,23 @@ from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckResult
 from src.models.convention_check import ConventionCheckOutput, ConventionWarning
 
+from .convention_index import Article, ConventionIndex, fiche_queries
+from .llm import CachedPrefixLLM, default_llm
+from .prompt import compact_fiche
+
 
 # Chemin vers le fichier convention.md
 CONVENTION_FILE = Path(__file__).parent.parent / "convention" / "convention.md"
 
+# Index des articles, construit une fois au chargement du module
+CONVENTION_INDEX = ConventionIndex.from_file(CONVENTION_FILE)
+
+# Nombre d'articles envoyés au LLM
+TOP_K_ARTICLES = 4
+
+# Consigne sur les articles sélectionnés, identique avec le préfixe en cache ou en ligne
+CONSIGNE_ARTICLES = "Seuls ces articles sont pertinents pour cette fiche : ne fonde tes avertissements que sur eux."
+
 
 SYSTEM_PROMPT = """Tu es un expert en droit du travail français et en analyse de bulletins de salaire.
 
@@ -45,14 +70,44 @@ Pour chaque incohérence détectée, indique:
 IMPORTANT: Respecte strictement le schéma JSON demandé."""
 
 
-def _load_convention() -> str:
-    """Charge le contenu du fichier convention.md."""
-    if CONVENTION_FILE.exists():
-        return CONVENTION_FILE.read_text(encoding="utf-8")
-    return "Convention collective non disponible."
+def _select_articles(fiche: FichePayeExtracted) -> list[Article]:
+    """Articles de la convention pertinents pour la fiche."""
+    return CONVENTION_INDEX.search(fiche_queries(fiche), TOP_K_ARTICLES)
+
+
+# Préfixe statique mis en cache chez le fournisseur : instructions et convention complète
+CACHED_PREFIX = "\n\n".join([
+    SYSTEM_PROMPT,
+    f"=== CONVENTION COLLECTIVE (CCN 66) ===\n{CONVENTION_INDEX.preambule}",
+    *(article.excerpt for article in CONVENTION_INDEX.articles),
+])
+
 
+def _inline_prefix(articles: list[Article]) -> str:
+    """Préfixe envoyé en ligne : instructions et articles sélectionnés."""
+    return f"""{SYSTEM_PROMPT}
 
-def _warning_to_check_result(warning: ConventionWarning) -> CheckResult:
+=== EXTRAITS DE LA CONVENTION COLLECTIVE (CCN 66) ===
+{_convention_excerpt(articles)}"""
+
+
+def _convention_excerpt(articles: list[Article]) -> str:
+    """Extrait de la convention envoyé au LLM."""
+    if not CONVENTION_INDEX.articles:
+        return "Convention collective non disponible."
+    if not articles:
+        return "Aucun article de la convention ne correspond à cette fiche."
+    return "\n\n".join(article.excerpt for article in articles)
+
+
+def _articles_note(articles: list[Article]) -> str:
+    """Mention des articles consultés, ajoutée aux messages."""
+    if not articles:
+        return ""
+    return f" [Articles consultés : {', '.join(article.id for article in articles)}]"
+
+
+def _warning_to_check_result(warning: ConventionWarning, note: str = "") -> CheckResult:
     """Convertit un ConventionWarning en CheckResult."""
     article_ref = f" (Réf: {warning.article_convention})" if warning.article_convention else ""
 
@@ -64,51 +119,53 @@ def _warning_to_check_result(warning: ConventionWarning) -> CheckResult:
         obtained_value=None,
         expected_value=None,
         difference=None,
-        message=f"[{warning.severite.upper()}] {warning.titre}{article_ref}: {warning.description}",
+        message=f"[{warning.severite.upper()}] {warning.titre}{article_ref}: {warning.description}{note}",
     )
 
 
-async def check_convention(fiche: FichePayeExtracted) -> list[CheckResult]:
+async def check_convention(fiche: FichePayeExtracted, llm: CachedPrefixLLM | None = None) -> list[CheckResult]:
     """
     Analyse la cohérence de la fiche de paie avec la convention collective via LLM.
 
     Args:
         fiche: Fiche de paie extraite.
+        llm: Client LLM (par défaut celui des settings, avec cache de contexte).
 
     Returns:
         Liste de CheckResult pour chaque avertissement détecté.
     """
-    # Import lazy pour éviter de charger les settings au démarrage
-    from src.config import gemini_settings
-
+    llm = llm or default_llm()
     results: list[CheckResult] = []
 
-    # Charger la convention
-    convention_content = _load_convention()
-
-    # Sérialiser la fiche de paie en JSON
-    payslip_json = fiche.model_dump_json(indent=2)
+    # Sélectionner les articles pertinents
+    articles = _select_articles(fiche)
+    note = _articles_note(articles)
 
-    # Construire le prompt complet
-    full_prompt = f"""{SYSTEM_PROMPT}
+    # Sérialiser la fiche de paie (format compact, voir prompt.py)
+    payslip_text = compact_fiche(fiche)
 
-=== CONVENTION COLLECTIVE (CCN 66) ===
-{convention_content}
+    # Partie variable du prompt, après le préfixe (en cache ou en ligne)
+    priorite = ", ".join(article.id for article in articles) or "aucun"
+    contents = f"""=== ARTICLES APPLICABLES ===
+{priorite}
+{CONSIGNE_ARTICLES}
 
-=== FICHE DE PAIE À ANALYSER (JSON) ===
-{payslip_json}
+=== FICHE DE PAIE À ANALYSER ===
+Une section JSON par bloc, puis les lignes en tableau (colonnes séparées par "|", cellule vide si absente).
+{payslip_text}
 
 Analyse cette fiche de paie et retourne les éventuelles incohérences avec la convention collective.
 Si tout semble cohérent, retourne une liste vide de warnings."""
 
     try:
-        response = await gemini_settings.CLIENT.aio.models.generate_content(
-            model=gemini_settings.GEMINI_MODEL_2_5_FLASH,
-            contents=full_prompt,
+        response = await llm.generate(
+            CACHED_PREFIX,
+            contents,
             config={
                 "response_mime_type": "application/json",
                 "response_schema": ConventionCheckOutput,
             },
+            inline_prefix=_inline_prefix(articles),
         )
 
         # Parser la réponse
@@ -130,7 +187,7 @@ Si tout semble cohérent, retourne une liste vide de warnings."""
 
         # Convertir les warnings en CheckResult
         for warning in output.warnings:
-            results.append(_warning_to_check_result(warning))
+            results.append(_warning_to_check_result(warning, note))
 
         # Si aucun warning, ajouter un résultat positif
         if not output.warnings:
@@ -142,7 +199,7 @@ Si tout semble cohérent, retourne une liste vide de warnings."""
                 obtained_value=None,
                 expected_value=None,
                 difference=None,
-                message=f"Aucune incohérence détectée avec la convention collective. {output.resume}",
+                message=f"Aucune incohérence détectée avec la convention collective. {output.resume}{note}",
             ))
 
     except Exception as err:
@@ -155,6 +212,6 @@ Si tout semble cohérent, retourne une liste vide de warnings."""
             expected_value=None,
             difference=None,
             message=f"Erreur lors de l'analyse LLM convention: {err}",
-        ))
+        ).mark_transient())
 
     return results
@@ -0,0 +1,208 @@
+"""
+Index lexical (BM25) des articles de la convention collective.
+
+La convention (`convention.md`, ~45 Ko) est découpée en articles : articles
+numérotés du texte de base ("Article 39"), articles de l'accord annexé à
+l'article 43 ("Article 43 - 3.1") et paragraphes de l'article 44 ("Article
+44.5"). L'index est construit une fois au chargement du module appelant ;
+pour chaque fiche, seuls les articles les plus pertinents pour ses
+libellés, sa qualification et son ancienneté sont envoyés au LLM.
+
+Les mots sont comparés sans casse ni accents, après suppression des mots
+outils et du pluriel en -s/-x.
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.models.payslip import FichePayeExtracted
+
+
+# Paramètres BM25 usuels
+K1 = 1.5
+B = 0.75
+
+MOTS_OUTILS = frozenset("""
+    a au aux avec ce ces cet cette dans de des du elle en est et il ils la le les leur
+    leurs lui ne ni non ou par pas pour qu que qui sa se ses son sont sur un une
+""".split())
+
+MOT = re.compile(r"[^\W\d_]{3,}")
+
+# Début d'article : "Article 39En vigueur non étendu", "Article 3.1", "Article 1er", "44.5 Financement..."
+DEBUT_ARTICLE = re.compile(r"^Article (\d+)(?:er)?(?:\.(\d+))?(?=En vigueur|\s*$)|^(\d+)\.(\d+) \S")
+
+# Intitulé de section précédant un article ("Replier Majorations d'ancienneté")
+INTITULE = re.compile(r"^Replier\s+(.+)$")
+
+# Lignes de navigation du site d'origine, sans contenu
+NAVIGATION = re.compile(r"^(?:Versions|Informations)\s*$")
+
+
+def tokenize(text: str) -> list[str]:
+    """Mots indexés d'un texte : sans casse, accents, mots outils ni pluriel."""
+    decomposed = unicodedata.normalize("NFD", text.casefold())
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    tokens = []
+    for word in MOT.findall(folded):
+        if word in MOTS_OUTILS:
+            continue
+        if len(word) > 3 and word[-1] in "sx":
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+@dataclass
+class Article:
+    """
+    Article (ou partie d'article) de la convention.
+
+    Attributes:
+        id: Référence de l'article (ex: "Article 39", "Article 43 - 3.1", "Article 44.5").
+        titre: Intitulé de la section, s'il est connu.
+        texte: Texte de l'article.
+    """
+
+    id: str
+    titre: str | None
+    texte: str
+    termes: Counter = field(default_factory=Counter, repr=False)
+
+    @property
+    def excerpt(self) -> str:
+        """Article mis en forme pour le prompt."""
+        titre = f" - {self.titre}" if self.titre else ""
+        return f"## {self.id}{titre}\n{self.texte}"
+
+
+def split_articles(text: str) -> tuple[str, list[Article]]:
+    """
+    Découpe la convention en articles.
+
+    Returns:
+        (préambule, articles dans l'ordre du texte).
+    """
+    preambule: list[str] = []
+    articles: list[Article] = []
+    lignes: list[str] = []
+    titre: str | None = None
+    article_parent: str | None = None
+
+    def fermer() -> None:
+        if articles:
+            articles[-1].texte = "\n".join(lignes).strip()
+        lignes.clear()
+
+    for ligne in text.splitlines():
+        if NAVIGATION.match(ligne):
+            continue
+        intitule = INTITULE.match(ligne)
+        if intitule:
+            titre = intitule.group(1).strip()
+            continue
+
+        debut = DEBUT_ARTICLE.match(ligne)
+        if debut is None:
+            (lignes if articles else preambule).append(ligne)
+            continue
+
+        fermer()
+        numero, sous_numero, parent, paragraphe = debut.groups()
+        if parent is not None:
+            identifiant = f"Article {parent}.{paragraphe}"
+            reste = ligne[len(f"{parent}.{paragraphe}"):].strip()
+            lignes.append(reste)
+        elif ligne.rstrip().endswith("étendu"):
+            # Article du texte de base : les articles suivants en sont des subdivisions
+            article_parent = numero
+            identifiant = f"Article {numero}"
+        else:
+            suffixe = f"{numero}.{sous_numero}" if sous_numero else numero
+            identifiant = f"Article {article_parent} - {suffixe}" if article_parent else f"Article {suffixe}"
+        articles.append(Article(id=identifiant, titre=titre, texte=""))
+
+    fermer()
+    # Un article du texte de base vide (tout son contenu est dans ses subdivisions) n'est pas indexé
+    articles = [article for article in articles if article.texte]
+    return "\n".join(preambule).strip(), articles
+
+
+class ConventionIndex:
+    """
+    Index BM25 des articles de la convention.
+
+    Args:
+        text: Texte complet de la convention.
+    """
+
+    def __init__(self, text: str):
+        self.preambule, self.articles = split_articles(text)
+        for article in self.articles:
+            article.termes = Counter(tokenize(f"{article.titre or ''} {article.texte}"))
+
+        self._longueur_moyenne = (
+            sum(sum(article.termes.values()) for article in self.articles) / len(self.articles)
+            if self.articles else 0.0
+        )
+        frequences = Counter(terme for article in self.articles for terme in article.termes)
+        total = len(self.articles)
+        self._idf = {
+            terme: math.log(1 + (total - nombre + 0.5) / (nombre + 0.5))
+            for terme, nombre in frequences.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ConventionIndex":
+        """Index du fichier de la convention (vide si le fichier est absent)."""
+        return cls(path.read_text(encoding="utf-8") if path.exists() else "")
+
+    def _score(self, article: Article, termes: Counter) -> float:
+        longueur = sum(article.termes.values())
+        score = 0.0
+        for terme in termes:
+            frequence = article.termes.get(terme, 0)
+            if frequence:
+                norme = K1 * (1 - B + B * longueur / self._longueur_moyenne)
+                score += self._idf[terme] * frequence * (K1 + 1) / (frequence + norme)
+        return score
+
+    def rank(self, query: str) -> list[int]:
+        """Positions des articles pertinents pour une requête, du plus au moins pertinent."""
+        termes = Counter(tokenize(query))
+        scores = [(self._score(article, termes), -position) for position, article in enumerate(self.articles)]
+        return [-position for score, position in sorted(scores, reverse=True) if score > 0]
+
+    def search(self, queries: list[str], top_k: int = 4) -> list[Article]:
+        """
+        Articles les plus pertinents pour plusieurs requêtes, dans l'ordre du texte.
+
+        Les classements des requêtes sont entrelacés (premier de chaque
+        requête, puis deuxième, ...) : chaque requête (libellés,
+        qualification, ancienneté) a sa part des `top_k` articles, quelle
+        que soit sa longueur. Seuls les articles ayant au moins un terme en
+        commun avec une requête sont retenus.
+        """
+        classements = [self.rank(query) for query in queries]
+        retenus: list[int] = []
+        for rang in range(max(map(len, classements), default=0)):
+            for classement in classements:
+                if rang < len(classement) and classement[rang] not in retenus and len(retenus) < top_k:
+                    retenus.append(classement[rang])
+        return [self.articles[position] for position in sorted(retenus)]
+
+
+def fiche_queries(fiche: FichePayeExtracted) -> list[str]:
+    """Requêtes d'une fiche : libellés des lignes, qualification et emploi, ancienneté."""
+    employe = fiche.employe
+    queries = [
+        "\n".join(ligne.libelle for ligne in fiche.lignes.values()),
+        " ".join(filter(None, [employe.qualification, employe.emploi, employe.categorie])),
+    ]
+    if employe.echelon or employe.coefficient or employe.date_entree:
+        queries.append("ancienneté majoration échelon avancement")
+    return [query for query in queries if query.strip()]
@@ -5,79 +5,42 @@ Règle:
 Base CSG = (Salaire Brut × 98.25%) + Part Patronale Mutuelle + Part Patronale Prévoyance
 """
 
-import re
 from decimal import Decimal
 
 from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckResult
+from src.checks.classification import LibelleIndex, build_libelle_index
+from src.checks.money import from_cents, mul, to_cents, within
+from src.checks.parametres import parametres_periode
 
 
 # Numéros de lignes standards
 LIGNE_CSG_DEDUCTIBLE = "73000"
 LIGNE_MUTUELLE = "58000"
-LIGNE_MALADIE_NON_RESIDENT = "20065"
-
-# Patterns pour détecter les non-résidents fiscaux
-PATTERNS_NON_RESIDENT = [
-    "non résident",
-    "non resident",
-    "non-résident",
-    "non-resident",
-]
-
-# Patterns pour détecter les apprentis (exonérés de CSG/CRDS)
-PATTERNS_APPRENTI = [
-    "apprenti",
-    "app exo",
-    "appr non exo",
-    "base apprenti",
-]
-
-# Taux d'abattement pour frais professionnels
-TAUX_ABATTEMENT = Decimal("0.9825")  # 98.25%
-
-TOLERANCE = Decimal("0.50")
-
-
-def _est_ligne_prevoyance(libelle: str) -> bool:
-    """Détecte si une ligne est une ligne de prévoyance."""
-    patterns = [
-        r"\bprévo",
-        r"\bprevo",
-        r"\bprevoyance",
-        r"\bdécès",
-        r"\binvalidité",
-        r"\bincapacité",
-    ]
-    for pattern in patterns:
-        if re.search(pattern, libelle, re.IGNORECASE):
-            return True
-    return False
 
+TOLERANCE = 50  # Tolérance en centimes
 
-def _is_non_resident(fiche: FichePayeExtracted) -> bool:
-    """Détecte si le salarié est non-résident fiscal français."""
-    # Vérifier par numéro de ligne connu
-    if LIGNE_MALADIE_NON_RESIDENT in fiche.lignes:
-        return True
+# Message du calcul de la base (formaté à la demande)
+MESSAGE = (
+    "Base CSG = Brut ({brut}€) × {taux_abattement:.2%} ({brut_abattu}€) "
+    "+ Mutuelle Patronale ({mutuelle}€) "
+    "+ Prévoyance Patronale ({prevoyance}€ [{prevoyance_detail}]) "
+    "= {attendue}€. "
+    "Valeur déclarée: {declaree}€. "
+    "Écart: {difference}€."
+)
 
-    # Vérifier par pattern dans les libellés
-    for ligne in fiche.lignes.values():
-        libelle_lower = ligne.libelle.lower()
-        for pattern in PATTERNS_NON_RESIDENT:
-            if pattern in libelle_lower:
-                return True
 
-    return False
+def _is_non_resident(index: LibelleIndex) -> bool:
+    """Détecte si le salarié est non-résident fiscal français (ligne 20065 ou libellé)."""
+    return index.has("non_resident")
 
 
-def _is_apprenti(fiche: FichePayeExtracted) -> bool:
+def _is_apprenti(fiche: FichePayeExtracted, index: LibelleIndex) -> bool:
     """Détecte si le salarié est un apprenti (exonéré de CSG/CRDS)."""
     # Vérifier par pattern dans les libellés des lignes
-    for ligne in fiche.lignes.values():
-        libelle_lower = ligne.libelle.lower()
-        if any(pattern in libelle_lower for pattern in PATTERNS_APPRENTI):
-            return True
+    if index.has("apprenti"):
+        return True
 
     # Vérifier dans l'emploi/qualification si disponible
     if fiche.employe.emploi and "apprenti" in fiche.employe.emploi.lower():
@@ -88,7 +51,7 @@ def _is_apprenti(fiche: FichePayeExtracted) -> bool:
     return False
 
 
-def check_csg(fiche: FichePayeExtracted) -> CheckResult:
+def check_csg(fiche: FichePayeExtracted, index: LibelleIndex | None = None) -> CheckResult:
     """
     Vérifie la cohérence de la base CSG.
 
@@ -98,12 +61,16 @@ def check_csg(fiche: FichePayeExtracted) -> CheckResult:
 
     Args:
         fiche: Fiche de paie extraite.
+        index: Classification des libellés de la fiche (calculée si absente).
 
     Returns:
         CheckResult avec le résultat de la vérification.
     """
+    if index is None:
+        index = build_libelle_index(fiche)
+
     # Vérifier si le salarié est non-résident fiscal (exonéré de CSG/CRDS)
-    if _is_non_resident(fiche):
+    if _is_non_resident(index):
         return CheckResult(
             test_name="csg",
             valid=True,
@@ -116,7 +83,7 @@ def check_csg(fiche: FichePayeExtracted) -> CheckResult:
         )
 
     # Vérifier si le salarié est apprenti (exonéré totalement de CSG/CRDS)
-    if _is_apprenti(fiche):
+    if _is_apprenti(fiche, index):
         return CheckResult(
             test_name="csg",
             valid=True,
@@ -160,48 +127,55 @@ def check_csg(fiche: FichePayeExtracted) -> CheckResult:
             message="Impossible de vérifier la base CSG: salaire brut non trouvé.",
         )
 
-    # Calculer l'abattement sur le brut
-    brut_abattu = (brut * TAUX_ABATTEMENT).quantize(Decimal("0.01"))
+    # Calculer l'abattement sur le brut (en centimes, arrondi au centime)
+    # Taux d'abattement de la période du bulletin
+    taux_abattement = parametres_periode(fiche.periode).taux_abattement_csg
+    brut_abattu = mul(to_cents(brut), taux_abattement)
 
     # Récupérer part patronale mutuelle
-    mutuelle_pat = Decimal("0")
+    mutuelle_pat = 0
     ligne_mut = fiche.lignes.get(LIGNE_MUTUELLE)
     if ligne_mut and ligne_mut.montant_patronal:
-        mutuelle_pat = abs(ligne_mut.montant_patronal)
+        mutuelle_pat = abs(to_cents(ligne_mut.montant_patronal))
 
     # Récupérer parts patronales prévoyance (toutes les lignes)
-    prevoyance_pat = Decimal("0")
+    prevoyance_pat = 0
     lignes_prevoyance = []
-    for numero, ligne in fiche.lignes.items():
-        if _est_ligne_prevoyance(ligne.libelle) and ligne.montant_patronal:
-            montant = abs(ligne.montant_patronal)
+    for numero in index.lines("prevoyance"):
+        ligne = fiche.lignes[numero]
+        if ligne.montant_patronal:
+            montant = abs(to_cents(ligne.montant_patronal))
             prevoyance_pat += montant
-            lignes_prevoyance.append(f"{numero}:{montant}€")
+            lignes_prevoyance.append(f"{numero}:{from_cents(montant)}€")
 
     # Calculer la base CSG attendue
     base_csg_calculee = brut_abattu + mutuelle_pat + prevoyance_pat
 
-    difference = base_csg_declaree - base_csg_calculee
-    valid = abs(difference) <= TOLERANCE
-
-    prevoyance_detail = ", ".join(lignes_prevoyance) if lignes_prevoyance else "aucune"
-
-    message = (
-        f"Base CSG = Brut ({brut}€) × 98.25% ({brut_abattu}€) "
-        f"+ Mutuelle Patronale ({mutuelle_pat}€) "
-        f"+ Prévoyance Patronale ({prevoyance_pat}€ [{prevoyance_detail}]) "
-        f"= {base_csg_calculee}€. "
-        f"Valeur déclarée: {base_csg_declaree}€. "
-        f"Écart: {difference}€."
-    )
-
-    return CheckResult(
+    difference = to_cents(base_csg_declaree) - base_csg_calculee
+    valid = within(difference, TOLERANCE)
+
+    base_attendue = from_cents(base_csg_calculee)
+    ecart = from_cents(difference)
+
+    # Message explicatif, formaté seulement s'il est renvoyé
+    return CheckResult.lazy(
+        MESSAGE,
+        {
+            "brut": brut,
+            "taux_abattement": taux_abattement,
+            "brut_abattu": from_cents(brut_abattu),
+            "mutuelle": from_cents(mutuelle_pat),
+            "prevoyance": from_cents(prevoyance_pat),
+            "prevoyance_detail": ", ".join(lignes_prevoyance) if lignes_prevoyance else "aucune",
+            "attendue": base_attendue,
+            "declaree": base_csg_declaree,
+            "difference": ecart,
+        },
         test_name="csg",
         valid=valid,
         is_line_error=True,
         line_number=LIGNE_CSG_DEDUCTIBLE,
         obtained_value=base_csg_declaree,
-        expected_value=base_csg_calculee,
-        difference=difference,
-        message=message,
+        expected_value=base_attendue,
+        difference=ecart,
     )
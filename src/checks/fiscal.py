@@ -15,6 +15,8 @@ from decimal import Decimal
 
 from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckResult
+from src.checks.classification import LibelleIndex, build_libelle_index
+from src.checks.money import from_cents, to_cents, within
 
 
 # Numéros de lignes standards
@@ -23,61 +25,45 @@ LIGNE_CSG_NON_DEDUCTIBLE = "75050"
 LIGNE_CRDS = "75060"
 LIGNE_MUTUELLE = "58000"
 
-# Lignes de frais non imposables (à soustraire du net avant PAS)
-LIGNES_FRAIS_NON_IMPOSABLES = [
-    "81000",  # Remboursement transport
-    "81001",  # Indemnité kilométrique
-    "81002",  # Panier repas
-    "81010",  # Remboursement frais
-    "81100",  # Indemnité transport
-    "81200",  # Prime transport
-]
-
-# Patterns pour détecter les frais non imposables par libellé
-PATTERNS_FRAIS_NON_IMPOSABLES = [
-    "remboursement transport",
-    "rembours. transport",
-    "indemnité transport",
-    "indem. transport",
-    "frais transport",
-    "navigo",
-    "indemnité kilom",
-    "indem. kilom",
-    "panier",
-    "titre restaurant",
-    "ticket restaurant",
-]
-
-TOLERANCE = Decimal("0.50")
-
-
-def _detect_frais_non_imposables(fiche: FichePayeExtracted) -> Decimal:
+TOLERANCE = 50  # Tolérance en centimes
+
+
+def _message(frais: str) -> str:
+    return (
+        "Net Imposable = Net avant PAS ({net_avant_pas}€) "
+        + frais
+        + "+ CSG Non Déductible ({csg_non_deductible}€) "
+        "+ CRDS ({crds}€) "
+        "+ Mutuelle Patronale ({mutuelle}€) "
+        "= {attendu}€. "
+        "Valeur déclarée: {declare}€. "
+        "Écart: {difference}€."
+    )
+
+
+# Messages du calcul du net imposable (formatés à la demande)
+MESSAGE_FRAIS = _message("- Frais non imposables ({frais}€) ")
+MESSAGE_SANS_FRAIS = _message("")
+
+
+def _detect_frais_non_imposables(fiche: FichePayeExtracted, index: LibelleIndex) -> int:
     """
-    Détecte et somme les frais non imposables dans la fiche de paie.
+    Détecte et somme (en centimes) les frais non imposables dans la fiche de paie.
 
     Ces montants gonflent le net à payer mais ne sont pas imposables.
+    Les lignes sont reconnues par numéro ou par libellé (voir `classification`).
     """
-    total_frais = Decimal("0")
-
-    for numero, ligne in fiche.lignes.items():
-        # Vérifier par numéro de ligne connu
-        if numero in LIGNES_FRAIS_NON_IMPOSABLES:
-            if ligne.montant_salarial and ligne.montant_salarial > 0:
-                total_frais += ligne.montant_salarial
-            continue
-
-        # Vérifier par pattern dans le libellé
-        libelle_lower = ligne.libelle.lower()
-        for pattern in PATTERNS_FRAIS_NON_IMPOSABLES:
-            if pattern in libelle_lower:
-                if ligne.montant_salarial and ligne.montant_salarial > 0:
-                    total_frais += ligne.montant_salarial
-                break
+    total_frais = 0
+
+    for numero in index.lines("frais_non_imposables"):
+        ligne = fiche.lignes[numero]
+        if ligne.montant_salarial and ligne.montant_salarial > 0:
+            total_frais += to_cents(ligne.montant_salarial)
 
     return total_frais
 
 
-def check_fiscal(fiche: FichePayeExtracted) -> CheckResult:
+def check_fiscal(fiche: FichePayeExtracted, index: LibelleIndex | None = None) -> CheckResult:
     """
     Vérifie la cohérence du net imposable.
 
@@ -88,6 +74,7 @@ def check_fiscal(fiche: FichePayeExtracted) -> CheckResult:
 
     Args:
         fiche: Fiche de paie extraite.
+        index: Classification des libellés de la fiche (calculée si absente).
 
     Returns:
         CheckResult avec le résultat de la vérification.
@@ -127,63 +114,54 @@ def check_fiscal(fiche: FichePayeExtracted) -> CheckResult:
         )
 
     # Détecter les frais non imposables
-    frais_non_imposables = _detect_frais_non_imposables(fiche)
+    frais_non_imposables = _detect_frais_non_imposables(fiche, index or build_libelle_index(fiche))
 
     # Récupérer CSG non déductible (valeur absolue car souvent négative)
-    csg_non_ded = Decimal("0")
+    csg_non_ded = 0
     ligne_csg = fiche.lignes.get(LIGNE_CSG_NON_DEDUCTIBLE)
     if ligne_csg and ligne_csg.montant_salarial:
-        csg_non_ded = abs(ligne_csg.montant_salarial)
+        csg_non_ded = abs(to_cents(ligne_csg.montant_salarial))
 
     # Récupérer CRDS (valeur absolue car souvent négative)
-    crds = Decimal("0")
+    crds = 0
     ligne_crds = fiche.lignes.get(LIGNE_CRDS)
     if ligne_crds and ligne_crds.montant_salarial:
-        crds = abs(ligne_crds.montant_salarial)
+        crds = abs(to_cents(ligne_crds.montant_salarial))
 
     # Récupérer part patronale mutuelle
-    mutuelle_pat = Decimal("0")
+    mutuelle_pat = 0
     ligne_mut = fiche.lignes.get(LIGNE_MUTUELLE)
     if ligne_mut and ligne_mut.montant_patronal:
-        mutuelle_pat = abs(ligne_mut.montant_patronal)
+        mutuelle_pat = abs(to_cents(ligne_mut.montant_patronal))
 
-    # Calculer le net imposable attendu
+    # Calculer le net imposable attendu (en centimes)
     # Net Imposable = Net avant PAS - Frais Non Imposables + CSG ND + CRDS + Mutuelle Pat
-    net_imposable_calcule = net_avant_pas - frais_non_imposables + csg_non_ded + crds + mutuelle_pat
-
-    difference = net_imposable_declare - net_imposable_calcule
-    valid = abs(difference) <= TOLERANCE
-
-    # Construire le message
-    if frais_non_imposables > 0:
-        message = (
-            f"Net Imposable = Net avant PAS ({net_avant_pas}€) "
-            f"- Frais non imposables ({frais_non_imposables}€) "
-            f"+ CSG Non Déductible ({csg_non_ded}€) "
-            f"+ CRDS ({crds}€) "
-            f"+ Mutuelle Patronale ({mutuelle_pat}€) "
-            f"= {net_imposable_calcule}€. "
-            f"Valeur déclarée: {net_imposable_declare}€. "
-            f"Écart: {difference}€."
-        )
-    else:
-        message = (
-            f"Net Imposable = Net avant PAS ({net_avant_pas}€) "
-            f"+ CSG Non Déductible ({csg_non_ded}€) "
-            f"+ CRDS ({crds}€) "
-            f"+ Mutuelle Patronale ({mutuelle_pat}€) "
-            f"= {net_imposable_calcule}€. "
-            f"Valeur déclarée: {net_imposable_declare}€. "
-            f"Écart: {difference}€."
-        )
-
-    return CheckResult(
+    net_imposable_calcule = to_cents(net_avant_pas) - frais_non_imposables + csg_non_ded + crds + mutuelle_pat
+
+    difference = to_cents(net_imposable_declare) - net_imposable_calcule
+    valid = within(difference, TOLERANCE)
+
+    net_imposable_attendu = from_cents(net_imposable_calcule)
+    ecart = from_cents(difference)
+
+    # Message explicatif, formaté seulement s'il est renvoyé
+    return CheckResult.lazy(
+        MESSAGE_FRAIS if frais_non_imposables > 0 else MESSAGE_SANS_FRAIS,
+        {
+            "net_avant_pas": net_avant_pas,
+            "frais": from_cents(frais_non_imposables),
+            "csg_non_deductible": from_cents(csg_non_ded),
+            "crds": from_cents(crds),
+            "mutuelle": from_cents(mutuelle_pat),
+            "attendu": net_imposable_attendu,
+            "declare": net_imposable_declare,
+            "difference": ecart,
+        },
         test_name="fiscal",
         valid=valid,
         is_line_error=False,
         line_number=None,
         obtained_value=net_imposable_declare,
-        expected_value=net_imposable_calcule,
-        difference=difference,
-        message=message,
+        expected_value=net_imposable_attendu,
+        difference=ecart,
     )
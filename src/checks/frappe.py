@@ -1,13 +1,31 @@
 """
 Check LLM pour détecter les fautes de frappe dans la fiche de paie.
+
+Un même employeur produit les mêmes libellés sur tous ses bulletins, mois
+après mois. Le verdict du LLM sur chaque texte (libellé, champ employeur ou
+employé) est donc mémorisé, indexé par le texte normalisé et la version du
+prompt : seuls les textes jamais vus sont envoyés au modèle, et l'appel est
+évité quand la fiche n'en contient aucun.
+
+Avant le mémo, le détecteur local (`typo.py`) juge les libellés et les codes
+qu'il sait classer ; seuls les textes qu'il ne sait pas juger vont au LLM.
 """
 
+import asyncio
+import hashlib
+import unicodedata
+from pathlib import Path
 from typing import cast
 
+from pydantic import TypeAdapter
+
+from src.cache import TieredCache
 from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckResult
 from src.models.frappe import FrappeCheckInput, FrappeCheckOutput, FrappeError
-from src.config import gemini_settings
+from src.config import app_settings, gemini_settings
+
+from .typo import detect_typos
 
 
 SYSTEM_PROMPT = """Tu es un expert en analyse de bulletins de salaire français.
@@ -37,30 +55,171 @@ TU AS L'INTERDICTION FORMELLE DE SIGNALER DES ERREURS D'ACCENTS, CE N'EST PAS UN
 
 IMPORTANT: Respecte strictement le schéma JSON demandé."""
 
+# Version du prompt : un changement de prompt, de modèle ou de schéma invalide le mémo
+PROMPT_VERSION = hashlib.sha256(
+    f"{SYSTEM_PROMPT}|{gemini_settings.GEMINI_MODEL_2_5_FLASH}|{FrappeCheckOutput.model_json_schema()}".encode()
+).hexdigest()[:16]
+
+_ERRORS_ADAPTER = TypeAdapter(list[FrappeError])
+
+
+def _normalize(text: str) -> str:
+    """Texte normalisé : forme Unicode NFC, espaces réduits."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class FrappeMemo:
+    """
+    Verdicts du LLM par texte : liste des fautes trouvées (vide si le texte est correct).
+
+    Les clés sont des empreintes SHA-256 du texte normalisé : la base ne
+    contient ni libellés ni données personnelles en clair.
+
+    Args:
+        max_entries: Taille maximale du LRU en mémoire.
+        db_path: Chemin de la base SQLite partagée, ou None (mémoire uniquement).
+    """
+
+    def __init__(self, max_entries: int = 4096, db_path: str | Path | None = None):
+        self._cache = TieredCache("frappe", PROMPT_VERSION, max_entries, db_path)
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get_many(self, texts: set[str]) -> dict[str, list[FrappeError]]:
+        """Verdicts connus pour des textes normalisés."""
+        verdicts: dict[str, list[FrappeError]] = {}
+        for text in texts:
+            payload = self._cache.get(self._key(text))
+            if payload is not None:
+                verdicts[text] = _ERRORS_ADAPTER.validate_json(payload)
+        return verdicts
+
+    def put_many(self, verdicts: dict[str, list[FrappeError]]) -> None:
+        """Enregistre les verdicts de textes normalisés."""
+        for text, errors in verdicts.items():
+            self._cache.put(self._key(text), _ERRORS_ADAPTER.dump_json(errors).decode())
+
+    def clear(self) -> None:
+        """Vide le mémo."""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du mémo."""
+        return self._cache.stats()
+
+
+frappe_memo = FrappeMemo(
+    max_entries=app_settings.FRAPPE_MEMO_SIZE,
+    db_path=Path(app_settings.CACHE_DIR) / "cache.sqlite3" if app_settings.CACHE_DIR else None,
+)
+
+
+def _field_texts(fiche: FichePayeExtracted) -> dict[str, str]:
+    """Champs employeur/employé soumis au LLM, par nom de champ de FrappeCheckInput."""
+    values = {
+        "employeur_entreprise": fiche.employeur.entreprise,
+        "employeur_etablissement": fiche.employeur.etablissement,
+        "employeur_siret": fiche.employeur.siret,
+        "employeur_ape": fiche.employeur.ape,
+        "employeur_urssaf": fiche.employeur.urssaf,
+        "employeur_convention_collective": fiche.employeur.convention_collective,
+        "employe_nom": fiche.employe.nom,
+        "employe_prenom": fiche.employe.prenom,
+        "employe_adresse": fiche.employe.adresse,
+        "employe_matricule": fiche.employe.matricule,
+        "employe_numero_securite_sociale": fiche.employe.numero_securite_sociale,
+        "employe_qualification": fiche.employe.qualification,
+        "employe_emploi": fiche.employe.emploi,
+        "employe_echelon": fiche.employe.echelon,
+    }
+    return {field: value for field, value in values.items() if value and value.strip()}
+
+
+# Noms propres et adresses : jamais jugés par le détecteur local
+CHAMPS_NOMS_PROPRES = {
+    "employeur_entreprise",
+    "employeur_etablissement",
+    "employe_nom",
+    "employe_prenom",
+    "employe_adresse",
+}
+
+
+def _local_verdicts(fiche: FichePayeExtracted) -> dict[str, list[FrappeError]]:
+    """Verdicts du détecteur local, pour les textes qu'il sait juger."""
+    texts = [
+        (value, field.split("_", 1)[1])
+        for field, value in _field_texts(fiche).items()
+        if field not in CHAMPS_NOMS_PROPRES
+    ]
+    texts.extend((ligne.libelle, "libelle") for ligne in fiche.lignes.values() if ligne.libelle.strip())
+
+    verdicts: dict[str, list[FrappeError]] = {}
+    for value, field_name in texts:
+        errors = detect_typos(value, field_name)
+        if errors is not None:
+            verdicts.setdefault(_normalize(value), list(errors))
+    return verdicts
+
+
+def _fiche_texts(fiche: FichePayeExtracted) -> set[str]:
+    """Textes normalisés de la fiche (champs et libellés)."""
+    texts = {_normalize(value) for value in _field_texts(fiche).values()}
+    texts.update(_normalize(ligne.libelle) for ligne in fiche.lignes.values() if ligne.libelle.strip())
+    return texts
+
+
+def _build_input(fiche: FichePayeExtracted, known: set[str] | frozenset[str] = frozenset()) -> FrappeCheckInput:
+    """
+    Construit l'input pour le LLM à partir de la fiche.
+
+    Les textes déjà jugés (`known`, normalisés) ne sont pas envoyés, et un
+    libellé répété sur plusieurs lignes n'est envoyé qu'une fois.
+    """
+    fields = {field: value for field, value in _field_texts(fiche).items() if _normalize(value) not in known}
 
-def _build_input(fiche: FichePayeExtracted) -> FrappeCheckInput:
-    """Construit l'input pour le LLM à partir de la fiche."""
     lignes_dict = {}
+    sent = set(known)
     for numero, ligne in fiche.lignes.items():
-        lignes_dict[numero] = ligne.libelle
-
-    return FrappeCheckInput(
-        employeur_entreprise=fiche.employeur.entreprise,
-        employeur_etablissement=fiche.employeur.etablissement,
-        employeur_siret=fiche.employeur.siret,
-        employeur_ape=fiche.employeur.ape,
-        employeur_urssaf=fiche.employeur.urssaf,
-        employeur_convention_collective=fiche.employeur.convention_collective,
-        employe_nom=fiche.employe.nom,
-        employe_prenom=fiche.employe.prenom,
-        employe_adresse=fiche.employe.adresse,
-        employe_matricule=fiche.employe.matricule,
-        employe_numero_securite_sociale=fiche.employe.numero_securite_sociale,
-        employe_qualification=fiche.employe.qualification,
-        employe_emploi=fiche.employe.emploi,
-        employe_echelon=fiche.employe.echelon,
-        lignes=lignes_dict,
-    )
+        text = _normalize(ligne.libelle)
+        if text and text not in sent:
+            lignes_dict[numero] = ligne.libelle
+            sent.add(text)
+
+    return FrappeCheckInput(**fields, lignes=lignes_dict)
+
+
+def _is_empty(check_input: FrappeCheckInput) -> bool:
+    """True si l'input ne contient aucun texte à analyser."""
+    return not check_input.lignes and not any(check_input.model_dump(exclude={"lignes"}).values())
+
+
+def _attribute(error: FrappeError, fiche: FichePayeExtracted, check_input: FrappeCheckInput) -> str | None:
+    """Texte normalisé envoyé auquel se rapporte une faute, ou None s'il est ambigu."""
+    if error.is_line_error and error.line_number in fiche.lignes:
+        text = _normalize(fiche.lignes[error.line_number].libelle)
+        if text in {_normalize(libelle) for libelle in check_input.lignes.values()}:
+            return text
+
+    sent = {
+        field: value
+        for field, value in check_input.model_dump(exclude={"lignes"}).items()
+        if value
+    }
+    # Le LLM nomme le champ sans préfixe ("nom", "adresse") ou avec
+    for field, value in sent.items():
+        if field == error.field_name or field.endswith(f"_{error.field_name}"):
+            return _normalize(value)
+
+    # À défaut, le seul texte envoyé qui contient la valeur erronée
+    candidates = {
+        _normalize(value)
+        for value in (*sent.values(), *check_input.lignes.values())
+        if error.error_value and error.error_value.casefold() in value.casefold()
+    }
+    return candidates.pop() if len(candidates) == 1 else None
 
 
 def _frappe_error_to_check_result(error: FrappeError) -> CheckResult:
@@ -77,55 +236,94 @@ def _frappe_error_to_check_result(error: FrappeError) -> CheckResult:
     )
 
 
-async def check_frappe(fiche: FichePayeExtracted) -> list[CheckResult]:
+async def _ask_llm(check_input: FrappeCheckInput) -> FrappeCheckOutput:
+    """Soumet les textes au LLM et retourne sa réponse."""
+    input_json = check_input.model_dump_json(indent=2, exclude_none=True)
+    response = await gemini_settings.CLIENT.aio.models.generate_content(
+        model=gemini_settings.GEMINI_MODEL_2_5_FLASH,
+        contents=f"{SYSTEM_PROMPT}\n\nDonnées de la fiche de paie à analyser:\n{input_json}",
+        config={
+            "response_mime_type": "application/json",
+            "response_schema": FrappeCheckOutput,
+        },
+    )
+
+    # Parser la réponse
+    if hasattr(response, "parsed") and response.parsed:
+        parsed_data = response.parsed
+        if isinstance(parsed_data, FrappeCheckOutput):
+            return parsed_data
+        if isinstance(parsed_data, dict):
+            return FrappeCheckOutput.model_validate(parsed_data)
+        return FrappeCheckOutput.model_validate(cast(dict, parsed_data))
+
+    payload = getattr(response, "text", None)
+    if isinstance(payload, str):
+        return FrappeCheckOutput.model_validate_json(payload)
+    return FrappeCheckOutput.model_validate(payload)
+
+
+def _remembered_errors(fiche: FichePayeExtracted, verdicts: dict[str, list[FrappeError]]) -> list[FrappeError]:
+    """Fautes mémorisées, replacées sur les champs et lignes de la fiche."""
+    errors: list[FrappeError] = []
+    for value in _field_texts(fiche).values():
+        for error in verdicts.get(_normalize(value), []):
+            errors.append(error.model_copy(update={"is_line_error": False, "line_number": None}))
+    for numero, ligne in fiche.lignes.items():
+        for error in verdicts.get(_normalize(ligne.libelle), []):
+            errors.append(error.model_copy(update={"is_line_error": True, "line_number": numero}))
+    return errors
+
+
+async def check_frappe(fiche: FichePayeExtracted, memo: FrappeMemo | None = frappe_memo) -> list[CheckResult]:
     """
     Détecte les fautes de frappe dans une fiche de paie via LLM.
 
     Args:
         fiche: Fiche de paie extraite.
+        memo: Verdicts déjà rendus par le LLM, ou None pour tout lui soumettre.
 
     Returns:
         Liste de CheckResult pour chaque faute de frappe détectée.
     """
     results: list[CheckResult] = []
 
-    # Construire l'input
-    check_input = _build_input(fiche)
-    input_json = check_input.model_dump_json(indent=2)
+    # Ne soumettre que les textes que ni le détecteur local ni le mémo ne savent juger
+    verdicts = _local_verdicts(fiche)
+    if memo is not None:
+        verdicts.update(await asyncio.to_thread(memo.get_many, _fiche_texts(fiche) - verdicts.keys()))
+    check_input = _build_input(fiche, set(verdicts))
 
     try:
-        response = await gemini_settings.CLIENT.aio.models.generate_content(
-            model=gemini_settings.GEMINI_MODEL_2_5_FLASH,
-            contents=f"{SYSTEM_PROMPT}\n\nDonnées de la fiche de paie à analyser:\n{input_json}",
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": FrappeCheckOutput,
-            },
-        )
-
-        # Parser la réponse
-        output: FrappeCheckOutput
-        if hasattr(response, "parsed") and response.parsed:
-            parsed_data = response.parsed
-            if isinstance(parsed_data, FrappeCheckOutput):
-                output = parsed_data
-            elif isinstance(parsed_data, dict):
-                output = FrappeCheckOutput.model_validate(parsed_data)
-            else:
-                output = FrappeCheckOutput.model_validate(cast(dict, parsed_data))
-        else:
-            payload = getattr(response, "text", None)
-            if isinstance(payload, str):
-                output = FrappeCheckOutput.model_validate_json(payload)
-            else:
-                output = FrappeCheckOutput.model_validate(payload)
+        unattributed: list[FrappeError] = []
+        if not _is_empty(check_input):
+            output = await _ask_llm(check_input)
+
+            # Verdict de chaque texte envoyé (liste vide : texte correct)
+            sent = {_normalize(value) for value in check_input.model_dump(exclude={"lignes"}).values() if value}
+            sent.update(_normalize(libelle) for libelle in check_input.lignes.values())
+            new_verdicts: dict[str, list[FrappeError]] = {}
+            for error in output.errors:
+                text = _attribute(error, fiche, check_input)
+                if text is None:
+                    unattributed.append(error)
+                else:
+                    new_verdicts.setdefault(text, []).append(error)
+
+            # Une faute non attribuée peut porter sur n'importe quel texte :
+            # seuls les textes fautifs identifiés sont alors mémorisés
+            if not unattributed:
+                new_verdicts = {text: new_verdicts.get(text, []) for text in sent}
+            verdicts.update(new_verdicts)
+            if memo is not None:
+                await asyncio.to_thread(memo.put_many, new_verdicts)
 
         # Convertir les erreurs en CheckResult
-        for error in output.errors:
+        for error in [*_remembered_errors(fiche, verdicts), *unattributed]:
             results.append(_frappe_error_to_check_result(error))
 
         # Si aucune erreur, ajouter un résultat positif
-        if not output.has_errors:
+        if not results:
             results.append(CheckResult(
                 test_name="frappe",
                 valid=True,
@@ -147,6 +345,6 @@ async def check_frappe(fiche: FichePayeExtracted) -> list[CheckResult]:
             expected_value=None,
             difference=None,
             message=f"Erreur lors de l'analyse LLM: {err}",
-        ))
+        ).mark_transient())
 
     return results
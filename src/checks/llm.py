@@ -0,0 +1,226 @@
+"""
+Client LLM des checks, avec mise en cache du préfixe de prompt chez le fournisseur.
+
+Le préfixe statique d'un prompt (instructions et texte de la convention)
+est identique d'un appel à l'autre. Il est enregistré une fois comme
+contexte en cache auprès de Gemini, puis référencé par son nom : seuls la
+partie variable (la fiche) et la réponse sont facturées au tarif plein, et
+le modèle n'a plus à relire le préfixe avant de répondre.
+
+- Le contexte est recréé à l'approche de son expiration.
+- Si la création échoue (préfixe trop court pour le modèle, quota, API
+  indisponible), l'appel est fait avec le préfixe en ligne ; la création
+  n'est retentée qu'après `ttl_seconds`.
+- Si le contexte référencé n'existe plus chez le fournisseur (expiré ou
+  supprimé : `CachedContextMissing`), il est oublié et l'appel est refait
+  avec le préfixe en ligne. Les autres erreurs (quota, délai, schéma) sont
+  propagées, comme pour un appel sans cache.
+- L'accès au fournisseur passe par `LLMBackend` : un faux backend local
+  suffit pour tester ce comportement (voir `scripts/bench_llm_cache.py`).
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Protocol
+
+from google.genai import errors
+
+
+class CachedContextMissing(Exception):
+    """Le contexte en cache référencé n'existe plus chez le fournisseur (expiré ou supprimé)."""
+
+
+class LLMBackend(Protocol):
+    """Accès au fournisseur LLM."""
+
+    async def create_cache(self, model: str, prefix: str, ttl_seconds: int) -> tuple[str, datetime]:
+        """Enregistre un préfixe en cache; retourne son nom et sa date d'expiration."""
+        ...
+
+    async def generate(self, model: str, contents: str, config: dict, cached_content: str | None = None) -> Any:
+        """
+        Génère une réponse, éventuellement à la suite d'un contexte en cache.
+
+        Raises:
+            CachedContextMissing: Si `cached_content` n'existe plus chez le fournisseur.
+        """
+        ...
+
+
+class GeminiBackend:
+    """Backend Gemini (`google.genai`)."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    async def create_cache(self, model: str, prefix: str, ttl_seconds: int) -> tuple[str, datetime]:
+        cache = await self._client.aio.caches.create(
+            model=model,
+            config={"system_instruction": prefix, "ttl": f"{ttl_seconds}s", "display_name": "checks-prefix"},
+        )
+        expire_time = cache.expire_time or datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        return cache.name, expire_time
+
+    async def generate(self, model: str, contents: str, config: dict, cached_content: str | None = None) -> Any:
+        if cached_content is None:
+            return await self._client.aio.models.generate_content(model=model, contents=contents, config=config)
+        try:
+            return await self._client.aio.models.generate_content(
+                model=model, contents=contents, config={**config, "cached_content": cached_content}
+            )
+        except errors.ClientError as e:
+            if _cache_missing(e):
+                raise CachedContextMissing(cached_content) from e
+            raise
+
+
+def _cache_missing(error: errors.ClientError) -> bool:
+    """True si l'erreur signale un contexte en cache introuvable ou expiré (404, ou 400/403 sur le contexte)."""
+    message = (error.message or "").lower()
+    return error.status == "NOT_FOUND" or ("cache" in message and ("not found" in message or "expired" in message))
+
+
+@dataclass
+class LLMStats:
+    """Compteurs des appels LLM."""
+
+    calls: int = 0
+    cached_calls: int = 0
+    inline_calls: int = 0
+    cache_creations: int = 0
+    cache_failures: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    latency_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        stats = asdict(self)
+        stats["latency_seconds"] = round(self.latency_seconds, 3)
+        stats["mean_latency_seconds"] = round(self.latency_seconds / self.calls, 3) if self.calls else None
+        return stats
+
+
+@dataclass
+class _CachedContext:
+    name: str | None
+    expire_time: datetime
+
+
+class CachedPrefixLLM:
+    """
+    Appels LLM dont le préfixe statique est mis en cache chez le fournisseur.
+
+    Args:
+        backend: Accès au fournisseur.
+        model: Modèle utilisé.
+        ttl_seconds: Durée de vie des contextes en cache.
+        refresh_margin_seconds: Un contexte est recréé quand il expire dans moins de ce délai.
+        enabled: Si False, le préfixe est toujours envoyé en ligne.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        model: str,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 60,
+        enabled: bool = True,
+    ):
+        self.backend = backend
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = timedelta(seconds=refresh_margin_seconds)
+        self.enabled = enabled
+        self._stats = LLMStats()
+        # Contexte par empreinte de préfixe (name=None : création en échec, pas de nouvel essai avant expire_time)
+        self._contexts: dict[str, _CachedContext] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def _context_name(self, prefix: str) -> str | None:
+        """Nom du contexte en cache pour le préfixe, créé ou recréé si nécessaire."""
+        key = hashlib.sha256(prefix.encode()).hexdigest()
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            context = self._contexts.get(key)
+            now = datetime.now(timezone.utc)
+            if context is not None:
+                # Un contexte est recréé avant son expiration ; une création en échec est retentée à expire_time
+                margin = self.refresh_margin if context.name else timedelta(0)
+                if now < context.expire_time - margin:
+                    return context.name
+
+            try:
+                name, expire_time = await self.backend.create_cache(self.model, prefix, self.ttl_seconds)
+                self._stats.cache_creations += 1
+            except Exception:
+                self._stats.cache_failures += 1
+                name, expire_time = None, now + timedelta(seconds=self.ttl_seconds)
+            self._contexts[key] = _CachedContext(name, expire_time)
+            return name
+
+    def stats(self) -> dict[str, Any]:
+        """Retourne les compteurs d'appels, de contextes en cache et de tokens."""
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "contexts": sum(1 for context in self._contexts.values() if context.name),
+            **self._stats.as_dict(),
+        }
+
+    def _forget(self, prefix: str) -> None:
+        self._contexts.pop(hashlib.sha256(prefix.encode()).hexdigest(), None)
+
+    async def generate(self, prefix: str, contents: str, config: dict, inline_prefix: str | None = None) -> Any:
+        """
+        Génère une réponse pour `prefix` + `contents`.
+
+        Args:
+            prefix: Préfixe statique, mis en cache chez le fournisseur.
+            contents: Partie variable du prompt.
+            config: Configuration de génération (schéma de réponse, ...).
+            inline_prefix: Préfixe envoyé en ligne quand le cache n'est pas
+                utilisable (par défaut `prefix`). Permet d'envoyer un préfixe
+                plus court qu'un contexte en cache complet.
+        """
+        start = time.perf_counter()
+        response = None
+
+        name = await self._context_name(prefix) if self.enabled else None
+        if name is not None:
+            try:
+                response = await self.backend.generate(self.model, contents, config, cached_content=name)
+                self._stats.cached_calls += 1
+            except CachedContextMissing:
+                # Contexte expiré ou supprimé côté fournisseur : il sera recréé au prochain appel
+                self._forget(prefix)
+
+        if response is None:
+            response = await self.backend.generate(
+                self.model, f"{inline_prefix if inline_prefix is not None else prefix}\n\n{contents}", config
+            )
+            self._stats.inline_calls += 1
+
+        self._stats.calls += 1
+        self._stats.latency_seconds += time.perf_counter() - start
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self._stats.prompt_tokens += getattr(usage, "prompt_token_count", None) or 0
+            self._stats.cached_tokens += getattr(usage, "cached_content_token_count", None) or 0
+        return response
+
+
+@lru_cache(maxsize=1)
+def default_llm() -> CachedPrefixLLM:
+    """Client LLM des checks, configuré par les settings (créé au premier appel)."""
+    # Import lazy pour éviter de charger les settings au démarrage
+    from src.config import app_settings, gemini_settings
+
+    return CachedPrefixLLM(
+        GeminiBackend(gemini_settings.CLIENT),
+        gemini_settings.GEMINI_MODEL_2_5_FLASH,
+        ttl_seconds=app_settings.LLM_CONTEXT_CACHE_TTL,
+        enabled=app_settings.LLM_CONTEXT_CACHE,
+    )
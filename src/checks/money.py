@@ -0,0 +1,112 @@
+"""
+Arithmétique monétaire en entiers pour les checks déterministes.
+
+Les montants sont tenus en centimes entiers et les taux (en %) en
+dix-millièmes de point (1.80 % → 18000). Les calculs intermédiaires sont
+exacts (entiers et rationnels) ; seul le résultat final est arrondi.
+
+Règles d'arrondi :
+- Conversion d'une valeur en centimes ou en taux : au plus proche, demi
+  au pair (comme `Decimal.quantize` dans le contexte par défaut). Les
+  montants des bulletins ont deux décimales : la conversion est exacte.
+- Produits et proratisations (abattement CSG, plafond proratisé) : produit
+  exact, puis arrondi au centime au plus proche, demi au pair.
+- Seuils non entiers (3.5 SMIC) : comparés exactement, via `ceil_cents`.
+- Les floats (paramètres, calcul RGDU) passent par leur représentation
+  décimale la plus courte, comme `Decimal(str(x))`.
+
+Les résultats sont rendus en Decimal à deux décimales (`from_cents`).
+"""
+
+from decimal import Decimal
+
+CENTS = 100
+RATE_SCALE = 10_000
+
+Number = Decimal | int | float | str
+
+
+def _ratio(value: Number) -> tuple[int, int]:
+    """Valeur exacte sous forme (numérateur, dénominateur > 0)."""
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, float):
+        value = repr(value)
+    if isinstance(value, str):
+        value = Decimal(value)
+    return value.as_integer_ratio()
+
+
+def div_round(numerator: int, denominator: int) -> int:
+    """Quotient entier arrondi au plus proche, demi au pair (denominator > 0)."""
+    quotient, remainder = divmod(numerator, denominator)
+    double = 2 * remainder
+    if double > denominator or (double == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def to_cents(value: Number | None) -> int | None:
+    """Montant en centimes (None si absent)."""
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        # Cas courant : montant du bulletin à deux décimales, conversion exacte
+        scaled = value.scaleb(2)
+        cents = int(scaled)
+        if cents == scaled:
+            return cents
+    numerator, denominator = _ratio(value)
+    return div_round(numerator * CENTS, denominator)
+
+
+def from_cents(cents: int) -> Decimal:
+    """Centimes → Decimal à deux décimales."""
+    return Decimal(cents).scaleb(-2)
+
+
+def from_scaled(value: int, scale: int) -> Decimal:
+    """Entier à l'échelle 10^scale → Decimal (centimes : scale=2, dix-millièmes de point : scale=4)."""
+    return Decimal(int(value)).scaleb(-scale)
+
+
+def to_rate(value: Number | None) -> int | None:
+    """Taux (%) en dix-millièmes de point (None si absent)."""
+    if value is None:
+        return None
+    numerator, denominator = _ratio(value)
+    return div_round(numerator * RATE_SCALE, denominator)
+
+
+def from_rate(rate: int) -> Decimal:
+    """Dix-millièmes de point → Decimal, avec au moins deux décimales (1.80, 0.125)."""
+    value = Decimal(rate).scaleb(-4)
+    for places in (2, 3):
+        quantized = value.quantize(Decimal(1).scaleb(-places))
+        if quantized == value:
+            return quantized
+    return value
+
+
+def mul(cents: int, factor: Number) -> int:
+    """Montant × facteur, arrondi au centime."""
+    numerator, denominator = _ratio(factor)
+    return div_round(cents * numerator, denominator)
+
+
+def prorate(cents: int, part: Number, whole: Number) -> int:
+    """Montant × part / tout, arrondi au centime (ex: plafond proratisé aux heures)."""
+    part_num, part_den = _ratio(part)
+    whole_num, whole_den = _ratio(whole)
+    return div_round(cents * part_num * whole_den, part_den * whole_num)
+
+
+def ceil_cents(value: Number) -> int:
+    """Plus petit nombre de centimes >= valeur : `c >= ceil_cents(v)` équivaut à `c >= v`."""
+    numerator, denominator = _ratio(value)
+    return -(-numerator * CENTS // denominator)
+
+
+def within(difference: int, tolerance: int) -> bool:
+    """True si l'écart (en unités entières) est dans la tolérance."""
+    return abs(difference) <= tolerance
@@ -0,0 +1,177 @@
+"""
+Paramètres réglementaires par période de paie.
+
+SMIC, plafond de la Sécurité Sociale, formule de réduction générale et taux
+utilisés par les checks, versionnés par date d'entrée en vigueur. Chaque
+check lit les paramètres du mois du bulletin (`fiche.periode`) : un audit
+couvrant plusieurs années se fait en une passe, sans découper les fiches
+par année.
+
+La recherche est mise en cache par (année, mois) : O(1) après le premier
+bulletin du mois.
+
+Avant la première période de la table, le SMIC, le plafond et la formule
+de réduction sont inconnus : le SMIC et le plafond doivent être fournis par
+l'appelant, et la réduction générale n'est pas vérifiée (ses coefficients
+changeaient presque chaque année). L'abattement CSG et le seuil des
+allocations familiales, inchangés, restent appliqués.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+from src.models.payslip import PayPeriod
+
+
+@dataclass(frozen=True)
+class ParametresPeriode:
+    """
+    Paramètres en vigueur à partir d'une date.
+
+    Attributes:
+        debut: Date d'entrée en vigueur.
+        smic_mensuel: SMIC mensuel brut (35h), None si inconnu.
+        plafond_ss: Plafond mensuel de la Sécurité Sociale, None si inconnu.
+        reduction: Formule de réduction générale : "fillon" (avant 2026), "rgdu", ou None si inconnue.
+        seuil_reduction_smic: Seuil d'éligibilité à la réduction, en SMIC (1.6 ou 3).
+        t_50_et_plus: Fillon : coefficient maximal T, entreprise >= 50 salariés (FNAL 0.50%).
+        t_moins_50: Fillon : coefficient maximal T, entreprise < 50 salariés (FNAL 0.10%).
+        tmin: RGDU : taux minimal.
+        tdelta_50_et_plus: RGDU : Tdelta, entreprise >= 50 salariés (FNAL 0.50%).
+        tdelta_moins_50: RGDU : Tdelta, entreprise < 50 salariés (FNAL 0.10%).
+        p: RGDU : exposant du coefficient dégressif.
+        taux_abattement_csg: Part du brut soumise à CSG/CRDS.
+        seuil_alloc_fam_smic: Seuil du taux plein d'allocations familiales, en SMIC.
+    """
+
+    debut: date
+    smic_mensuel: float | None
+    plafond_ss: float | None
+    reduction: str | None
+    seuil_reduction_smic: float
+    t_50_et_plus: float | None = None
+    t_moins_50: float | None = None
+    tmin: float | None = None
+    tdelta_50_et_plus: float | None = None
+    tdelta_moins_50: float | None = None
+    p: float | None = None
+    taux_abattement_csg: Decimal = Decimal("0.9825")
+    seuil_alloc_fam_smic: Decimal = Decimal("3.5")
+
+    def smic(self, smic_mensuel: float | None = None) -> float:
+        """
+        SMIC mensuel imposé par l'appelant, à défaut celui de la période.
+
+        Raises:
+            ValueError: Si aucun n'est connu (période antérieure à la table).
+        """
+        if smic_mensuel is not None:
+            return smic_mensuel
+        if self.smic_mensuel is None:
+            raise ValueError(f"SMIC mensuel inconnu avant {DEBUT_TABLE:%m/%Y} : renseigner smic_mensuel")
+        return self.smic_mensuel
+
+    def plafond(self, plafond_ss: float | None = None) -> float:
+        """
+        Plafond de la Sécurité Sociale imposé par l'appelant, à défaut celui de la période.
+
+        Raises:
+            ValueError: Si aucun n'est connu (période antérieure à la table).
+        """
+        if plafond_ss is not None:
+            return plafond_ss
+        if self.plafond_ss is None:
+            raise ValueError(f"Plafond de la Sécurité Sociale inconnu avant {DEBUT_TABLE:%m/%Y} : renseigner plafond_ss")
+        return self.plafond_ss
+
+
+# Table des paramètres, par date d'entrée en vigueur croissante
+PARAMETRES: list[ParametresPeriode] = [
+    ParametresPeriode(
+        debut=date(2024, 1, 1),
+        smic_mensuel=1766.92,
+        plafond_ss=3864.0,
+        reduction="fillon",
+        seuil_reduction_smic=1.6,
+        t_50_et_plus=0.3234,  # Barème URSSAF 2024 de la réduction générale, FNAL 0,50 %
+        t_moins_50=0.3194,  # Barème URSSAF 2024 de la réduction générale, FNAL 0,10 %
+    ),
+    ParametresPeriode(
+        debut=date(2024, 11, 1),
+        smic_mensuel=1801.80,
+        plafond_ss=3864.0,
+        reduction="fillon",
+        seuil_reduction_smic=1.6,
+        t_50_et_plus=0.3234,  # Barème URSSAF 2024 de la réduction générale, FNAL 0,50 %
+        t_moins_50=0.3194,  # Barème URSSAF 2024 de la réduction générale, FNAL 0,10 %
+    ),
+    ParametresPeriode(
+        debut=date(2025, 1, 1),
+        smic_mensuel=1801.80,
+        plafond_ss=3925.0,
+        reduction="fillon",
+        seuil_reduction_smic=1.6,
+        t_50_et_plus=0.3233,  # Barème URSSAF 2025 de la réduction générale, FNAL 0,50 %
+        t_moins_50=0.3193,  # Barème URSSAF 2025 de la réduction générale, FNAL 0,10 %
+    ),
+    ParametresPeriode(
+        debut=date(2026, 1, 1),
+        smic_mensuel=1823.03,
+        plafond_ss=4005.0,
+        reduction="rgdu",
+        seuil_reduction_smic=3.0,
+        tmin=0.0200,
+        tdelta_50_et_plus=0.3821,  # Barème URSSAF 2026 de la RGDU, FNAL 0,50 %
+        tdelta_moins_50=0.3781,  # Barème URSSAF 2026 de la RGDU, FNAL 0,10 %
+        p=1.75,
+    ),
+]
+
+_DEBUTS = [parametres.debut for parametres in PARAMETRES]
+
+# Premier mois couvert par la table
+DEBUT_TABLE = _DEBUTS[0]
+
+# Mois antérieurs à la table : SMIC et plafond à fournir par l'appelant, réduction générale non vérifiée
+PARAMETRES_ANTERIEURS = replace(
+    PARAMETRES[0],
+    debut=date.min,
+    smic_mensuel=None,
+    plafond_ss=None,
+    reduction=None,
+    t_50_et_plus=None,
+    t_moins_50=None,
+)
+
+
+@lru_cache(maxsize=None)
+def parametres_mois(annee: int, mois: int) -> ParametresPeriode:
+    """
+    Paramètres en vigueur pour un mois de paie.
+
+    Avant la première période de la table : `PARAMETRES_ANTERIEURS` (SMIC,
+    plafond et formule de réduction inconnus).
+    """
+    position = bisect_right(_DEBUTS, date(annee, mois, 1))
+    if position == 0:
+        return PARAMETRES_ANTERIEURS
+    return PARAMETRES[position - 1]
+
+
+def parametres_periode(periode: PayPeriod) -> ParametresPeriode:
+    """
+    Paramètres en vigueur pour la période d'un bulletin.
+
+    Le mois est pris dans `periode.annee`/`periode.mois`, à défaut dans la
+    date de fin (ou de début) de période. Sans période connue, les
+    paramètres les plus récents de la table sont utilisés.
+    """
+    if periode.annee and periode.mois:
+        return parametres_mois(periode.annee, periode.mois)
+    jour = periode.date_fin or periode.date_debut
+    if jour is not None:
+        return parametres_mois(jour.year, jour.month)
+    return PARAMETRES[-1]
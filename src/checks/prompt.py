@@ -0,0 +1,92 @@
+"""
+Sérialisation compacte d'une fiche de paie pour les prompts LLM.
+
+`fiche.model_dump_json(indent=2)` contient chaque ligne deux fois (`lignes`
+et `lignes_liste`), tous les champs nuls, les métadonnées d'extraction et
+l'indentation : environ la moitié des tokens ne sert pas à l'analyse. Ici :
+
+- une section par bloc, en JSON compact, sans champs nuls ;
+- seuls les champs utiles à l'analyse de la convention collective (ni
+  identité, ni adresse, ni SIRET/NIR, ni IBAN, ni métadonnées ; le code
+  APE et l'URSSAF, non personnels, sont conservés) ;
+- les lignes une seule fois, en tableau (une ligne par rubrique, colonnes
+  séparées par `|`, cellule vide pour une valeur absente).
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from src.models.payslip import FichePayeExtracted, PayslipLine
+
+
+# Champs conservés par section
+CHAMPS_EMPLOYEUR = ("entreprise", "etablissement", "urssaf", "ape", "convention_collective")
+CHAMPS_EMPLOYE = ("date_entree", "qualification", "emploi", "echelon", "coefficient", "categorie")
+CHAMPS_PERIODE = ("date_debut", "date_fin", "mois", "annee")
+CHAMPS_TOTAUX = (
+    "salaire_brut",
+    "total_retenues_salariales",
+    "total_cotisations_patronales",
+    "net_avant_impot",
+    "net_imposable",
+    "net_social",
+    "net_a_payer",
+    "heures_travaillees",
+    "heures_supplementaires",
+    "cumul_heures",
+)
+CHAMPS_CONGES = ("conges_n", "conges_n1", "conges_n2", "rtt", "rtt_pris", "anciennete")
+
+# Colonnes du tableau des lignes
+COLONNES_LIGNES = ("numero", "libelle", "base", "taux_salarial", "montant_salarial", "taux_patronal", "montant_patronal")
+
+
+def _value(value: object) -> object:
+    """Valeur JSON d'un champ (montants en texte exact, dates ISO)."""
+    if isinstance(value, Decimal):
+        return format(value, "f")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _section(name: str, model: object, fields: tuple[str, ...]) -> str | None:
+    """Section `nom {json}` sans champs nuls, ou None si elle est vide."""
+    values = {field: _value(getattr(model, field)) for field in fields if getattr(model, field) not in (None, "")}
+    if not values:
+        return None
+    return f"{name} {json.dumps(values, ensure_ascii=False, separators=(',', ':'))}"
+
+
+def _cell(value: object) -> str:
+    if value is None:
+        return ""
+    return str(_value(value)).replace("|", "/").replace("\n", " ")
+
+
+def _row(ligne: PayslipLine) -> str:
+    return "|".join(_cell(getattr(ligne, colonne)) for colonne in COLONNES_LIGNES)
+
+
+def compact_fiche(fiche: FichePayeExtracted) -> str:
+    """
+    Fiche de paie sérialisée pour un prompt : compacte, sans nuls ni champs hors analyse.
+
+    Returns:
+        Texte d'une section par ligne (`employeur`, `employe`, `periode`,
+        `totaux`, `conges`), suivi du tableau `lignes`.
+    """
+    sections = [
+        _section("employeur", fiche.employeur, CHAMPS_EMPLOYEUR),
+        _section("employe", fiche.employe, CHAMPS_EMPLOYE),
+        _section("periode", fiche.periode, CHAMPS_PERIODE),
+        _section("totaux", fiche.totaux, CHAMPS_TOTAUX),
+        _section("conges", fiche.conges, CHAMPS_CONGES),
+    ]
+    lignes = fiche.lignes_liste or list(fiche.lignes.values())
+    if lignes:
+        sections.append("lignes " + "|".join(COLONNES_LIGNES))
+        sections.extend(_row(ligne) for ligne in lignes)
+    return "\n".join(section for section in sections if section is not None)
+
@@ -0,0 +1,196 @@
+"""
+Registre des checks de fiche de paie.
+
+Chaque check déclare son nom, les données de la fiche qu'il lit, s'il
+passe par un LLM et les étapes dont il dépend. `run_checks` ne lance que le
+sous-graphe nécessaire aux checks demandés : un appel de tri qui ne veut
+que le RGDU ne paie ni la classification des libellés ni les appels LLM.
+
+L'ordre du registre est l'ordre du rapport ; une étape est toujours
+enregistrée après ses dépendances.
+"""
+
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable
+
+from src.models.check import CheckResult
+from src.models.payslip import FichePayeExtracted
+
+from .allocations_familiales import check_allocations_familiales
+from .bases import check_bases
+from .classification import LibelleIndex, build_libelle_index
+from .convention import check_convention
+from .csg import check_csg
+from .fiscal import check_fiscal
+from .frappe import check_frappe
+from .rgdu import check_rgdu
+
+
+@dataclass
+class CheckContext:
+    """
+    Données partagées par les checks d'une même exécution.
+
+    Attributes:
+        fiche: Fiche de paie extraite.
+        smic_mensuel: SMIC mensuel, ou None pour celui de la période du bulletin.
+        effectif_50_et_plus: True si entreprise >= 50 salariés.
+        plafond_ss: Plafond de la Sécurité Sociale, ou None pour celui de la période du bulletin.
+        index: Classification des libellés (étape "classification").
+    """
+
+    fiche: FichePayeExtracted
+    smic_mensuel: float | None
+    effectif_50_et_plus: bool
+    plafond_ss: float | None
+    index: LibelleIndex | None = None
+
+
+@dataclass(frozen=True)
+class CheckSpec:
+    """
+    Déclaration d'un check (ou d'une étape préparatoire).
+
+    Attributes:
+        name: Nom du check, utilisé par include/exclude.
+        runner: Fonction exécutant le check sur le contexte. Coroutine pour les checks LLM.
+        inputs: Données lues : brut, heures, net, lignes, employe, employeur, parametres, fiche.
+        is_llm: True si le check appelle un LLM (exécuté en parallèle, hors thread).
+        depends_on: Étapes à exécuter avant ce check.
+        reported: False pour une étape préparatoire sans résultat dans le rapport.
+    """
+
+    name: str
+    runner: Callable[[CheckContext], list[CheckResult] | Awaitable[list[CheckResult]]]
+    inputs: frozenset[str] = field(default_factory=frozenset)
+    is_llm: bool = False
+    depends_on: tuple[str, ...] = ()
+    reported: bool = True
+
+
+def _classify(ctx: CheckContext) -> list[CheckResult]:
+    ctx.index = build_libelle_index(ctx.fiche)
+    return []
+
+
+CHECKS: dict[str, CheckSpec] = {}
+
+
+def register(spec: CheckSpec) -> CheckSpec:
+    """
+    Enregistre un check.
+
+    Raises:
+        ValueError: Si le nom est déjà pris, si une dépendance n'est pas
+            enregistrée ou si un check LLM a des dépendances (il est lancé en
+            même temps que les étapes déterministes).
+    """
+    if spec.name in CHECKS:
+        raise ValueError(f"Check déjà enregistré : {spec.name}")
+    missing = [name for name in spec.depends_on if name not in CHECKS]
+    if missing:
+        raise ValueError(f"Dépendances inconnues pour {spec.name} : {', '.join(missing)}")
+    if spec.is_llm and spec.depends_on:
+        raise ValueError(f"Un check LLM ne peut pas avoir de dépendances : {spec.name}")
+    CHECKS[spec.name] = spec
+    return spec
+
+
+def _inputs(*names: str) -> frozenset[str]:
+    return frozenset(names)
+
+
+register(CheckSpec(
+    name="classification",
+    runner=_classify,
+    inputs=_inputs("lignes"),
+    reported=False,
+))
+register(CheckSpec(
+    name="rgdu",
+    runner=lambda ctx: [check_rgdu(ctx.fiche, ctx.smic_mensuel, ctx.effectif_50_et_plus)],
+    inputs=_inputs("brut", "heures", "lignes", "parametres"),
+))
+register(CheckSpec(
+    name="bases",
+    runner=lambda ctx: check_bases(ctx.fiche, ctx.plafond_ss, ctx.index),
+    inputs=_inputs("brut", "heures", "lignes", "parametres"),
+    depends_on=("classification",),
+))
+register(CheckSpec(
+    name="fiscal",
+    runner=lambda ctx: [check_fiscal(ctx.fiche, ctx.index)],
+    inputs=_inputs("net", "lignes"),
+    depends_on=("classification",),
+))
+register(CheckSpec(
+    name="csg",
+    runner=lambda ctx: [check_csg(ctx.fiche, ctx.index)],
+    inputs=_inputs("brut", "lignes", "employe"),
+    depends_on=("classification",),
+))
+register(CheckSpec(
+    name="allocations_familiales",
+    runner=lambda ctx: [check_allocations_familiales(ctx.fiche, ctx.smic_mensuel, ctx.index)],
+    inputs=_inputs("brut", "lignes", "parametres"),
+    depends_on=("classification",),
+))
+register(CheckSpec(
+    name="frappe",
+    runner=lambda ctx: check_frappe(ctx.fiche),
+    inputs=_inputs("lignes", "employe", "employeur"),
+    is_llm=True,
+))
+register(CheckSpec(
+    name="convention",
+    runner=lambda ctx: check_convention(ctx.fiche),
+    inputs=_inputs("fiche"),
+    is_llm=True,
+))
+
+
+def _validate(names: Iterable[str]) -> list[str]:
+    names = list(names)
+    unknown = [name for name in names if name not in CHECKS or not CHECKS[name].reported]
+    if unknown:
+        available = ", ".join(name for name, spec in CHECKS.items() if spec.reported)
+        raise ValueError(f"Check(s) inconnu(s) : {', '.join(unknown)} (disponibles : {available})")
+    return names
+
+
+def resolve_checks(
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    include_llm: Iterable[str] = (),
+) -> list[CheckSpec]:
+    """
+    Retourne les étapes à exécuter, dans l'ordre du registre.
+
+    Args:
+        include: Checks demandés. Si None, tous les checks déterministes
+            plus les checks LLM de `include_llm`.
+        exclude: Checks à retirer de la sélection. Une étape reste exécutée
+            si un check sélectionné en dépend.
+        include_llm: Checks LLM activés quand `include` est None.
+
+    Raises:
+        ValueError: Si un nom de check est inconnu.
+    """
+    if include is None:
+        llm = set(_validate(include_llm))
+        selected = {name for name, spec in CHECKS.items() if spec.reported and (not spec.is_llm or name in llm)}
+    else:
+        selected = set(_validate(include))
+    selected -= set(_validate(exclude or ()))
+
+    # Fermeture par les dépendances
+    required: set[str] = set()
+    pending = list(selected)
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            pending.extend(CHECKS[name].depends_on)
+
+    return [spec for name, spec in CHECKS.items() if name in required]
+
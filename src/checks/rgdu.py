@@ -1,13 +1,54 @@
 """
 Calcul de la Réduction Générale Dégressive Unique (RGDU) 2026
 Selon le décret n°2025-887 du 4 septembre 2025
+
+Avant 2026, la réduction générale suit la formule Fillon
+(`calculer_reduction_fillon`) ; `check_rgdu` choisit la formule et ses
+paramètres d'après la période du bulletin (voir `parametres`).
 """
 
-from decimal import Decimal
 from typing import Any
 
+import numpy as np
+
 from src.models.payslip import FichePayeExtracted
 from src.models.check import CheckResult
+from src.checks.money import from_cents, to_cents, within
+from src.checks.parametres import DEBUT_TABLE, ParametresPeriode, parametres_mois, parametres_periode
+
+
+TOLERANCE = 50  # Tolérance de 50 centimes pour les arrondis
+
+# Paramètres par défaut des calculs : première période RGDU
+PARAMETRES_RGDU = parametres_mois(2026, 1)
+
+# Messages de check_rgdu (formatés à la demande, `calcul` = résultat du calcul,
+# `nom` = "RGDU" ou "réduction Fillon", `multiple` = seuil d'éligibilité en SMIC)
+MESSAGE_NON_ELIGIBLE_SANS_LIGNE = (
+    "Pas de ligne RGDU trouvée, cohérent car le salarié n'est pas éligible "
+    "(brut={brut}€, seuil {multiple:g} SMIC={calcul[seuil_smic]}€)."
+)
+MESSAGE_LIGNE_MANQUANTE = (
+    "Ligne RGDU ({ligne}) non trouvée dans la fiche alors qu'une réduction de {attendue}€ était attendue."
+)
+MESSAGE_ELIGIBLE = (
+    "RGDU calculée: coefficient={calcul[coefficient]:.4f} × brut={brut}€ = {attendue}€. "
+    "Paramètres: Tmin={calcul[parametres][Tmin]}, Tdelta={calcul[parametres][Tdelta]}, Tmax={calcul[parametres][Tmax]}, "
+    "SMIC ajusté={calcul[smic_ajuste]}€, ratio={calcul[ratio_smic]:.3f}×SMIC. "
+    "Valeur sur fiche: {obtenue}€. "
+    "Écart: {difference}€."
+)
+MESSAGE_ELIGIBLE_FILLON = (
+    "Réduction Fillon calculée: coefficient={calcul[coefficient]:.4f} × brut={brut}€ = {attendue}€. "
+    "Paramètres: T={calcul[parametres][T]}, "
+    "SMIC ajusté={calcul[smic_ajuste]}€, ratio={calcul[ratio_smic]:.3f}×SMIC. "
+    "Valeur sur fiche: {obtenue}€. "
+    "Écart: {difference}€."
+)
+MESSAGE_NON_ELIGIBLE = (
+    "Salarié non éligible à la {nom} (brut={brut}€ >= seuil {multiple:g} SMIC={calcul[seuil_smic]}€). "
+    "Réduction attendue: 0€. Valeur sur fiche: {obtenue}€."
+)
 
 
 def calculer_rgdu(
@@ -17,6 +58,7 @@ def calculer_rgdu(
     effectif_50_et_plus: bool = True,
     smic_mensuel: float = 1823.03,
     tdeltaopt:Any = None,
+    parametres: ParametresPeriode | None = None,
 ) -> dict:
     """
     Calcule la réduction générale dégressive unique (RGDU) mensuelle.
@@ -28,17 +70,19 @@ def calculer_rgdu(
         effectif_50_et_plus: True si entreprise >= 50 salariés, False sinon
         smic_mensuel: SMIC mensuel brut 2026 (défaut 1823.03 €)
         tdeltaopt: Valeur optionnelle pour Tdelta (par défaut None, utilise la valeur standard)
+        parametres: Paramètres de la période (défaut : 2026)
         dict avec le détail de chaque étape du calcul
     """
+    parametres = parametres or PARAMETRES_RGDU
 
     # --- Paramètres selon la taille de l'entreprise ---
-    Tmin = 0.0200
-    P = 1.75
+    Tmin = parametres.tmin
+    P = parametres.p
 
     if effectif_50_et_plus:
-        Tdelta = 0.3821  # FNAL à 0.50%
+        Tdelta = parametres.tdelta_50_et_plus  # FNAL à 0.50%
     else:
-        Tdelta = 0.3781  # FNAL à 0.10%
+        Tdelta = parametres.tdelta_moins_50  # FNAL à 0.10%
     if tdeltaopt is not None:
         Tdelta = tdeltaopt
 
@@ -60,7 +104,8 @@ def calculer_rgdu(
     rab = brut_mensuel * 12  # Rémunération annuelle brute
 
     # --- Étape 4 : Vérification éligibilité (brut < 3 × SMIC) ---
-    seuil_3_smic = 3 * smic_ajuste_mensuel
+    seuil = parametres.seuil_reduction_smic
+    seuil_3_smic = seuil * smic_ajuste_mensuel
     eligible = brut_mensuel < seuil_3_smic
 
     if not eligible:
@@ -71,6 +116,7 @@ def calculer_rgdu(
             "assiette_brut": brut_mensuel,
             "ratio_smic": round(brut_mensuel / smic_ajuste_mensuel, 3),
             "seuil_3_smic": round(seuil_3_smic, 2),
+            "seuil_smic": round(seuil_3_smic, 2),
             "eligible": False,
             "coefficient": 0,
             "reduction_mensuelle": 0,
@@ -88,7 +134,7 @@ def calculer_rgdu(
 
     # --- Étape 6 : Coefficient dégressif ---
     # inner = (1/2) × (3 × SMIC_annuel / RAB - 1)
-    inner = 0.5 * (3 * smic_annuel / rab - 1)
+    inner = 0.5 * (seuil * smic_annuel / rab - 1)
 
     # Si inner <= 0, le salarié est à >= 3 SMIC, pas de réduction au-delà de Tmin
     if inner <= 0:
@@ -121,6 +167,7 @@ def calculer_rgdu(
         "rab": round(rab, 2),
         "ratio_smic": round(ratio_smic, 3),
         "seuil_3_smic": round(seuil_3_smic, 2),
+        "seuil_smic": round(seuil_3_smic, 2),
         "eligible": True,
         "inner": round(inner, 6),
         "coefficient_degressif": round(coefficient_degressif, 6),
@@ -136,6 +183,166 @@ def calculer_rgdu(
     }
 
 
+def calculer_reduction_fillon(
+    brut_mensuel: float,
+    heures_contractuelles: float = 151.67,
+    heures_supplementaires: float = 0,
+    effectif_50_et_plus: bool = True,
+    smic_mensuel: float = 1801.80,
+    parametres: ParametresPeriode | None = None,
+) -> dict:
+    """
+    Calcule la réduction générale mensuelle selon la formule Fillon (avant 2026).
+
+    Coefficient = (T / 0.6) × (1.6 × SMIC annuel / RAB - 1), arrondi à 4
+    décimales et plafonné à T. Mêmes étapes de SMIC ajusté que `calculer_rgdu`.
+
+    Args:
+        brut_mensuel: Salaire brut total du bulletin
+        heures_contractuelles: Heures contractuelles mensuelles (défaut 151.67 pour 35h)
+        heures_supplementaires: Nombre d'heures supplémentaires du mois
+        effectif_50_et_plus: True si entreprise >= 50 salariés, False sinon
+        smic_mensuel: SMIC mensuel brut de la période
+        parametres: Paramètres de la période (défaut : 2025)
+
+    Returns:
+        dict avec le détail du calcul (mêmes clés principales que `calculer_rgdu`)
+    """
+    parametres = parametres or parametres_mois(2025, 1)
+    T = parametres.t_50_et_plus if effectif_50_et_plus else parametres.t_moins_50
+    seuil = parametres.seuil_reduction_smic
+
+    HEURES_TEMPS_PLEIN = 151.67
+    smic_reference = round(smic_mensuel * (heures_contractuelles / HEURES_TEMPS_PLEIN), 2)
+    majoration_hs = round(smic_mensuel / HEURES_TEMPS_PLEIN * heures_supplementaires, 2)
+    smic_ajuste_mensuel = smic_reference + majoration_hs
+
+    seuil_smic = seuil * smic_ajuste_mensuel
+    eligible = brut_mensuel < seuil_smic
+
+    coefficient = 0
+    if eligible:
+        coefficient = (T / 0.6) * (seuil * smic_ajuste_mensuel * 12 / (brut_mensuel * 12) - 1)
+        coefficient = round(min(max(coefficient, 0.0), T), 4)
+
+    return {
+        "smic_reference": smic_reference,
+        "majoration_hs": majoration_hs,
+        "smic_ajuste": round(smic_ajuste_mensuel, 2),
+        "assiette_brut": brut_mensuel,
+        "ratio_smic": round(brut_mensuel / smic_ajuste_mensuel, 3),
+        "seuil_smic": round(seuil_smic, 2),
+        "eligible": eligible,
+        "coefficient": coefficient,
+        "reduction_mensuelle": round(coefficient * brut_mensuel, 2) if eligible else 0,
+        "parametres": {
+            "T": T,
+            "effectif": "≥ 50" if effectif_50_et_plus else "< 50",
+        },
+    }
+
+
+# Marge (en unités de la dernière décimale) sous laquelle un arrondi NumPy
+# peut différer de round() : ces lignes sont recalculées par calculer_rgdu
+_ROUNDING_MARGIN = 1e-6
+
+
+def _round(values: np.ndarray, decimals: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Arrondit comme round() et signale les valeurs à recalculer en scalaire.
+
+    np.round multiplie par 10**decimals avant d'arrondir : le résultat est
+    identique à round() sauf quand la valeur tombe à une erreur d'arrondi
+    près d'une demi-unité.
+    """
+    scaled = values * 10.0**decimals
+    fragile = np.abs(scaled - np.floor(scaled) - 0.5) < _ROUNDING_MARGIN
+    return np.round(values, decimals), fragile
+
+
+def calculer_rgdu_batch(
+    brut_mensuel: Any,
+    heures_contractuelles: Any = 151.67,
+    heures_supplementaires: Any = 0,
+    effectif_50_et_plus: Any = True,
+    smic_mensuel: float = 1823.03,
+    tdeltaopt: float | None = None,
+    parametres: ParametresPeriode | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Calcule la RGDU mensuelle de plusieurs salariés à la fois.
+
+    Même calcul que `calculer_rgdu`, étape par étape, sur des tableaux NumPy.
+    Les lignes dont un arrondi est à la limite d'une demi-unité sont
+    recalculées par `calculer_rgdu` : les résultats sont identiques à ceux de
+    la version scalaire.
+
+    Args:
+        brut_mensuel: Salaires bruts (tableau ou scalaire, strictement positifs)
+        heures_contractuelles: Heures contractuelles mensuelles (tableau ou scalaire)
+        heures_supplementaires: Heures supplémentaires du mois (tableau ou scalaire)
+        effectif_50_et_plus: Effectif >= 50 salariés (tableau ou scalaire)
+        smic_mensuel: SMIC mensuel brut
+        tdeltaopt: Valeur optionnelle pour Tdelta, appliquée à toutes les lignes
+        parametres: Paramètres RGDU de la période (défaut : 2026)
+
+    Returns:
+        dict de tableaux : smic_ajuste, eligible, coefficient, reduction_mensuelle
+    """
+    brut, heures, hs, effectif = np.broadcast_arrays(
+        np.asarray(brut_mensuel, dtype=float),
+        np.asarray(heures_contractuelles, dtype=float),
+        np.asarray(heures_supplementaires, dtype=float),
+        np.asarray(effectif_50_et_plus, dtype=bool),
+    )
+
+    parametres = parametres or PARAMETRES_RGDU
+    Tmin = parametres.tmin
+    P = parametres.p
+    seuil = parametres.seuil_reduction_smic
+    if tdeltaopt is not None:
+        Tdelta = np.full(brut.shape, tdeltaopt)
+    else:
+        Tdelta = np.where(effectif, parametres.tdelta_50_et_plus, parametres.tdelta_moins_50)
+    Tmax = Tmin + Tdelta
+
+    HEURES_TEMPS_PLEIN = 151.67
+    smic_reference, fragile = _round(smic_mensuel * (heures / HEURES_TEMPS_PLEIN), 2)
+    smic_horaire = smic_mensuel / HEURES_TEMPS_PLEIN
+    majoration_hs, fragile_hs = _round(smic_horaire * hs, 2)
+    fragile |= fragile_hs
+    smic_ajuste = smic_reference + majoration_hs
+
+    smic_annuel = smic_ajuste * 12
+    rab = brut * 12
+    eligible = brut < seuil * smic_ajuste
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inner = 0.5 * (seuil * smic_annuel / rab - 1)
+        coefficient_degressif = np.where(inner <= 0, 0.0, np.power(np.maximum(inner, 0.0), P))
+    coefficient = np.maximum(np.minimum(Tmin + Tdelta * coefficient_degressif, Tmax), Tmin)
+    coefficient, fragile_coef = _round(coefficient, 4)
+    reduction, fragile_reduction = _round(coefficient * brut, 2)
+    fragile |= eligible & (fragile_coef | fragile_reduction)
+
+    result = {
+        "smic_ajuste": np.round(smic_ajuste, 2),
+        "eligible": eligible,
+        "coefficient": np.where(eligible, coefficient, 0.0),
+        "reduction_mensuelle": np.where(eligible, reduction, 0.0),
+    }
+
+    # Cas limites d'arrondi : recalcul scalaire
+    for i in zip(*np.nonzero(fragile)):
+        detail = calculer_rgdu(
+            float(brut[i]), float(heures[i]), float(hs[i]), bool(effectif[i]), smic_mensuel, tdeltaopt, parametres
+        )
+        for key in result:
+            result[key][i] = detail[key]
+
+    return result
+
+
 def afficher_resultat(result: dict) -> None:
     """Affiche le détail du calcul RGDU étape par étape."""
     p = result["parametres"]
@@ -165,15 +372,19 @@ def afficher_resultat(result: dict) -> None:
 
 def check_rgdu(
     fiche: FichePayeExtracted,
-    smic_mensuel: float,
+    smic_mensuel: float | None,
     effectif_50_et_plus: bool,
 ) -> CheckResult:
     """
     Vérifie la ligne RGDU d'une fiche de paie extraite.
 
+    La formule (RGDU, ou Fillon avant 2026) et ses paramètres sont ceux de la
+    période du bulletin. Avant la table des paramètres, la réduction n'est
+    pas vérifiée (résultat "paramètres inconnus").
+
     Args:
         fiche: Fiche de paie extraite.
-        smic_mensuel: SMIC mensuel en vigueur.
+        smic_mensuel: SMIC mensuel. Si None, celui de la période du bulletin.
         effectif_50_et_plus: True si entreprise >= 50 salariés.
 
     Returns:
@@ -203,25 +414,55 @@ def check_rgdu(
     heures_sup = fiche.totaux.heures_supplementaires
     heures_supplementaires = float(heures_sup) if heures_sup is not None else 0.0
 
-    # Calculer la réduction attendue
-    resultat_calcul = calculer_rgdu(
+    # Calculer la réduction attendue, selon la formule de la période
+    parametres = parametres_periode(fiche.periode)
+    if parametres.reduction is None:
+        # Période antérieure à la table : coefficients inconnus, pas d'estimation
+        return CheckResult(
+            test_name="rgdu",
+            valid=False,
+            is_line_error=False,
+            line_number=None,
+            obtained_value=None,
+            expected_value=None,
+            difference=None,
+            message=(
+                "Impossible de vérifier la réduction générale: paramètres inconnus pour cette période "
+                f"(table à partir de {DEBUT_TABLE:%m/%Y})."
+            ),
+        )
+    calculer = calculer_reduction_fillon if parametres.reduction == "fillon" else calculer_rgdu
+    resultat_calcul = calculer(
         brut_mensuel=float(brut_mensuel),
         heures_contractuelles=heures_contractuelles,
         heures_supplementaires=heures_supplementaires,
         effectif_50_et_plus=effectif_50_et_plus,
-        smic_mensuel=smic_mensuel,
+        smic_mensuel=parametres.smic(smic_mensuel),
+        parametres=parametres,
     )
 
-    expected_value = Decimal(str(resultat_calcul["reduction_mensuelle"]))
+    # Réduction attendue au centime ; les comparaisons se font en centimes entiers
+    expected_cents = to_cents(resultat_calcul["reduction_mensuelle"])
+    expected_value = from_cents(expected_cents)
+    params = {
+        "calcul": resultat_calcul,
+        "brut": brut_mensuel,
+        "ligne": LIGNE_RGDU,
+        "attendue": expected_value,
+        "nom": "réduction Fillon" if parametres.reduction == "fillon" else "RGDU",
+        "multiple": parametres.seuil_reduction_smic,
+    }
 
     # Chercher la ligne RGDU dans la fiche
     ligne_rgdu = fiche.lignes.get(LIGNE_RGDU)
 
     if ligne_rgdu is None:
         # Pas de ligne RGDU trouvée
-        if expected_value == 0:
+        if expected_cents == 0:
             # C'est normal si le salarié n'est pas éligible
-            return CheckResult(
+            return CheckResult.lazy(
+                MESSAGE_NON_ELIGIBLE_SANS_LIGNE,
+                params,
                 test_name="rgdu",
                 valid=True,
                 is_line_error=True,
@@ -229,10 +470,11 @@ def check_rgdu(
                 obtained_value=None,
                 expected_value=expected_value,
                 difference=None,
-                message=f"Pas de ligne RGDU trouvée, cohérent car le salarié n'est pas éligible (brut={brut_mensuel}€, seuil 3 SMIC={resultat_calcul['seuil_3_smic']}€).",
             )
         else:
-            return CheckResult(
+            return CheckResult.lazy(
+                MESSAGE_LIGNE_MANQUANTE,
+                params,
                 test_name="rgdu",
                 valid=False,
                 is_line_error=True,
@@ -240,7 +482,6 @@ def check_rgdu(
                 obtained_value=None,
                 expected_value=expected_value,
                 difference=None,
-                message=f"Ligne RGDU ({LIGNE_RGDU}) non trouvée dans la fiche alors qu'une réduction de {expected_value}€ était attendue.",
             )
 
     # Extraire la valeur obtenue (montant patronal, généralement négatif car c'est une réduction)
@@ -262,39 +503,29 @@ def check_rgdu(
 
     # La valeur RGDU sur la fiche est souvent négative (réduction)
     # On compare en valeur absolue
-    obtained_abs = abs(obtained_value)
-    expected_abs = abs(expected_value)
-    difference = obtained_abs - expected_abs
-
-    # Tolérance de 0.01€ pour les arrondis
-    tolerance = Decimal("0.50")
-    valid = abs(difference) <= tolerance
-
-    # Construire le message explicatif
-    params = resultat_calcul["parametres"]
-    if resultat_calcul["eligible"]:
-        message = (
-            f"RGDU calculée: coefficient={resultat_calcul['coefficient']:.4f} × brut={brut_mensuel}€ = {expected_value}€. "
-            f"Paramètres: Tmin={params['Tmin']}, Tdelta={params['Tdelta']}, Tmax={params['Tmax']}, "
-            f"SMIC ajusté={resultat_calcul['smic_ajuste']}€, ratio={resultat_calcul['ratio_smic']:.3f}×SMIC. "
-            f"Valeur sur fiche: {obtained_value}€. "
-            f"Écart: {difference}€."
-        )
-    else:
-        message = (
-            f"Salarié non éligible à la RGDU (brut={brut_mensuel}€ >= seuil 3 SMIC={resultat_calcul['seuil_3_smic']}€). "
-            f"Réduction attendue: 0€. Valeur sur fiche: {obtained_value}€."
-        )
+    difference_cents = abs(to_cents(obtained_value)) - abs(expected_cents)
+    difference = from_cents(difference_cents)
+
+    valid = within(difference_cents, TOLERANCE)
 
-    return CheckResult(
+    # Message explicatif, formaté seulement s'il est renvoyé
+    params.update(obtenue=obtained_value, difference=difference)
+    if not resultat_calcul["eligible"]:
+        template = MESSAGE_NON_ELIGIBLE
+    elif parametres.reduction == "fillon":
+        template = MESSAGE_ELIGIBLE_FILLON
+    else:
+        template = MESSAGE_ELIGIBLE
+    return CheckResult.lazy(
+        template,
+        params,
         test_name="rgdu",
         valid=valid,
         is_line_error=True,
         line_number=LIGNE_RGDU,
         obtained_value=obtained_value,
-        expected_value=expected_value if resultat_calcul["eligible"] else Decimal("0"),
+        expected_value=expected_value if resultat_calcul["eligible"] else from_cents(0),
         difference=difference,
-        message=message,
     )
 
 
@@ -305,3 +536,27 @@ if __name__ == "__main__":
     r1 = calculer_rgdu(brut_mensuel=3309.44, effectif_50_et_plus=True, heures_supplementaires=0, tdeltaopt=0.3241)
     afficher_resultat(r1)
 
+
+    print("TEST BATCH (comparaison exhaustive avec calculer_rgdu)")
+    import itertools
+    import sys
+    import time
+
+    bruts = np.round(np.arange(500.0, 9000.0, 0.37), 2)
+    grille = list(itertools.product([151.67, 120.0, 75.83, 169.0], [0.0, 4.0, 17.33], [True, False]))
+    ecarts = 0
+    duree_scalaire = duree_batch = 0.0
+    for heures, hs, effectif in grille:
+        start = time.perf_counter()
+        batch = calculer_rgdu_batch(bruts, heures, hs, effectif)
+        duree_batch += time.perf_counter() - start
+        start = time.perf_counter()
+        scalaires = [calculer_rgdu(float(brut), heures, hs, effectif) for brut in bruts]
+        duree_scalaire += time.perf_counter() - start
+        for i, detail in enumerate(scalaires):
+            if any(batch[key][i] != detail[key] for key in batch):
+                ecarts += 1
+                print(f"  écart : brut={bruts[i]} heures={heures} hs={hs} effectif={effectif}")
+    print(f"  {len(bruts) * len(grille)} cas, {ecarts} écart(s)")
+    print(f"  scalaire {duree_scalaire:.2f}s, batch {duree_batch:.3f}s")
+    sys.exit(1 if ecarts else 0)
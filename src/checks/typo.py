@@ -0,0 +1,299 @@
+"""
+Détection locale des fautes de frappe dans les libellés.
+
+La plupart des fautes visées par le check LLM (`frappe.py`) sont des
+glissements d'une lettre sur un vocabulaire connu : "Viellesse",
+"Allocatons". Ce module les détecte sans appel réseau, à partir d'un
+vocabulaire de paie et d'un index de suppressions façon SymSpell : chaque
+mot du vocabulaire est indexé sous toutes ses variantes obtenues en
+supprimant jusqu'à `max_distance` lettres ; un mot inconnu est comparé aux
+seuls mots qui partagent une de ses variantes.
+
+La comparaison ignore la casse et les accents : une faute d'accent n'est
+pas une faute de frappe (règle du prompt LLM). Les formes fléchies d'un mot
+connu (pluriel, féminin : "payées", "sociaux") sont acceptées.
+
+Une faute n'est affirmée localement que pour un mot d'au moins
+`LONGUEUR_CORRECTION` lettres, à une seule lettre d'un unique mot du
+vocabulaire, et absent du lexique français (mots du texte de la
+convention collective). Un mot plus court ("repos", à une lettre de
+"repas") ou plus éloigné ("Quantité", à deux lettres de "Quotité") est
+souvent un autre mot correct : le texte est alors laissé au LLM, seul à
+même de juger le contexte.
+
+Un texte est classé localement si chacun de ses mots est connu, ignoré
+(codes, abréviations, sigles) ou une faute identifiée sans ambiguïté.
+Sinon il est laissé au LLM.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from pathlib import Path
+
+from src.models.frappe import FrappeError
+
+
+# Vocabulaire des libellés de paie (les accents servent à la correction proposée ;
+# pluriels et féminins réguliers acceptés sans être listés)
+VOCABULAIRE = """
+    absence accident acompte acquis activité additionnel adhérent adhésion agirc
+    ajustement alsace allocation allègement ancienneté annuel année apec apprenti
+    apprentissage arrco arrondi arrêt assiette assujetti assurance astreinte autonomie
+    avance avant avantage base brut bulletin cadre caisse carence cdd cdi ceg cet
+    chômage cmu coefficient commission compensation compensatrice complément
+    complémentaire congé contribution conventionnel convention cotisation crds csg
+    cumul cumulé date décès déduction déductible déduit dégressive dépendance
+    différentielle dimanche échelon employeur employé équilibre exceptionnel
+    exonération exonéré famille familial familiaux forfait forfaitaire formation fnal
+    frais férié garantie général gratification habillement heure horaire impôt
+    imposable incapacité indemnité indice individualisé invalidité jour kilométrique
+    licenciement local logement maintien majoration maladie maternité mensualisation
+    mensuel mois moins montant moselle mutuelle naissance navigo net nuit ordinaire
+    ouvrable ouvré paie paiement panier part patronal payé payer pénibilité pension
+    période plafond plafonné prélèvement prime pris prise professionnel prorata
+    prévoyance quotité rappel rattrapage régime régularisation rémunération
+    remboursement remplacement repas restant restaurant retenu retenue retraite revenu
+    réduction rgdu salaire salarial salarié santé sécurité social solde solidarité
+    somme soumis source spécifique statutaire subrogation supplément supplémentaire
+    sujétion suppression taux taxe temps ticket titre total totaux tranche transport
+    travail unique urssaf vacances versement versé veuvage vieillesse
+"""
+
+# Mots outils, toujours corrects
+MOTS_OUTILS = """
+    à après au aux avec d de des du en et hors l la le les non ou par pour sans sous sur un une
+"""
+
+# Séparateurs internes d'un mot : apostrophes, traits d'union, barres
+SEPARATEURS = re.compile(r"['’\-/]")
+
+# Mots plus courts ignorés (sigles, codes : T1, TB, SS, AT)
+LONGUEUR_MINIMALE = 3
+
+# Longueur minimale d'un mot pour affirmer une faute sans le LLM
+LONGUEUR_CORRECTION = 8
+
+# Texte de la convention collective, source du lexique français
+CONVENTION_FILE = Path(__file__).parent.parent / "convention" / "convention.md"
+
+# Mots d'un texte (lettres seules)
+MOT = re.compile(r"[^\W\d_]+")
+
+
+def _fold(word: str) -> str:
+    """Mot sans accents ni casse ("Sécurité" → "securite")."""
+    decomposed = unicodedata.normalize("NFD", word.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _deletes(word: str, distance: int) -> set[str]:
+    """Variantes du mot obtenues en supprimant jusqu'à `distance` lettres (mot inclus)."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        variants |= frontier
+    return variants
+
+
+def _distance(left: str, right: str) -> int:
+    """Distance de Damerau-Levenshtein restreinte (transposition de deux lettres voisines = 1)."""
+    previous_row: list[int] | None = None
+    row = list(range(len(right) + 1))
+    for i in range(1, len(left) + 1):
+        before, previous_row, row = previous_row, row, [i] + [0] * len(right)
+        for j in range(1, len(right) + 1):
+            cost = left[i - 1] != right[j - 1]
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and left[i - 1] == right[j - 2] and left[i - 2] == right[j - 1]:
+                row[j] = min(row[j], before[j - 2] + 1)
+    return row[-1]
+
+
+def _lemmes(folded: str) -> Iterator[str]:
+    """Formes de base possibles d'un mot sans accents : lui-même, sans marque de pluriel ou de féminin."""
+    yield folded
+    if folded.endswith("aux"):
+        yield folded[:-3] + "al"
+    for suffix in ("es", "s", "x", "e"):
+        if folded.endswith(suffix) and len(folded) - len(suffix) >= LONGUEUR_MINIMALE:
+            yield folded[:-len(suffix)]
+
+
+def _match_case(correction: str, original: str) -> str:
+    """Applique à la correction la casse du mot d'origine (MAJUSCULES, Initiale)."""
+    if original.isupper():
+        return correction.upper()
+    if original[:1].isupper():
+        return correction[:1].upper() + correction[1:]
+    return correction
+
+
+class TypoDetector:
+    """
+    Détecteur de fautes de frappe sur un vocabulaire fermé.
+
+    Args:
+        vocabulary: Mots corrects (avec leurs accents).
+        stop_words: Mots toujours acceptés, sans correction proposée.
+        lexicon: Autres mots français : jamais corrigés, le texte est laissé au LLM.
+        max_distance: Nombre maximal de modifications pour proposer une correction.
+        min_length: Longueur minimale d'un mot inconnu pour proposer une correction.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Iterable[str],
+        stop_words: Iterable[str] = (),
+        lexicon: Iterable[str] = (),
+        max_distance: int = 1,
+        min_length: int = LONGUEUR_CORRECTION,
+    ):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self._words: dict[str, str] = {_fold(word): word for word in vocabulary}
+        self._known = set(self._words) | {_fold(word) for word in stop_words}
+        self._lexicon = {_fold(word) for word in lexicon} - self._known
+        self._index: dict[str, set[str]] = defaultdict(set)
+        for folded in self._words:
+            for variant in _deletes(folded, max_distance):
+                self._index[variant].add(folded)
+
+    def correction(self, word: str) -> tuple[str, int] | None:
+        """
+        Mot du vocabulaire le plus proche d'un mot inconnu, et sa distance.
+
+        Returns:
+            (correction, distance), ou None si aucun mot n'est assez proche
+            ou si plusieurs le sont autant.
+        """
+        folded = _fold(word)
+        # Pluriel : corrigé d'après le singulier ("Allocatons" → "Allocations")
+        if folded.endswith(("s", "x")) and len(folded) > LONGUEUR_MINIMALE:
+            match = self._closest(folded[:-1])
+            if match is not None:
+                return match[0] + folded[-1], match[1]
+        return self._closest(folded)
+
+    def _closest(self, folded: str) -> tuple[str, int] | None:
+        limit = self.max_distance
+        candidates = {
+            candidate
+            for variant in _deletes(folded, limit)
+            for candidate in self._index.get(variant, ())
+        }
+        scored = sorted((_distance(folded, candidate), candidate) for candidate in candidates)
+        scored = [(distance, candidate) for distance, candidate in scored if distance <= limit]
+        if not scored or (len(scored) > 1 and scored[1][0] == scored[0][0]):
+            return None
+        distance, candidate = scored[0]
+        return self._words[candidate], distance
+
+    def classify(self, text: str, field_name: str = "libelle") -> list[FrappeError] | None:
+        """
+        Fautes de frappe d'un texte.
+
+        Returns:
+            Liste des fautes (vide si le texte est correct), ou None si le
+            texte contient un mot que le détecteur ne sait pas juger.
+        """
+        errors: list[FrappeError] = []
+        for chunk in text.split():
+            # Codes et abréviations volontaires ("Contrib.") : non jugés
+            if any(char.isdigit() for char in chunk) or chunk.endswith("."):
+                continue
+            for word in SEPARATEURS.split(chunk.strip(".,;:()[]«»\"")):
+                if len(word) < LONGUEUR_MINIMALE:
+                    continue
+                lemmes = set(_lemmes(_fold(word)))
+                # Mot connu, ou pluriel / féminin d'un mot connu
+                if lemmes & self._known:
+                    continue
+                # Mot français hors vocabulaire, ou trop court pour trancher : le contexte décide
+                if lemmes & self._lexicon or len(word) < self.min_length:
+                    return None
+                match = self.correction(word)
+                if match is None:
+                    return None
+                correction, distance = match
+                errors.append(FrappeError(
+                    is_line_error=field_name == "libelle",
+                    field_name=field_name,
+                    error_value=word,
+                    expected_value=_match_case(correction, word),
+                    explanation=f"Mot proche de « {correction} » ({distance} lettre(s) de différence).",
+                ))
+        return errors
+
+
+def _lexique() -> set[str]:
+    """Mots du texte de la convention collective (lexique français du domaine)."""
+    if not CONVENTION_FILE.exists():
+        return set()
+    return set(MOT.findall(CONVENTION_FILE.read_text(encoding="utf-8")))
+
+
+DETECTOR = TypoDetector(VOCABULAIRE.split(), MOTS_OUTILS.split(), _lexique())
+
+
+@lru_cache(maxsize=4096)
+def detect_typos(text: str, field_name: str = "libelle") -> tuple[FrappeError, ...] | None:
+    """
+    Fautes de frappe d'un texte selon le vocabulaire de paie (résultat mis en cache).
+
+    Returns:
+        Les fautes trouvées (vide si le texte est correct), ou None si le
+        texte doit être soumis au LLM.
+    """
+    errors = DETECTOR.classify(text, field_name)
+    return None if errors is None else tuple(errors)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Libellé → fautes attendues (mot, correction), [] si correct, None si laissé au LLM
+    exemples = {
+        "Cotisation Viellesse": [("Viellesse", "Vieillesse")],
+        "Allocatons familiales": [("Allocatons", "Allocations")],
+        "Régime locl Alsace-Moselle": None,
+        "Prevoyance TB Cadre": [],
+        "CSG non déductible": [],
+        "Contrib. solidarité autonomie": [],
+        "Indemnité de licenciement": [],
+        # Mots de paie courants, proches d'un autre mot du vocabulaire
+        "Part salarié": [],
+        "Cotisation salariée": [],
+        "Congés payés": [],
+        "Net payé": [],
+        "Absence non payée": [],
+        "Forfait social": [],
+        "Montant net social": [],
+        "Prélèvements sociaux": [],
+        "Moins": [],
+        "Jours fériés": [],
+        "Revenu de remplacement": [],
+        # Mot français hors vocabulaire, ou court et proche d'un autre mot : pas de correction locale
+        "Note de frais": None,
+        "Bruit de fond": None,
+        "Heures de repos": None,
+        "Quantité": None,
+    }
+    echecs = 0
+    for exemple, attendu in exemples.items():
+        resultat = DETECTOR.classify(exemple)
+        obtenu = None if resultat is None else [(e.error_value, e.expected_value) for e in resultat]
+        echecs += obtenu != attendu
+        affiche = "LLM" if obtenu is None else obtenu or "correct"
+        print(f"{'✓' if obtenu == attendu else '✗'} {exemple!r:40} → {affiche}")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        for exemple in exemples:
+            DETECTOR.classify(exemple)
+    print(f"\n{(time.perf_counter() - start) / (1000 * len(exemples)) * 1e6:.1f} µs / libellé")
+    sys.exit(1 if echecs else 0)
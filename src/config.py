@@ -18,6 +18,18 @@ class AppSettings(BaseSettings):
         - HOST: Server host address
         - PORT: Server port number
         - DEBUG: Debug mode flag
+        - EXTRACTION_BACKEND: PDF library used for extraction ("pdfplumber" or "pymupdf")
+        - EXTRACTION_WORKERS: Number of processes dedicated to PDF extraction
+        - EXTRACTION_MAX_PENDING: Maximum number of extractions queued or running
+        - EXTRACTION_PARALLEL_PAGES: Spread the pages of multi-payslip PDFs across the pool
+        - CACHE_DIR: Directory of the shared on-disk cache (empty to disable it)
+        - EXTRACTION_CACHE_SIZE: Number of extractions kept in the in-memory LRU
+        - CHECK_CACHE_SIZE: Number of check results kept in each in-memory LRU
+        - CHECK_CACHE_TTL: Lifetime of deterministic check results, in seconds (0 = no expiry)
+        - CHECK_LLM_CACHE_TTL: Lifetime of LLM check results, in seconds (0 = no expiry)
+        - FRAPPE_MEMO_SIZE: Number of LLM typo verdicts (one per text) kept in the in-memory LRU
+        - LLM_CONTEXT_CACHE: Register static prompt prefixes as Gemini cached contexts
+        - LLM_CONTEXT_CACHE_TTL: Lifetime of the Gemini cached contexts, in seconds
     """
 
     model_config = SettingsConfigDict(
@@ -32,6 +44,18 @@ class AppSettings(BaseSettings):
     HOST: str
     PORT: int
     DEBUG: bool
+    EXTRACTION_BACKEND: str = "pdfplumber"
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_MAX_PENDING: int = 8
+    EXTRACTION_PARALLEL_PAGES: bool = True
+    CACHE_DIR: str = ".cache"
+    EXTRACTION_CACHE_SIZE: int = 256
+    CHECK_CACHE_SIZE: int = 1024
+    CHECK_CACHE_TTL: float = 0
+    CHECK_LLM_CACHE_TTL: float = 86400
+    FRAPPE_MEMO_SIZE: int = 4096
+    LLM_CONTEXT_CACHE: bool = True
+    LLM_CONTEXT_CACHE_TTL: int = 3600
 
 
 class GeminiSettings(BaseSettings):
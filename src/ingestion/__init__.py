@@ -1,13 +1,34 @@
 """Module d'ingestion des fiches de paie PDF."""
 
+from .backends import BACKENDS, ExtractionBackend, get_backend
 from .ingestion import (
+    DEFAULT_BACKEND,
+    ExtractionProfile,
+    ExtractionTier,
     PayslipExtractor,
+    PdfSource,
+    count_pdf_pages,
     extract_payslip,
+    extract_payslip_pages,
     extract_payslips_from_directory,
+    split_pages,
 )
+from .cache import EXTRACTOR_VERSION, ExtractionCache
 
 __all__ = [
+    "BACKENDS",
+    "DEFAULT_BACKEND",
+    "ExtractionBackend",
+    "get_backend",
+    "ExtractionProfile",
+    "ExtractionTier",
     "PayslipExtractor",
+    "PdfSource",
+    "count_pdf_pages",
     "extract_payslip",
+    "extract_payslip_pages",
     "extract_payslips_from_directory",
+    "split_pages",
+    "EXTRACTOR_VERSION",
+    "ExtractionCache",
 ]
@@ -0,0 +1,257 @@
+"""
+Backends de lecture PDF pour l'extracteur de fiches de paie.
+
+Chaque backend expose la même interface minimale (document → pages → mots,
+traits et tables) et produit les mêmes formes de données que pdfplumber :
+- tables : liste de tables, chaque table étant une liste de lignes de cellules
+- mots et traits : positions brutes, pour reconstruire les tables sans
+  détection de treillis (voir `layout.py`)
+
+Backends disponibles :
+- pdfplumber : backend historique (pdfminer.six), le plus tolérant
+- pymupdf : MuPDF via PyMuPDF, nettement plus rapide
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, NamedTuple
+
+import pymupdf
+import pdfplumber
+
+# Tolérance verticale (en points) pour regrouper des mots sur une même ligne,
+# identique à la valeur par défaut de pdfplumber
+Y_TOLERANCE = 3
+
+
+class Word(NamedTuple):
+    """Mot positionné sur la page (coordonnées en points, origine en haut à gauche)."""
+
+    x0: float
+    top: float
+    x1: float
+    bottom: float
+    text: str
+
+
+class Ruling(NamedTuple):
+    """Trait rectiligne de la page (bord de tableau)."""
+
+    x0: float
+    top: float
+    x1: float
+    bottom: float
+
+    @property
+    def vertical(self) -> bool:
+        return self.x1 - self.x0 < 1 and self.bottom - self.top >= 1
+
+    @property
+    def horizontal(self) -> bool:
+        return self.bottom - self.top < 1 and self.x1 - self.x0 >= 1
+
+
+class PdfPage(ABC):
+    """Page d'un document PDF ouvert."""
+
+    number: int  # Numéro de page (base 1)
+    width: float
+    height: float
+
+    @abstractmethod
+    def extract_tables(self) -> list[list[list[Any]]]:
+        """Retourne les tables détectées sur la page."""
+
+    @abstractmethod
+    def extract_words(self) -> list[Word]:
+        """Retourne les mots de la page avec leur position."""
+
+    @abstractmethod
+    def rulings(self) -> list[Ruling]:
+        """Retourne les traits horizontaux et verticaux de la page."""
+
+    def close(self) -> None:
+        """Libère les ressources associées à la page."""
+
+
+class PdfDocument(ABC):
+    """Document PDF ouvert par un backend."""
+
+    producer: str  # Logiciel ayant produit le PDF (métadonnée Producer), "" si absent
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Nombre de pages du document."""
+
+    @abstractmethod
+    def pages(self) -> Iterator[PdfPage]:
+        """Itère sur les pages sélectionnées à l'ouverture."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Ferme le document."""
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ExtractionBackend(ABC):
+    """Fabrique de documents PDF pour une bibliothèque donnée."""
+
+    name: str
+
+    @abstractmethod
+    def open(self, source: Path | BinaryIO, page_numbers: list[int] | None = None) -> PdfDocument:
+        """
+        Ouvre un PDF.
+
+        Args:
+            source: Chemin du fichier ou flux binaire positionné au début du PDF.
+            page_numbers: Numéros (base 1) des pages à parcourir. Toutes si None.
+        """
+
+
+# ===== pdfplumber =====
+
+class _PdfplumberPage(PdfPage):
+    def __init__(self, page: pdfplumber.page.Page):
+        self._page = page
+        self.number = page.page_number
+        self.width = float(page.width)
+        self.height = float(page.height)
+        self._words: list[Word] | None = None
+
+    def extract_tables(self) -> list[list[list[Any]]]:
+        return self._page.extract_tables() or []
+
+    def extract_words(self) -> list[Word]:
+        # Mots lus une seule fois : ils servent aux champs et aux tables rapides
+        if self._words is None:
+            self._words = [
+                Word(word["x0"], word["top"], word["x1"], word["bottom"], word["text"])
+                for word in self._page.extract_words()
+            ]
+        return self._words
+
+    def rulings(self) -> list[Ruling]:
+        # Bords des lignes, rectangles et courbes, comme la stratégie "lines" de pdfplumber
+        return [Ruling(edge["x0"], edge["top"], edge["x1"], edge["bottom"]) for edge in self._page.edges]
+
+    def close(self) -> None:
+        # Libère les objets pdfminer de la page déjà traitée
+        self._page.close()
+
+
+class _PdfplumberDocument(PdfDocument):
+    def __init__(self, pdf: pdfplumber.PDF):
+        self._pdf = pdf
+        self.producer = str(pdf.metadata.get("Producer") or "")
+
+    def __len__(self) -> int:
+        return len(self._pdf.pages)
+
+    def pages(self) -> Iterator[PdfPage]:
+        for page in self._pdf.pages:
+            yield _PdfplumberPage(page)
+
+    def close(self) -> None:
+        self._pdf.close()
+
+
+class PdfplumberBackend(ExtractionBackend):
+    """Backend pdfplumber (pdfminer.six)."""
+
+    name = "pdfplumber"
+
+    def open(self, source: Path | BinaryIO, page_numbers: list[int] | None = None) -> PdfDocument:
+        return _PdfplumberDocument(pdfplumber.open(source, pages=page_numbers))
+
+
+# ===== PyMuPDF =====
+
+class _PymupdfPage(PdfPage):
+    def __init__(self, page: pymupdf.Page):
+        self._page = page
+        self.number = page.number + 1
+        self.width = page.rect.width
+        self.height = page.rect.height
+        self._words: list[Word] | None = None
+
+    def extract_tables(self) -> list[list[list[Any]]]:
+        return [table.extract() for table in self._page.find_tables().tables]
+
+    def extract_words(self) -> list[Word]:
+        # Mots lus une seule fois : ils servent aux champs et aux tables rapides
+        if self._words is None:
+            self._words = [Word(*word[:5]) for word in self._page.get_text("words")]
+        return self._words
+
+    def rulings(self) -> list[Ruling]:
+        rulings: list[Ruling] = []
+        for drawing in self._page.get_drawings():
+            for item in drawing["items"]:
+                if item[0] == "l":
+                    start, end = item[1], item[2]
+                    rulings.append(Ruling(min(start.x, end.x), min(start.y, end.y), max(start.x, end.x), max(start.y, end.y)))
+                elif item[0] == "re":
+                    # Un rectangle donne ses quatre bords
+                    rect = item[1]
+                    rulings.extend((
+                        Ruling(rect.x0, rect.y0, rect.x1, rect.y0),
+                        Ruling(rect.x0, rect.y1, rect.x1, rect.y1),
+                        Ruling(rect.x0, rect.y0, rect.x0, rect.y1),
+                        Ruling(rect.x1, rect.y0, rect.x1, rect.y1),
+                    ))
+        return rulings
+
+
+class _PymupdfDocument(PdfDocument):
+    def __init__(self, document: pymupdf.Document, page_numbers: list[int] | None):
+        self._document = document
+        self._page_numbers = page_numbers
+        self.producer = (document.metadata or {}).get("producer") or ""
+
+    def __len__(self) -> int:
+        return self._document.page_count
+
+    def pages(self) -> Iterator[PdfPage]:
+        numbers = self._page_numbers or range(1, self._document.page_count + 1)
+        for number in numbers:
+            yield _PymupdfPage(self._document[number - 1])
+
+    def close(self) -> None:
+        self._document.close()
+
+
+class PymupdfBackend(ExtractionBackend):
+    """Backend PyMuPDF (MuPDF)."""
+
+    name = "pymupdf"
+
+    def open(self, source: Path | BinaryIO, page_numbers: list[int] | None = None) -> PdfDocument:
+        if isinstance(source, Path):
+            document = pymupdf.open(source)
+        else:
+            document = pymupdf.open(stream=source.read(), filetype="pdf")
+        return _PymupdfDocument(document, page_numbers)
+
+
+BACKENDS: dict[str, ExtractionBackend] = {
+    backend.name: backend for backend in (PdfplumberBackend(), PymupdfBackend())
+}
+
+
+def get_backend(name: str) -> ExtractionBackend:
+    """
+    Retourne le backend enregistré sous ce nom.
+
+    Raises:
+        ValueError: Si le backend est inconnu.
+    """
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend d'extraction inconnu : {name} (disponibles : {', '.join(BACKENDS)})")
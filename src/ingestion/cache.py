@@ -0,0 +1,90 @@
+"""
+Cache des extractions de fiches de paie, adressé par le contenu du PDF.
+
+La clé est l'empreinte SHA-256 des octets du PDF, suffixée du profil
+d'extraction et du backend PDF; la version du cache est
+calculée à partir du code de l'extracteur, de sorte que toute modification
+de `src/ingestion` ou du modèle `FichePayeExtracted` invalide les entrées.
+"""
+
+import hashlib
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from src.cache import TieredCache
+
+from .ingestion import DEFAULT_BACKEND, ExtractionProfile, FichePayeExtracted
+
+
+def _extractor_version() -> str:
+    """Empreinte du code d'extraction (package ingestion + modèle de sortie)."""
+    ingestion_dir = Path(__file__).parent
+    sources = sorted(ingestion_dir.glob("*.py")) + [ingestion_dir.parent / "models" / "payslip.py"]
+
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+EXTRACTOR_VERSION = _extractor_version()
+
+_FICHES_ADAPTER = TypeAdapter(list[FichePayeExtracted])
+
+
+class ExtractionCache:
+    """
+    Cache des `FichePayeExtracted` indexé par le hash des octets du PDF.
+
+    Le champ `source_file` n'est pas mis en cache : il est renseigné à chaque
+    lecture avec le nom fourni par l'appelant.
+    """
+
+    def __init__(self, max_entries: int = 256, db_path: str | Path | None = None):
+        self._cache = TieredCache("extraction", EXTRACTOR_VERSION, max_entries, db_path)
+
+    @staticmethod
+    def key(
+        content: bytes | bytearray | memoryview,
+        profile: ExtractionProfile = ExtractionProfile.FULL,
+        backend: str = DEFAULT_BACKEND,
+    ) -> str:
+        """Calcule la clé de cache d'un PDF pour un profil d'extraction et un backend."""
+        return f"{hashlib.sha256(content).hexdigest()}:{ExtractionProfile(profile).value}:{backend}"
+
+    def get(self, key: str, source_name: str | None = None) -> FichePayeExtracted | None:
+        """Retourne la fiche en cache pour cette clé, ou None."""
+        payload = self._cache.get(key)
+        if payload is None:
+            return None
+        fiche = FichePayeExtracted.model_validate_json(payload)
+        fiche.source_file = source_name
+        return fiche
+
+    def put(self, key: str, fiche: FichePayeExtracted) -> None:
+        """Met en cache une fiche extraite."""
+        self._cache.put(key, fiche.model_dump_json(exclude={"source_file"}))
+
+    def get_pages(self, key: str, source_name: str | None = None) -> list[FichePayeExtracted] | None:
+        """Retourne les fiches page par page en cache pour cette clé, ou None."""
+        payload = self._cache.get(f"{key}:pages")
+        if payload is None:
+            return None
+        fiches = _FICHES_ADAPTER.validate_json(payload)
+        for fiche in fiches:
+            fiche.source_file = source_name
+        return fiches
+
+    def put_pages(self, key: str, fiches: list[FichePayeExtracted]) -> None:
+        """Met en cache les fiches extraites page par page."""
+        self._cache.put(f"{key}:pages", _FICHES_ADAPTER.dump_json(fiches, exclude={"__all__": {"source_file"}}).decode())
+
+    def clear(self) -> None:
+        """Vide le cache."""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache."""
+        return self._cache.stats()
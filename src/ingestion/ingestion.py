@@ -9,16 +9,16 @@ import re
 import sys
 from datetime import date
 from decimal import Decimal, InvalidOperation
+from enum import Enum
+from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 # Ajouter le répertoire src au path pour les imports directs
 _src_path = Path(__file__).parent.parent
 if str(_src_path) not in sys.path:
     sys.path.insert(0, str(_src_path))
 
-import pdfplumber
-
 from models.payslip import (
     EmployeeInfo,
     EmployerInfo,
@@ -29,6 +29,68 @@ from models.payslip import (
     PayslipTotals,
 )
 
+if __package__:
+    from .backends import ExtractionBackend, PdfDocument, PdfPage, Ruling, Word, get_backend
+    from .layout import LayoutTemplate, layout_fingerprint, layout_templates, table_columns, tables_from_words
+    from .word_index import Region, WordIndex
+else:  # exécution directe du module
+    from backends import ExtractionBackend, PdfDocument, PdfPage, Ruling, Word, get_backend
+    from layout import LayoutTemplate, layout_fingerprint, layout_templates, table_columns, tables_from_words
+    from word_index import Region, WordIndex
+
+# Backend utilisé quand l'appelant n'en précise pas
+DEFAULT_BACKEND = "pdfplumber"
+
+# Source acceptée par l'extracteur : chemin, contenu en mémoire ou fichier ouvert
+PdfSource = str | Path | bytes | bytearray | memoryview | BinaryIO
+
+# Numéro de ligne de cotisation (première cellule des lignes du tableau)
+LINE_NUMBER_PATTERN = re.compile(r"^\d{4,5}$")
+
+# Nombre de colonnes du tableau des cotisations CEGI
+LINE_COLUMNS = 9
+
+# Libellés des champs "Libellé : valeur" de l'en-tête et du pied de page.
+# La valeur d'un champ s'arrête au libellé suivant sur la même ligne.
+FIELD_LABELS = (
+    "Entreprise",
+    "Etablissement",
+    "Siret",
+    "APE",
+    "URSSAF",
+    "N° de cotisant",
+    "Convention Collective",
+    "Matricule",
+    "N° de sécurité sociale",
+    "Date d'entrée",
+    "Qualification Conventionnelle",
+    "Emploi",
+    "Echelon",
+    "Coefficient",
+    "Période",
+    "Bulletin n°",
+    "Net à payer",
+    "Cumul Brut",
+    "Cumul Heures",
+    "Cumul Net Imposable",
+    "Net Imposable mensuel",
+    "réglé le",
+    "SOLDE congés",
+)
+
+
+class ExtractionProfile(str, Enum):
+    """
+    Profil d'extraction : détermine ce qui est extrait et parsé.
+
+    - full: texte + tables, toutes les sections (lignes de cotisations incluses)
+    - totals: texte seul; employeur, employé, période et totaux (pas de lignes)
+    - header: texte seul; employeur, employé et période uniquement
+    """
+    FULL = "full"
+    TOTALS = "totals"
+    HEADER = "header"
+
 
 def parse_decimal(value: str | None) -> Decimal | None:
     """Parse une chaîne en Decimal, retourne None si impossible."""
@@ -62,27 +124,84 @@ def parse_date_fr(value: str | None) -> date | None:
     return None
 
 
+class ExtractionTier(str, Enum):
+    """
+    Méthode ayant produit les tables des lignes de cotisations (profil full).
+
+    - words: tables reconstruites à partir des mots et des traits de la page
+    - tables: détection de tables du backend (`extract_tables`), plus coûteuse
+    """
+
+    WORDS = "words"
+    TABLES = "tables"
+
+
 class PayslipExtractor:
     """
     Extracteur de fiches de paie PDF.
 
-    Utilise pdfplumber pour extraire:
-    - Le texte brut de chaque page
+    Utilise un backend PDF (pdfplumber par défaut, ou PyMuPDF) pour extraire:
+    - Les mots positionnés de chaque page, indexés une fois (`WordIndex`)
+      pour lire les champs de l'en-tête et du pied de page
     - Les tables structurées
 
     Puis parse ces données dans un modèle Pydantic FichePayeExtracted.
-    """
 
-    def __init__(self, pdf_path: str | Path):
-        self.pdf_path = Path(pdf_path)
-        if not self.pdf_path.exists():
-            raise FileNotFoundError(f"Fichier introuvable : {self.pdf_path}")
-        if self.pdf_path.suffix.lower() != ".pdf":
-            raise ValueError(f"Le fichier doit être un PDF : {self.pdf_path}")
+    Le PDF peut être fourni par chemin ou directement en mémoire (bytes,
+    memoryview, fichier binaire ouvert), ce qui évite de passer par un
+    fichier temporaire pour les uploads.
+
+    Les profils `totals` et `header` évitent la détection de tables et les
+    sections inutiles quand l'appelant n'a besoin que de l'en-tête ou des totaux.
+
+    En profil `full`, les tables sont d'abord reconstruites à partir des mots
+    et des traits (rapide). Le résultat n'est conservé que s'il est cohérent
+    (voir `_is_consistent`); sinon l'extraction repasse par `extract_tables()`.
+    Le niveau retenu est reporté dans `extraction_tier`. Les colonnes d'une
+    mise en page déjà rencontrée sont reprises du cache de gabarits.
+    """
 
-        self._raw_text: str = ""
+    def __init__(
+        self,
+        source: PdfSource,
+        source_name: str | None = None,
+        profile: ExtractionProfile = ExtractionProfile.FULL,
+        backend: str | ExtractionBackend = DEFAULT_BACKEND,
+        tiered: bool = True,
+    ):
+        self.profile = ExtractionProfile(profile)
+        self.backend = get_backend(backend) if isinstance(backend, str) else backend
+        self.tiered = tiered
+        self.pdf_path: Path | None = None
+        self._stream: BinaryIO
+
+        if isinstance(source, (str, Path)):
+            self.pdf_path = Path(source)
+            if not self.pdf_path.exists():
+                raise FileNotFoundError(f"Fichier introuvable : {self.pdf_path}")
+            if self.pdf_path.suffix.lower() != ".pdf":
+                raise ValueError(f"Le fichier doit être un PDF : {self.pdf_path}")
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self._stream = BytesIO(source)
+        else:
+            self._stream = source
+
+        if self.pdf_path is None:
+            # Pas d'extension à contrôler en mémoire : on vérifie l'en-tête PDF
+            position = self._stream.tell()
+            header = self._stream.read(1024)
+            self._stream.seek(position)
+            if b"%PDF-" not in header:
+                raise ValueError(f"Le fichier doit être un PDF : {source_name or 'contenu en mémoire'}")
+
+        self.source_name = source_name or (str(self.pdf_path) if self.pdf_path else None)
+
+        self._index = WordIndex([])
         self._raw_tables: list[list[list[Any]]] = []
         self._errors: list[str] = []
+        self._producer = ""
+        # Mise en page de chaque page lue par la passe rapide : (empreinte, gabarit utilisé, traits)
+        self._layouts: list[tuple[str | None, LayoutTemplate | None, list[Ruling]]] = []
 
     def extract(self) -> FichePayeExtracted:
         """
@@ -91,39 +210,159 @@ class PayslipExtractor:
         Returns:
             FichePayeExtracted: Le modèle structuré avec toutes les données.
         """
-        self._extract_raw_content()
-        return self._parse_to_model()
+        with self._open() as pdf:
+            self._producer = pdf.producer
+            pages = list(pdf.pages())
+            return self._extract_and_parse(pages, list(range(len(pages))))
 
-    def _extract_raw_content(self) -> None:
-        """Extrait le texte brut et les tables du PDF."""
-        text_parts: list[str] = []
-        tables: list[list[list[Any]]] = []
+    def extract_pages(self, pages: list[int] | None = None) -> list[FichePayeExtracted]:
+        """
+        Extrait chaque page du PDF comme un bulletin distinct.
 
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                # Extraction du texte
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                except Exception as e:
-                    self._errors.append(f"Erreur extraction texte page {page_num + 1}: {e}")
+        Le document n'est ouvert et parsé qu'une seule fois : les pages sont
+        traitées en place, sans être recopiées dans des PDF d'une page.
+        Une page en échec donne une fiche avec `extraction_success=False`,
+        ce qui conserve la correspondance index de liste ↔ numéro de page.
+
+        Args:
+            pages: Index (base 0) des pages à extraire. Toutes si None.
+
+        Returns:
+            Liste des fiches extraites, dans l'ordre des pages.
+        """
+        fiches: list[FichePayeExtracted] = []
+        page_numbers = [index + 1 for index in pages] if pages is not None else None
 
-                # Extraction des tables
+        with self._open(page_numbers) as pdf:
+            self._producer = pdf.producer
+            for page in pdf.pages():
+                page_num = page.number - 1
                 try:
-                    page_tables = page.extract_tables()
-                    if page_tables:
-                        tables.extend(page_tables)
+                    fiches.append(self._extract_and_parse([page], [page_num]))
                 except Exception as e:
-                    self._errors.append(f"Erreur extraction tables page {page_num + 1}: {e}")
+                    fiches.append(FichePayeExtracted(
+                        source_file=self.source_name,
+                        extraction_success=False,
+                        extraction_errors=[f"Erreur extraction page {page_num + 1}: {e}"],
+                    ))
+                finally:
+                    page.close()
+
+        return fiches
+
+    def count_pages(self) -> int:
+        """Retourne le nombre de pages du PDF, sans parser leur contenu."""
+        with self._open() as pdf:
+            return len(pdf)
+
+    def _open(self, page_numbers: list[int] | None = None) -> PdfDocument:
+        """Ouvre le PDF source avec le backend configuré (numéros de pages en base 1)."""
+        if self.pdf_path is not None:
+            return self.backend.open(self.pdf_path, page_numbers)
+        # Le même flux peut être ouvert plusieurs fois (comptage puis extraction)
+        self._stream.seek(0)
+        return self.backend.open(self._stream, page_numbers)
+
+    def _extract_and_parse(self, pages: list[PdfPage], page_nums: list[int]) -> FichePayeExtracted:
+        """Extrait les mots et les tables des pages d'un bulletin, puis le parse."""
+        self._errors = []
+        page_words: list[list[Word]] = []
+        for page, page_num in zip(pages, page_nums):
+            try:
+                page_words.append(page.extract_words())
+            except Exception as e:
+                self._errors.append(f"Erreur extraction texte page {page_num + 1}: {e}")
+        self._index = WordIndex(page_words, FIELD_LABELS)
+        self._raw_tables = []
+
+        # Seules les lignes de cotisations ont besoin des tables
+        if self.profile != ExtractionProfile.FULL:
+            return self._parse_to_model()
+
+        text_errors = list(self._errors)
+        if self.tiered:
+            self._raw_tables = self._extract_tables(pages, page_nums, ExtractionTier.WORDS)
+            result = self._parse_to_model()
+            if self._is_consistent(result, len(text_errors)):
+                self._learn_layouts()
+                result.extraction_tier = ExtractionTier.WORDS.value
+                return result
+            self._forget_layouts()
+            self._errors = list(text_errors)
+
+        self._raw_tables = self._extract_tables(pages, page_nums, ExtractionTier.TABLES)
+        result = self._parse_to_model()
+        result.extraction_tier = ExtractionTier.TABLES.value
+        return result
+
+    def _extract_tables(
+        self,
+        pages: list[PdfPage],
+        page_nums: list[int],
+        tier: ExtractionTier,
+    ) -> list[list[list[Any]]]:
+        """Extrait les tables des pages avec la méthode du niveau demandé."""
+        tables: list[list[list[Any]]] = []
+        self._layouts = []
+        for page, page_num in zip(pages, page_nums):
+            try:
+                if tier == ExtractionTier.WORDS:
+                    words = page.extract_words()
+                    rulings = page.rulings()
+                    fingerprint = layout_fingerprint(self._producer, page.width, page.height, words)
+                    template = layout_templates.get(fingerprint)
+                    columns = list(template.columns) if template is not None else None
+                    tables.extend(tables_from_words(words, rulings, columns))
+                    self._layouts.append((fingerprint, template, rulings))
+                else:
+                    tables.extend(page.extract_tables())
+            except Exception as e:
+                self._errors.append(f"Erreur extraction tables page {page_num + 1}: {e}")
+        return tables
+
+    def _learn_layouts(self) -> None:
+        """Mémorise les colonnes du tableau des cotisations des mises en page nouvelles."""
+        for fingerprint, template, rulings in self._layouts:
+            if fingerprint is None or template is not None:
+                continue
+            columns = next((c for c in table_columns(rulings) if len(c) == LINE_COLUMNS + 1), None)
+            if columns is not None:
+                layout_templates.put(fingerprint, LayoutTemplate(tuple(columns)))
+
+    def _forget_layouts(self) -> None:
+        """Oublie les gabarits qui n'ont pas donné de résultat cohérent."""
+        for fingerprint, template, _ in self._layouts:
+            if fingerprint is not None and template is not None:
+                layout_templates.discard(fingerprint)
+
+    def _is_consistent(self, result: FichePayeExtracted, text_error_count: int) -> bool:
+        """
+        Vérifie qu'un bulletin parsé depuis les tables rapides est exploitable.
+
+        Signaux : aucune erreur d'extraction ou de parsing, des lignes
+        numérotées ayant toutes la largeur du tableau CEGI, une ligne
+        "Brut soumis à cotisation" et les totaux (brut et net).
+        """
+        if len(self._errors) > text_error_count or not result.lignes_liste:
+            return False
+
+        for table in self._raw_tables:
+            for row in table:
+                if row and LINE_NUMBER_PATTERN.match(str(row[0] or "").strip()) and len(row) < LINE_COLUMNS:
+                    return False
+
+        if not any("brut soumis" in line.libelle.lower() for line in result.lignes_liste):
+            return False
 
-        self._raw_text = "\n\n".join(text_parts)
-        self._raw_tables = tables
+        totaux = result.totaux
+        return totaux.salaire_brut is not None and (
+            totaux.net_a_payer is not None or totaux.net_avant_impot is not None
+        )
 
     def _parse_to_model(self) -> FichePayeExtracted:
         """Parse le contenu extrait dans le modèle Pydantic."""
         result = FichePayeExtracted(
-            source_file=str(self.pdf_path),
+            source_file=self.source_name,
             extraction_errors=self._errors,
         )
 
@@ -131,121 +370,109 @@ class PayslipExtractor:
         self._parse_employer_info(result)
         self._parse_employee_info(result)
         self._parse_period_info(result)
-        self._parse_payslip_lines(result)
-        self._parse_totals(result)
-        self._parse_leave_balance(result)
+        if self.profile == ExtractionProfile.FULL:
+            self._parse_payslip_lines(result)
+        if self.profile != ExtractionProfile.HEADER:
+            self._parse_totals(result)
+        if self.profile == ExtractionProfile.FULL:
+            self._parse_leave_balance(result)
 
         result.extraction_success = len(self._errors) == 0 or len(result.lignes) > 0
 
         return result
 
+    def _value(self, label: str, region: Region | None = None) -> str | None:
+        """Première valeur non vide associée à un libellé (dans la zone, si précisée)."""
+        return next((value for value in self._index.values(label, region) if value), None)
+
+    def _match(self, label: str, pattern: str, region: Region | None = None) -> re.Match | None:
+        """Première valeur d'un libellé (dans la zone, si précisée) dont le début correspond au motif."""
+        for value in self._index.values(label, region):
+            match = re.match(pattern, value, re.IGNORECASE)
+            if match:
+                return match
+        return None
+
     def _parse_employer_info(self, result: FichePayeExtracted) -> None:
         """Parse les informations employeur."""
-        text = self._raw_text
         employer = EmployerInfo()
 
-        # Entreprise
-        match = re.search(r"Entreprise\s*:\s*([^\n]+)", text, re.IGNORECASE)
-        if match:
-            employer.entreprise = match.group(1).strip()
+        employer.entreprise = self._value("Entreprise", Region.HEADER)
+        employer.etablissement = self._value("Etablissement", Region.HEADER)
 
-        # Etablissement
-        match = re.search(r"Etablissement\s*:\s*([^\n]+)", text, re.IGNORECASE)
+        match = self._match("Siret", r"(\w+)", Region.HEADER)
         if match:
-            employer.etablissement = match.group(1).strip()
+            employer.siret = match.group(1)
 
-        # SIRET
-        match = re.search(r"Siret\s*:\s*(\w+)", text, re.IGNORECASE)
+        match = self._match("APE", r"(\w+)", Region.HEADER)
         if match:
-            employer.siret = match.group(1).strip()
+            employer.ape = match.group(1)
 
-        # APE
-        match = re.search(r"APE\s*:\s*(\w+)", text, re.IGNORECASE)
-        if match:
-            employer.ape = match.group(1).strip()
+        employer.urssaf = self._value("URSSAF", Region.HEADER)
 
-        # URSSAF
-        match = re.search(r"URSSAF\s*:\s*([^\n]+)", text, re.IGNORECASE)
+        match = self._match("N° de cotisant", r"(\d+)", Region.HEADER)
         if match:
-            employer.urssaf = match.group(1).strip()
+            employer.numero_cotisant = match.group(1)
 
-        # N° cotisant
-        match = re.search(r"N°\s*de\s*cotisant\s*:\s*(\d+)", text, re.IGNORECASE)
-        if match:
-            employer.numero_cotisant = match.group(1).strip()
-
-        # Convention collective
-        match = re.search(r"Convention\s+Collective\s+([^\n]+)", text, re.IGNORECASE)
-        if match:
-            employer.convention_collective = match.group(1).strip()
+        employer.convention_collective = self._value("Convention Collective", Region.HEADER)
 
         result.employeur = employer
 
     def _parse_employee_info(self, result: FichePayeExtracted) -> None:
         """Parse les informations employé."""
-        text = self._raw_text
         employee = EmployeeInfo()
 
-        # Matricule
-        match = re.search(r"Matricule\s*:\s*(\d+)", text, re.IGNORECASE)
+        match = self._match("Matricule", r"(\d+)", Region.HEADER)
         if match:
-            employee.matricule = match.group(1).strip()
+            employee.matricule = match.group(1)
 
-        # N° sécurité sociale
-        match = re.search(r"N°\s*de\s*sécurité\s*sociale\s*:\s*([\d\s]+)", text, re.IGNORECASE)
+        match = self._match("N° de sécurité sociale", r"([\d\s]+)", Region.HEADER)
         if match:
             employee.numero_securite_sociale = match.group(1).strip().replace(" ", "")
 
-        # Date d'entrée
-        match = re.search(r"Date\s*d'entrée\s*:\s*(\d{2}/\d{2}/\d{4})", text, re.IGNORECASE)
+        match = self._match("Date d'entrée", r"(\d{2}/\d{2}/\d{4})", Region.HEADER)
         if match:
             employee.date_entree = parse_date_fr(match.group(1))
 
-        # Qualification
-        match = re.search(r"Qualification\s+Conventionnelle\s*:\s*([^\n]+?)(?:N°|$)", text, re.IGNORECASE)
+        match = self._match("Qualification Conventionnelle", r"(.+?)\s*(?:N°|$)", Region.HEADER)
         if match:
             employee.qualification = match.group(1).strip()
 
-        # Emploi
-        match = re.search(r"Emploi\s*:\s*([^\n]+?)(?:Echelon|$)", text, re.IGNORECASE)
-        if match:
-            employee.emploi = match.group(1).strip()
-
-        # Echelon
-        match = re.search(r"Echelon\s*:\s*([^\n]+)", text, re.IGNORECASE)
-        if match:
-            employee.echelon = match.group(1).strip()
+        employee.emploi = self._value("Emploi", Region.HEADER)
+        employee.echelon = self._value("Echelon", Region.HEADER)
 
-        # Coefficient
-        match = re.search(r"Coefficient\s*:\s*([\d,\.]+)", text, re.IGNORECASE)
+        match = self._match("Coefficient", r"([\d,\.]+)", Region.HEADER)
         if match:
             employee.coefficient = parse_decimal(match.group(1))
 
+        # Nom, adresse et catégorie n'ont pas de libellé : motifs appliqués
+        # au seul en-tête, pour ne pas matcher les libellés du tableau
+        header = self._index.text(Region.HEADER)
+
         # Nom complet - on cherche "Mme" ou "M." suivi du nom
-        match = re.search(r"(Mme|M\.|Mr|Mlle)\s+([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ\s]+)\s+([A-Za-zàâäéèêëïîôùûüçÀÂÄÉÈÊËÏÎÔÙÛÜÇ]+)", text)
+        match = re.search(r"(Mme|M\.|Mr|Mlle)\s+([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ\s]+)\s+([A-Za-zàâäéèêëïîôùûüçÀÂÄÉÈÊËÏÎÔÙÛÜÇ]+)", header)
         if match:
             employee.nom = match.group(2).strip()
             employee.prenom = match.group(3).strip()
             employee.nom_complet = f"{match.group(1)} {match.group(2).strip()} {match.group(3).strip()}"
 
-        # Adresse employé - chercher après le nom
-        match = re.search(r"\d+\s*[A-Z]?\s*RUE\s+[^\n]+", text, re.IGNORECASE)
+        # Adresse employé
+        match = re.search(r"\d+\s*[A-Z]?\s*RUE\s+[^\n]+", header, re.IGNORECASE)
         if match:
             employee.adresse = match.group(0).strip()
 
         # Catégorie (Cadre, Non-cadre)
-        if re.search(r"\bCADRE\b", text, re.IGNORECASE):
+        if re.search(r"\bCADRE\b", header, re.IGNORECASE):
             employee.categorie = "Cadre"
 
         result.employe = employee
 
     def _parse_period_info(self, result: FichePayeExtracted) -> None:
         """Parse les informations de période."""
-        text = self._raw_text
         period = PayPeriod()
 
         # Période du/au
-        match = re.search(r"Période\s*:\s*du\s*(\d{2}/\d{2}/\d{4})\s*au\s*(\d{2}/\d{2}/\d{4})", text, re.IGNORECASE)
+        match = self._match("Période", r"du\s*(\d{2}/\d{2}/\d{4})\s*au\s*(\d{2}/\d{2}/\d{4})", Region.HEADER)
         if match:
             period.date_debut = parse_date_fr(match.group(1))
             period.date_fin = parse_date_fr(match.group(2))
@@ -254,9 +481,9 @@ class PayslipExtractor:
                 period.annee = period.date_fin.year
 
         # Numéro de bulletin
-        match = re.search(r"Bulletin\s*n°\s*:\s*(\d+)", text, re.IGNORECASE)
+        match = self._match("Bulletin n°", r"(\d+)", Region.HEADER)
         if match:
-            period.numero_bulletin = match.group(1).strip()
+            period.numero_bulletin = match.group(1)
 
         result.periode = period
 
@@ -272,7 +499,7 @@ class PayslipExtractor:
 
                 # Chercher des lignes qui commencent par un numéro (5 chiffres typiquement)
                 first_cell = str(row[0] or "").strip()
-                if not re.match(r"^\d{4,5}$", first_cell):
+                if not LINE_NUMBER_PATTERN.match(first_cell):
                     continue
 
                 try:
@@ -321,7 +548,7 @@ class PayslipExtractor:
         montant_pat = None
 
         # Parser selon la structure à 9 colonnes
-        if len(row) >= 9:
+        if len(row) >= LINE_COLUMNS:
             # Colonne 3: Base
             if row[3]:
                 base = parse_decimal(str(row[3]))
@@ -354,13 +581,15 @@ class PayslipExtractor:
 
     def _parse_totals(self, result: FichePayeExtracted) -> None:
         """Parse les totaux et cumuls."""
-        text = self._raw_text
         totaux = PayslipTotals()
 
-        # Brut soumis à cotisation
-        match = re.search(r"Brut\s+soumis\s+à\s+cotisation.*?([\d\s,\.]+)", text, re.IGNORECASE)
-        if match:
-            totaux.salaire_brut = parse_decimal(match.group(1))
+        # Brut soumis à cotisation : dernier montant de la ligne (montant salarial,
+        # sinon base), ce qui permet de le lire sans les tables (profil totals)
+        for value in self._index.values("Brut soumis à cotisation", Region.BODY):
+            montants = re.findall(r"-?\d{1,3}(?:[ \xa0.]\d{3})*,\d{2}", value)
+            if montants:
+                totaux.salaire_brut = parse_decimal(montants[-1])
+                break
 
         # Chercher dans les lignes aussi
         for line in result.lignes_liste:
@@ -375,86 +604,146 @@ class PayslipExtractor:
                 totaux.taux_pas = line.taux_salarial
 
         # Net à payer final
-        match = re.search(r"Net\s+à\s+payer\s+([\d\s,\.]+)\s*Euros", text, re.IGNORECASE)
+        match = self._match("Net à payer", r"([\d\s,\.]+)\s*Euros", Region.FOOTER)
         if match:
             totaux.net_a_payer = parse_decimal(match.group(1))
 
         # Cumuls
-        match = re.search(r"Cumul\s+Brut\s+([\d\s,\.]+)", text, re.IGNORECASE)
+        match = self._match("Cumul Brut", r"([\d\s,\.]+)", Region.FOOTER)
         if match:
             totaux.cumul_brut = parse_decimal(match.group(1))
 
-        match = re.search(r"Cumul\s+Heures\s+([\d\s,\.]+)", text, re.IGNORECASE)
+        match = self._match("Cumul Heures", r"([\d\s,\.]+)", Region.FOOTER)
         if match:
             totaux.cumul_heures = parse_decimal(match.group(1))
 
-        match = re.search(r"Cumul\s+Net\s+Imposable\s+([\d\s,\.]+)", text, re.IGNORECASE)
+        match = self._match("Cumul Net Imposable", r"([\d\s,\.]+)", Region.FOOTER)
         if match:
             totaux.cumul_net_imposable = parse_decimal(match.group(1))
 
-        match = re.search(r"Net\s+Imposable\s+mensuel\s+([\d\s,\.]+)", text, re.IGNORECASE)
+        match = self._match("Net Imposable mensuel", r"([\d\s,\.]+)", Region.FOOTER)
         if match:
             totaux.net_imposable = parse_decimal(match.group(1))
 
         # Mode de paiement
-        match = re.search(r"réglé\s+le\s*:\s*(\d{2}/\d{2}/\d{4})\s+par\s*:\s*(\w+)", text, re.IGNORECASE)
+        match = self._match("réglé le", r"(\d{2}/\d{2}/\d{4})\s+par\s*:\s*(\w+)", Region.FOOTER)
         if match:
             totaux.date_paiement = parse_date_fr(match.group(1))
             totaux.mode_paiement = match.group(2).strip()
 
         # IBAN
-        match = re.search(r"([A-Z]{2}\d{2}[A-Z0-9]{10,30})", text)
-        if match:
-            totaux.iban = match.group(1)
+        for word in self._index.words():
+            match = re.search(r"([A-Z]{2}\d{2}[A-Z0-9]{10,30})", word)
+            if match:
+                totaux.iban = match.group(1)
+                break
 
         # Type de taux PAS
-        if "Taux Personnalisé" in text:
+        if self._index.contains("Taux Personnalisé"):
             totaux.type_taux_pas = "Personnalisé"
-        elif "Taux Neutre" in text:
+        elif self._index.contains("Taux Neutre"):
             totaux.type_taux_pas = "Neutre"
 
         result.totaux = totaux
 
     def _parse_leave_balance(self, result: FichePayeExtracted) -> None:
         """Parse les soldes de congés."""
-        text = self._raw_text
         conges = LeaveBalance()
 
-        # SOLDE congés N
-        match = re.search(r"SOLDE\s+congés\s+\d+/\d+\s+N\s+([\d,\.]+)", text, re.IGNORECASE)
+        # SOLDE congés N, N-1 et N-2
+        match = self._match("SOLDE congés", r"\d+/\d+\s+N\s+([\d,\.]+)", Region.FOOTER)
         if match:
             conges.conges_n = parse_decimal(match.group(1))
 
-        # SOLDE congés N-1
-        match = re.search(r"SOLDE\s+congés\s+\d+/\d+\s+N-1\s+([\d,\.]+)", text, re.IGNORECASE)
+        match = self._match("SOLDE congés", r"\d+/\d+\s+N-1\s+([\d,\.]+)", Region.FOOTER)
         if match:
             conges.conges_n1 = parse_decimal(match.group(1))
 
-        # SOLDE congés N-2
-        match = re.search(r"SOLDE\s+congés\s+\d+/\d+\s+N-2\s+([\d,\.]+)", text, re.IGNORECASE)
+        match = self._match("SOLDE congés", r"\d+/\d+\s+N-2\s+([\d,\.]+)", Region.FOOTER)
         if match:
             conges.conges_n2 = parse_decimal(match.group(1))
 
         result.conges = conges
 
 
-def extract_payslip(pdf_path: str | Path) -> FichePayeExtracted:
+def extract_payslip(
+    source: PdfSource,
+    source_name: str | None = None,
+    profile: ExtractionProfile = ExtractionProfile.FULL,
+    backend: str = DEFAULT_BACKEND,
+    tiered: bool = True,
+) -> FichePayeExtracted:
     """
     Fonction utilitaire pour extraire une fiche de paie.
 
     Args:
-        pdf_path: Chemin vers le fichier PDF.
+        source: Chemin vers le fichier PDF, ou contenu du PDF en mémoire
+            (bytes, memoryview ou fichier binaire ouvert).
+        source_name: Nom à reporter dans `source_file` (défaut: le chemin).
+        profile: Profil d'extraction (défaut: full).
+        backend: Backend PDF (défaut: pdfplumber).
+        tiered: Si False, détecte directement les tables sans passe rapide.
 
     Returns:
         FichePayeExtracted: Les données structurées extraites.
     """
-    extractor = PayslipExtractor(pdf_path)
+    extractor = PayslipExtractor(source, source_name, profile, backend, tiered)
     return extractor.extract()
 
 
+def extract_payslip_pages(
+    source: PdfSource,
+    source_name: str | None = None,
+    pages: list[int] | None = None,
+    profile: ExtractionProfile = ExtractionProfile.FULL,
+    backend: str = DEFAULT_BACKEND,
+    tiered: bool = True,
+) -> list[FichePayeExtracted]:
+    """
+    Extrait un PDF contenant plusieurs bulletins, à raison d'un par page.
+
+    Args:
+        source: Chemin vers le fichier PDF, ou contenu du PDF en mémoire.
+        source_name: Nom à reporter dans `source_file` de chaque fiche.
+        pages: Index (base 0) des pages à extraire. Toutes si None.
+        profile: Profil d'extraction (défaut: full).
+        backend: Backend PDF (défaut: pdfplumber).
+        tiered: Si False, détecte directement les tables sans passe rapide.
+
+    Returns:
+        Liste des fiches extraites, dans l'ordre des pages.
+    """
+    extractor = PayslipExtractor(source, source_name, profile, backend, tiered)
+    return extractor.extract_pages(pages)
+
+
+def count_pdf_pages(source: PdfSource, backend: str = DEFAULT_BACKEND) -> int:
+    """Retourne le nombre de pages d'un PDF."""
+    return PayslipExtractor(source, backend=backend).count_pages()
+
+
+def split_pages(page_count: int, parts: int) -> list[list[int]]:
+    """
+    Répartit les pages en `parts` groupes contigus de tailles équilibrées.
+
+    Exemple: 12 pages en 5 groupes → [[0, 1, 2], [3, 4, 5], [6, 7], [8, 9], [10, 11]].
+    """
+    parts = max(1, min(parts, page_count))
+    size, remainder = divmod(page_count, parts)
+
+    groups: list[list[int]] = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < remainder else 0)
+        groups.append(list(range(start, end)))
+        start = end
+    return [group for group in groups if group]
+
+
 def extract_payslips_from_directory(
     directory: str | Path,
-    pattern: str = "*.pdf"
+    pattern: str = "*.pdf",
+    backend: str = DEFAULT_BACKEND,
 ) -> list[FichePayeExtracted]:
     """
     Extrait toutes les fiches de paie d'un répertoire.
@@ -462,6 +751,7 @@ def extract_payslips_from_directory(
     Args:
         directory: Chemin vers le répertoire contenant les PDFs.
         pattern: Pattern glob pour filtrer les fichiers (défaut: *.pdf).
+        backend: Backend PDF (défaut: pdfplumber).
 
     Returns:
         Liste des fiches de paie extraites.
@@ -473,7 +763,7 @@ def extract_payslips_from_directory(
     results = []
     for pdf_file in sorted(dir_path.glob(pattern)):
         try:
-            result = extract_payslip(pdf_file)
+            result = extract_payslip(pdf_file, backend=backend)
             results.append(result)
         except Exception as e:
             # Créer un résultat d'erreur pour ce fichier
@@ -0,0 +1,240 @@
+"""
+Reconstruction des tables à partir des mots et des traits de la page.
+
+Les bulletins CEGI tracent les colonnes du tableau des cotisations avec des
+traits verticaux continus. Plutôt que de détecter le treillis complet
+(intersections, cellules) comme `extract_tables()`, on répartit directement
+les mots entre les colonnes délimitées par ces traits, puis entre les
+lignes délimitées par les traits horizontaux (ou, à défaut, par les lignes
+de texte). Le résultat a la même forme que les tables pdfplumber.
+
+Les bulletins d'un même logiciel de paie partagent exactement les mêmes
+colonnes : une fois apprises sur un premier bulletin, elles sont gardées
+dans un cache de gabarits indexé par une empreinte de mise en page
+(producteur du PDF, format de page, position des en-têtes de colonnes).
+"""
+
+import hashlib
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+if __package__:
+    from .backends import Y_TOLERANCE, Ruling, Word
+else:  # exécution directe du module
+    from backends import Y_TOLERANCE, Ruling, Word
+
+# Tolérance (en points) pour fusionner des traits quasi alignés
+SNAP_TOLERANCE = 3
+
+# Mot identifiant la ligne d'en-tête du tableau des cotisations
+HEADER_LABEL = "Libellé"
+
+
+def _snap(values: list[float]) -> list[float]:
+    """Fusionne les positions distantes de moins de SNAP_TOLERANCE."""
+    snapped: list[float] = []
+    for value in sorted(values):
+        if snapped and value - snapped[-1] <= SNAP_TOLERANCE:
+            continue
+        snapped.append(value)
+    return snapped
+
+
+def _cell_text(words: list[Word]) -> str:
+    """Texte d'une cellule : mots d'une même ligne séparés par des espaces, lignes par des retours."""
+    lines: list[list[Word]] = []
+    last_top: float | None = None
+    for word in sorted(words, key=lambda w: (w.top, w.x0)):
+        if last_top is None or word.top - last_top > Y_TOLERANCE:
+            lines.append([])
+        lines[-1].append(word)
+        last_top = word.top
+    return "\n".join(" ".join(word.text for word in sorted(line, key=lambda w: w.x0)) for line in lines)
+
+
+def _table_regions(rulings: list[Ruling]) -> list[tuple[float, float, list[Ruling]]]:
+    """Regroupe les traits verticaux qui se chevauchent en bandes (une par table)."""
+    regions: list[tuple[float, float, list[Ruling]]] = []
+    for ruling in sorted((r for r in rulings if r.vertical), key=lambda r: r.top):
+        if regions and ruling.top <= regions[-1][1] + SNAP_TOLERANCE:
+            top, bottom, members = regions[-1]
+            members.append(ruling)
+            regions[-1] = (top, max(bottom, ruling.bottom), members)
+        else:
+            regions.append((ruling.top, ruling.bottom, [ruling]))
+    return regions
+
+
+def header_line(words: list[Word]) -> list[Word] | None:
+    """Retourne les mots de la ligne d'en-tête du tableau des cotisations, ou None."""
+    label = next((word for word in words if word.text == HEADER_LABEL), None)
+    if label is None:
+        return None
+    return sorted(
+        (word for word in words if abs(word.top - label.top) <= Y_TOLERANCE),
+        key=lambda word: word.x0,
+    )
+
+
+def layout_fingerprint(producer: str, width: float, height: float, words: list[Word]) -> str | None:
+    """
+    Empreinte de mise en page d'une page de bulletin.
+
+    Combine le producteur du PDF, le format de la page et la position des
+    en-têtes de colonnes. None si la page n'a pas d'en-tête de tableau.
+    """
+    header = header_line(words)
+    if header is None:
+        return None
+    positions = ",".join(f"{word.text}@{round(word.x0)}" for word in header)
+    signature = f"{producer}|{round(width)}x{round(height)}|{positions}"
+    return hashlib.sha256(signature.encode()).hexdigest()[:16]
+
+
+def table_columns(rulings: list[Ruling]) -> list[list[float]]:
+    """Retourne les bornes de colonnes de chaque table tracée sur la page."""
+    return [_snap([ruling.x0 for ruling in verticals]) for _, _, verticals in _table_regions(rulings)]
+
+
+def tables_from_words(
+    words: list[Word],
+    rulings: list[Ruling],
+    columns: list[float] | None = None,
+) -> list[list[list[Any]]]:
+    """
+    Reconstruit les tables d'une page sans détection de treillis.
+
+    Args:
+        words: Mots positionnés de la page.
+        rulings: Traits de la page.
+        columns: Bornes de colonnes connues (gabarit). Si None, elles sont
+            déduites des traits verticaux de chaque table.
+
+    Returns:
+        Tables au format pdfplumber (liste de lignes de cellules).
+    """
+    tables: list[list[list[Any]]] = []
+
+    regions = _table_regions(rulings)
+    if columns is not None:
+        # Gabarit connu : seule la table placée sous l'en-tête de colonnes est lue,
+        # les cadres d'en-tête ou de pied de page n'ont pas ces colonnes
+        header = header_line(words)
+        if header is None:
+            return tables
+        header_top = min(word.top for word in header)
+        regions = [region for region in regions if region[1] > header_top][:1]
+        if not regions:
+            # Pas de traits : la table va de l'en-tête au bas de page
+            regions = [(max(word.bottom for word in header), max(word.bottom for word in words), [])]
+
+    for top, bottom, verticals in regions:
+        region_columns = list(columns) if columns is not None else _snap([ruling.x0 for ruling in verticals])
+        if len(region_columns) < 2:
+            continue
+        left, right = region_columns[0], region_columns[-1]
+
+        rows = _snap([
+            ruling.top for ruling in rulings
+            if ruling.horizontal
+            and top - SNAP_TOLERANCE <= ruling.top <= bottom + SNAP_TOLERANCE
+            and ruling.x0 < right and ruling.x1 > left
+        ])
+
+        # Mots dont le centre tombe dans la table
+        inside = [
+            word for word in words
+            if left <= (word.x0 + word.x1) / 2 <= right and top <= (word.top + word.bottom) / 2 <= bottom
+        ]
+        if not inside:
+            continue
+
+        # Ligne de chaque mot : bande entre deux traits horizontaux, sinon ligne de texte
+        row_keys: list[float] = []
+        if len(rows) >= 2:
+            row_keys = [rows[max(0, bisect_right(rows, (w.top + w.bottom) / 2) - 1)] for w in inside]
+        else:
+            last_top: float | None = None
+            current = 0.0
+            for word in sorted(inside, key=lambda w: w.top):
+                if last_top is None or word.top - last_top > Y_TOLERANCE:
+                    current = word.top
+                last_top = word.top
+                row_keys.append(current)
+            inside = sorted(inside, key=lambda w: w.top)
+
+        cells: dict[float, list[list[Word]]] = {}
+        for word, row_key in zip(inside, row_keys):
+            row = cells.setdefault(row_key, [[] for _ in range(len(region_columns) - 1)])
+            column = min(bisect_right(region_columns, (word.x0 + word.x1) / 2) - 1, len(region_columns) - 2)
+            row[column].append(word)
+
+        tables.append([
+            [_cell_text(cell) for cell in cells[row_key]]
+            for row_key in sorted(cells)
+        ])
+
+    return tables
+
+
+@dataclass(frozen=True)
+class LayoutTemplate:
+    """Structure apprise du tableau des cotisations pour une mise en page."""
+
+    columns: tuple[float, ...]
+
+
+class LayoutTemplateCache:
+    """
+    Cache LRU des gabarits de mise en page, propre au processus.
+
+    Les extractions tournent dans les processus du pool : chaque processus
+    apprend les gabarits des logiciels de paie qu'il rencontre.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._templates: OrderedDict[str, LayoutTemplate] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: str | None) -> LayoutTemplate | None:
+        """Retourne le gabarit associé à l'empreinte, ou None."""
+        if fingerprint is None:
+            return None
+        with self._lock:
+            template = self._templates.get(fingerprint)
+            if template is None:
+                self.misses += 1
+                return None
+            self._templates.move_to_end(fingerprint)
+            self.hits += 1
+            return template
+
+    def put(self, fingerprint: str, template: LayoutTemplate) -> None:
+        """Enregistre un gabarit appris."""
+        with self._lock:
+            self._templates[fingerprint] = template
+            self._templates.move_to_end(fingerprint)
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+
+    def discard(self, fingerprint: str) -> None:
+        """Oublie un gabarit qui n'a pas donné de résultat cohérent."""
+        with self._lock:
+            self._templates.pop(fingerprint, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Retourne les compteurs du cache."""
+        return {"entries": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+
+layout_templates = LayoutTemplateCache()
@@ -0,0 +1,159 @@
+"""
+Index spatial des mots d'un bulletin.
+
+Les mots de chaque page sont regroupés une seule fois en lignes visuelles,
+classées par zone (en-tête au-dessus du tableau des cotisations, corps,
+pied de page), et chaque mot est indexé par son texte normalisé. Les
+champs "Libellé : valeur" se résolvent alors par une recherche dans
+l'index suivie d'une lecture des mots voisins sur la même ligne, au lieu
+d'un balayage du texte complet par expression régulière.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterator, Sequence
+
+if __package__:
+    from .backends import Y_TOLERANCE, Word
+    from .layout import HEADER_LABEL
+else:  # exécution directe du module
+    from backends import Y_TOLERANCE, Word
+    from layout import HEADER_LABEL
+
+
+class Region(str, Enum):
+    """Zone d'une page de bulletin."""
+
+    HEADER = "header"  # Au-dessus de l'en-tête du tableau des cotisations
+    BODY = "body"  # Tableau des cotisations
+    FOOTER = "footer"  # Sous la dernière ligne numérotée du tableau
+
+
+@dataclass
+class TextLine:
+    """Ligne visuelle : mots de même ordonnée, triés de gauche à droite."""
+
+    page: int
+    region: Region
+    words: list[Word]
+
+    @property
+    def text(self) -> str:
+        return " ".join(word.text for word in self.words)
+
+
+def _normalize(token: str) -> str:
+    return token.lower().rstrip(":")
+
+
+def _group_lines(words: list[Word]) -> list[list[Word]]:
+    lines: list[list[Word]] = []
+    last_top: float | None = None
+    for word in sorted(words, key=lambda w: (w.top, w.x0)):
+        if last_top is None or word.top - last_top > Y_TOLERANCE:
+            lines.append([])
+        lines[-1].append(word)
+        last_top = word.top
+    return [sorted(line, key=lambda w: w.x0) for line in lines]
+
+
+class WordIndex:
+    """
+    Index des mots d'un ou plusieurs pages, construit en une passe.
+
+    Args:
+        pages: Mots de chaque page.
+        labels: Libellés de champs "Libellé : valeur" connus. La valeur d'un
+            libellé s'arrête au libellé suivant sur la même ligne.
+    """
+
+    def __init__(self, pages: Sequence[list[Word]], labels: Sequence[str] = ()):
+        self.lines: list[TextLine] = []
+        self._tokens: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._labels = [tuple(_normalize(token) for token in label.split()) for label in labels]
+
+        for page_num, words in enumerate(pages):
+            page_lines = _group_lines(words)
+            regions = self._regions(page_lines)
+            for words_in_line, region in zip(page_lines, regions):
+                line_index = len(self.lines)
+                self.lines.append(TextLine(page_num, region, words_in_line))
+                for word_index, word in enumerate(words_in_line):
+                    self._tokens[_normalize(word.text)].append((line_index, word_index))
+
+        # Début de chaque libellé connu, pour borner les valeurs
+        self._label_starts: set[tuple[int, int]] = set()
+        for label in self._labels:
+            for line_index, word_index in self._find(label):
+                self._label_starts.add((line_index, word_index))
+
+    @staticmethod
+    def _regions(lines: list[list[Word]]) -> list[Region]:
+        """Classe les lignes d'une page : en-tête, corps (tableau), pied de page."""
+        header = next(
+            (index for index, line in enumerate(lines) if any(word.text == HEADER_LABEL for word in line)),
+            None,
+        )
+        if header is None:
+            # Sans tableau reconnu, toute la page est traitée comme un en-tête
+            return [Region.HEADER] * len(lines)
+
+        last_row = header
+        for index in range(header + 1, len(lines)):
+            first = lines[index][0].text
+            if first.isdigit() and len(first) in (4, 5):
+                last_row = index
+        return [
+            Region.HEADER if index < header else Region.BODY if index <= last_row else Region.FOOTER
+            for index in range(len(lines))
+        ]
+
+    def _find(self, tokens: tuple[str, ...]) -> Iterator[tuple[int, int]]:
+        """Positions (ligne, mot) où commence la suite de mots `tokens`, dans l'ordre du document."""
+        for line_index, word_index in self._tokens.get(tokens[0], ()):
+            words = self.lines[line_index].words
+            if len(words) - word_index < len(tokens):
+                continue
+            if all(_normalize(words[word_index + offset].text) == token for offset, token in enumerate(tokens[1:], 1)):
+                yield line_index, word_index
+
+    def values(self, label: str, region: Region | None = None) -> Iterator[str]:
+        """
+        Valeurs associées à un libellé, dans l'ordre du document.
+
+        La valeur est le texte qui suit le libellé sur la même ligne (sans
+        le ":" éventuel), jusqu'au libellé connu suivant.
+        """
+        tokens = tuple(_normalize(token) for token in label.split())
+        for line_index, word_index in self._find(tokens):
+            line = self.lines[line_index]
+            if region is not None and line.region != region:
+                continue
+
+            start = word_index + len(tokens)
+            if start < len(line.words) and line.words[start].text == ":":
+                start += 1
+            end = start
+            while end < len(line.words) and (line_index, end) not in self._label_starts:
+                end += 1
+            yield " ".join(word.text for word in line.words[start:end])
+
+    def contains(self, phrase: str, region: Region | None = None) -> bool:
+        """True si la suite de mots apparaît (dans la zone, si précisée)."""
+        tokens = tuple(_normalize(token) for token in phrase.split())
+        return any(
+            region is None or self.lines[line_index].region == region
+            for line_index, _ in self._find(tokens)
+        )
+
+    def words(self, region: Region | None = None) -> Iterator[str]:
+        """Mots du document (de la zone, si précisée), dans l'ordre de lecture."""
+        for line in self.lines:
+            if region is None or line.region == region:
+                for word in line.words:
+                    yield word.text
+
+    def text(self, region: Region | None = None) -> str:
+        """Texte du document (de la zone, si précisée), une ligne par ligne visuelle."""
+        return "\n".join(line.text for line in self.lines if region is None or line.region == region)
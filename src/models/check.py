@@ -1,12 +1,19 @@
 """Modèles pour les rapports de vérification."""
 
 from decimal import Decimal
+from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer
 
 
 class CheckResult(BaseModel):
-    """Résultat d'un test de vérification."""
+    """
+    Résultat d'un test de vérification.
+
+    Le message peut être différé (`CheckResult.lazy`) : il est formaté à partir
+    d'un gabarit et de ses paramètres à la première lecture par
+    `render_message()` ou à la sérialisation, et jamais s'il n'est pas renvoyé.
+    """
 
     test_name: str = Field(..., description="Nom du test (ex: rgdu, csg)")
     valid: bool = Field(..., description="True si le test passe")
@@ -15,7 +22,63 @@ class CheckResult(BaseModel):
     obtained_value: Decimal | None = Field(default=None, description="Valeur trouvée dans la fiche")
     expected_value: Decimal | None = Field(default=None, description="Valeur calculée attendue")
     difference: Decimal | None = Field(default=None, description="Écart entre obtenu et attendu")
-    message: str = Field(..., description="Explication de la formule appliquée ou de l'erreur")
+    message: str | None = Field(
+        default=None,
+        description="Explication de la formule appliquée ou de l'erreur (absente en mode summary)",
+    )
+
+    _template: str | None = PrivateAttr(default=None)
+    _params: dict[str, Any] = PrivateAttr(default_factory=dict)
+    _transient: bool = PrivateAttr(default=False)
+
+    @classmethod
+    def lazy(cls, template: str, params: dict[str, Any], **fields: Any) -> "CheckResult":
+        """
+        Construit un résultat dont le message est formaté à la demande.
+
+        Args:
+            template: Gabarit `str.format` du message.
+            params: Paramètres du gabarit.
+            **fields: Autres champs du résultat.
+        """
+        result = cls(**fields)
+        result._template = template
+        result._params = params
+        return result
+
+    def render_message(self) -> str | None:
+        """Retourne le message, en le formatant à la première lecture s'il est différé."""
+        if self.message is None and self._template is not None:
+            self.message = self._template.format(**self._params)
+        return self.message
+
+    def mark_transient(self) -> "CheckResult":
+        """Marque le résultat comme provisoire (ex: échec d'appel LLM) : il n'est pas mis en cache."""
+        self._transient = True
+        return self
+
+    @property
+    def is_transient(self) -> bool:
+        """True si le résultat est provisoire (voir `mark_transient`)."""
+        return self._transient
+
+    @property
+    def deferred_message(self) -> tuple[str, dict[str, Any]] | None:
+        """Gabarit et paramètres du message s'il n'est pas encore formaté, sinon None."""
+        if self.message is None and self._template is not None:
+            return self._template, self._params
+        return None
+
+    def without_message(self) -> "CheckResult":
+        """Copie du résultat sans message (mode summary)."""
+        result = self.model_copy(update={"message": None})
+        result._template = None
+        result._params = {}
+        return result
+
+    @field_serializer("message")
+    def _serialize_message(self, message: str | None) -> str | None:
+        return self.render_message()
 
 
 class CheckReport(BaseModel):
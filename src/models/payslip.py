@@ -119,6 +119,10 @@ class FichePayeExtracted(BaseModel):
     source_file: str | None = Field(default=None, description="Chemin du fichier PDF source")
     extraction_success: bool = Field(default=True, description="Indique si l'extraction a réussi")
     extraction_errors: list[str] = Field(default_factory=list, description="Erreurs rencontrées lors de l'extraction")
+    extraction_tier: str | None = Field(
+        default=None,
+        description="Méthode d'extraction des lignes : words (mots et traits) ou tables (détection de tables)",
+    )
 
     # Informations principales
     employeur: EmployerInfo = Field(default_factory=EmployerInfo, description="Informations employeur")